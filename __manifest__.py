@@ -10,17 +10,30 @@
     'author': "Ярослав Гришин",
     'website': "http://www.hlibodar.com.ua",
     'category': 'Custom/Electricity',
-    'version': '1.0',
-    'depends': ['base', 'web'],
+    'version': '1.5',
+    'depends': ['base', 'web', 'bus'],
+    'external_dependencies': {
+        'python': ['numpy'],
+    },
     'data': [
         'security/ir.model.access.csv',
         'data/entsoe_domains_data.xml',
         'data/ir_cron.xml',
         'views/entsoe_domain_views.xml',
+        'views/electricity_price_raw_document_views.xml',
+        'views/electricity_price_series_views.xml',
+        'views/electricity_price_series_archive_views.xml',
         'views/electricity_price_views.xml',
+        'views/electricity_price_aggregate_views.xml',
+        'views/electricity_price_fetch_log_views.xml',
+        'views/electricity_price_archive_import_views.xml',
+        'views/electricity_price_import_job_views.xml',
+        'views/electricity_price_domain_recompute_views.xml',
         'views/res_country_views.xml',
         'views/res_config_settings_views.xml',
         'wizards/import_price_wizard_views.xml',
+        'wizards/import_archive_wizard_views.xml',
+        'wizards/price_analytics_wizard_views.xml',
         'views/menus.xml',
     ],
     'images': ['static/descriptions/icon.png'],
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# Бенчмарк збереження цін: старий шлях (search + create/write на кожну точку)
+# проти set-based INSERT ... ON CONFLICT.
+#
+# Запуск (змінна env надається оболонкою Odoo):
+#   odoo-bin shell -d <db> --no-http < benchmarks/bench_bulk_upsert.py
+#
+# Погодинна модель тепер - представлення над рядами цін, тож старий шлях
+# відтворюється запитами, які ORM виконувала на кожну точку (пошук, INSERT або
+# UPDATE), над тимчасовою таблицею зі старою схемою "рядок на годину". Накладні
+# витрати самої ORM у Python не враховуються, тож прискорення - нижня оцінка.
+#
+# Усі зміни виконуються в savepoint і відкочуються, дані в БД не лишаються.
+
+import random
+import time
+from datetime import date, timedelta
+
+DAYS = (1, 30, 365)
+START_DATE = date(2000, 1, 1)
+
+
+def _make_batch(days):
+    rnd = random.Random(days)
+    return {
+        (START_DATE + timedelta(days=day), hour): round(rnd.uniform(0, 300), 2)
+        for day in range(days)
+        for hour in range(24)
+    }
+
+
+def _create_legacy_table(cr):
+    cr.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS bench_price_rdn_legacy (
+            id serial PRIMARY KEY,
+            country_id int NOT NULL,
+            entsoe_domain_id int,
+            price_date date NOT NULL,
+            hour int NOT NULL,
+            price float8 NOT NULL,
+            create_uid int, create_date timestamp, write_uid int, write_date timestamp,
+            UNIQUE (country_id, price_date, hour)
+        )
+    """)
+
+
+def _legacy_save(model, country_id, batch):
+    # Відтворення попередньої реалізації _parse_and_save_prices: пошук запису,
+    # потім create (з обчисленням домену країни) або write на кожну точку
+    cr = model.env.cr
+    uid = model.env.uid
+    for (price_date, hour), price in batch.items():
+        cr.execute("""
+            SELECT id FROM bench_price_rdn_legacy
+             WHERE country_id = %s AND price_date = %s AND hour = %s
+             ORDER BY id
+        """, (country_id, price_date, hour))
+        row = cr.fetchone()
+        if row:
+            cr.execute("""
+                UPDATE bench_price_rdn_legacy SET price = %s, write_uid = %s, write_date = now()
+                 WHERE id = %s
+            """, (price, uid, row[0]))
+        else:
+            cr.execute("SELECT entsoe_domain_id FROM res_country WHERE id = %s", (country_id,))
+            domain_id = cr.fetchone()[0]
+            cr.execute("""
+                INSERT INTO bench_price_rdn_legacy (country_id, entsoe_domain_id, price_date, hour, price,
+                                                    create_uid, create_date, write_uid, write_date)
+                VALUES (%s, %s, %s, %s, %s, %s, now(), %s, now())
+                RETURNING id
+            """, (country_id, domain_id, price_date, hour, price, uid, uid))
+
+
+def _bulk_save(model, country_id, batch):
+    model._bulk_upsert_prices(country_id, batch)
+
+
+def _measure(env, country_id, days, save):
+    model = env['electricity.price.rdn']
+    batch = _make_batch(days)
+    with env.cr.savepoint(flush=False) as savepoint:
+        _create_legacy_table(env.cr)
+        started = time.perf_counter()
+        save(model, country_id, batch)
+        elapsed = time.perf_counter() - started
+        savepoint.rollback()
+    env.invalidate_all()
+    return len(batch) / elapsed
+
+
+def run(env):
+    country = env['res.country'].search([('entsoe_domain_id', '!=', False)], limit=1)
+    if not country:
+        print("Немає країни з доменом ENTSO-E")
+        return
+    print(f"{'Днів':>6} {'Рядків':>8} {'До, рядків/с':>14} {'Після, рядків/с':>16} {'Прискорення':>12}")
+    for days in DAYS:
+        legacy = _measure(env, country.id, days, _legacy_save)
+        bulk = _measure(env, country.id, days, _bulk_save)
+        print(f"{days:>6} {days * 24:>8} {legacy:>14.0f} {bulk:>16.0f} {bulk / legacy:>11.1f}x")
+
+
+run(env)  # noqa: F821
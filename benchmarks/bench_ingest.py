@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+# Бенчмарк імпорту цін проти локального замінника API ENTSO-E (benchmarks/entsoe_stub.py).
+#
+# Запуск (змінна env надається оболонкою Odoo):
+#   odoo-bin shell -d <db> --no-http < benchmarks/bench_ingest.py
+#
+# Сценарії:
+#   - послідовний _fetch_and_store_prices для кожної країни та дня;
+#   - крон _cron_fetch_daily_prices (пошук пропусків + паралельне завантаження).
+# Звіт: запитів/с, рядків/с, p50/p99 затримки на країну, пікова пам'ять Python.
+# Затримка країни: послідовно - час завантаження всіх її днів; у кроні - час від
+# старту крону до збереження останньої частини її цін.
+# Параметр hd_electricity_price.entsoe_api_base_url на час прогону вказує на замінник;
+# усі зміни в БД відкочуються: журнал запитів пишеться в поточну транзакцію, а не
+# окремим курсором. Кеш відповідей кожного прогону - тимчасовий каталог, робочий
+# кеш модуля не змінюється.
+
+import shutil
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.addons.hd_electricity_price.benchmarks.entsoe_stub import EntsoeStubServer
+from odoo.addons.hd_electricity_price.models.electricity_price import (
+    ENTSOE_DEFAULT_CACHE_MAX_MB, ENTSOE_DEFAULT_CACHE_TTL,
+)
+from odoo.addons.hd_electricity_price.tools.entsoe_client import get_client
+
+DAYS = 7
+SCENARIOS = [
+    {'name': 'PT60M A01', 'resolution': 60, 'curve_type': 'A01'},
+    {'name': 'PT15M A03', 'resolution': 15, 'curve_type': 'A03'},
+    {'name': 'PT60M, 20% 503', 'resolution': 60, 'curve_type': 'A01', 'error_mode': '503', 'error_rate': 0.2},
+    {'name': 'PT60M, 1 повільна зона', 'resolution': 60, 'curve_type': 'A01', 'slow_domain_ms': 500},
+]
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _row_count(env):
+    env.flush_all()
+    env.cr.execute("SELECT count(*) FROM electricity_price_rdn")
+    return env.cr.fetchone()[0]
+
+
+def _isolate(env, stack):
+    """
+    Клієнт API з тимчасовим кешем відповідей та журнал запитів у поточній
+    транзакції на час прогону.
+    """
+    cache_dir = tempfile.mkdtemp(prefix='bench_entsoe_cache_')
+    stack.callback(shutil.rmtree, cache_dir, ignore_errors=True)
+
+    def bench_client(self):
+        api_base_url, api_token = self._get_api_settings()
+        client = get_client(api_base_url, api_token, cache_dir, ENTSOE_DEFAULT_CACHE_TTL,
+                            ENTSOE_DEFAULT_CACHE_MAX_MB * 1024 * 1024)
+        client.rate_limiter = self._get_rate_limiter(api_token)
+        return client
+
+    def log_in_transaction(self, *args, **kwargs):
+        return self._log_fetch(*args, **kwargs)
+
+    stack.enter_context(patch.object(type(env['electricity.price.rdn']), '_get_entsoe_client', bench_client))
+    stack.enter_context(patch.object(type(env['electricity.price.fetch.log']), '_log_fetch_separately',
+                                     log_in_transaction))
+
+
+def _configure(env, server):
+    set_param = env['ir.config_parameter'].sudo().set_param
+    set_param('hd_electricity_price.entsoe_api_base_url', server.url)
+    set_param('hd_electricity_price.entsoe_api_token', 'benchmark')
+    set_param('hd_electricity_price.gap_lookback_days', str(DAYS))
+
+
+def _report(name, mode, server, rows, elapsed, latencies, peak):
+    print(
+        f"{name:<26} {mode:<12} {server.request_count / elapsed:>8.1f} {rows / elapsed:>10.0f} "
+        f"{_percentile(latencies, 50) * 1000:>8.0f} {_percentile(latencies, 99) * 1000:>8.0f} "
+        f"{peak / 1024 / 1024:>8.1f}"
+    )
+
+
+def _run_sequential(env, countries, first_day):
+    model = env['electricity.price.rdn']
+    latencies = []
+    for country in countries:
+        started = time.perf_counter()
+        for offset in range(DAYS):
+            try:
+                with env.cr.savepoint():
+                    model._fetch_and_store_prices(country.id, first_day + timedelta(days=offset))
+            except Exception:
+                pass
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def _run_cron(env, countries, first_day):
+    model = env['electricity.price.rdn']
+    store_chunk = type(model)._store_chunk_response
+    finished = {}
+
+    def timed_store_chunk(self, country, date_from, date_to, response, stats=None):
+        result = store_chunk(self, country, date_from, date_to, response, stats)
+        # Затримка країни - від старту крону до збереження її останньої частини
+        finished[country.id] = time.perf_counter() - started
+        return result
+
+    started = time.perf_counter()
+    with patch.object(type(model), '_store_chunk_response', timed_store_chunk):
+        model._cron_fetch_daily_prices()
+    return list(finished.values())
+
+
+def run(env):
+    countries = env['res.country'].search([('entsoe_domain_id', '!=', False)])
+    if not countries:
+        print("Немає країн з доменами ENTSO-E")
+        return
+    model = env['electricity.price.rdn']
+    first_day = fields.Date.today() - timedelta(days=DAYS)
+
+    print(f"{len(countries)} країн, {DAYS} днів")
+    print(f"{'Сценарій':<26} {'Режим':<12} {'запит/с':>8} {'рядків/с':>10} {'p50, мс':>8} {'p99, мс':>8} "
+          f"{'пам., МБ':>8}")
+    for scenario in SCENARIOS:
+        domain_latency = {}
+        if scenario.get('slow_domain_ms'):
+            domain_latency[countries[0].entsoe_domain_id.domain_code] = scenario['slow_domain_ms'] / 1000
+        for mode, runner in (('послідовно', _run_sequential), ('крон', _run_cron)):
+            server = EntsoeStubServer(
+                resolution=scenario['resolution'], curve_type=scenario['curve_type'],
+                domain_latency=domain_latency, error_mode=scenario.get('error_mode', 'none'),
+                error_rate=scenario.get('error_rate', 0.0),
+            )
+            server.start()
+            with ExitStack() as stack, env.cr.savepoint(flush=False) as savepoint:
+                _isolate(env, stack)
+                env.cr.execute("DELETE FROM electricity_price_series")
+                _configure(env, server)
+                rows_before = _row_count(env)
+
+                tracemalloc.start()
+                started = time.perf_counter()
+                latencies = runner(env, countries, first_day)
+                elapsed = time.perf_counter() - started
+                _current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                rows = _row_count(env) - rows_before
+                savepoint.rollback()
+            env.invalidate_all()
+            env.registry.clear_cache()
+            server.shutdown()
+            server.server_close()
+            _report(scenario['name'], mode, server, rows, elapsed, latencies, peak)
+
+
+run(env)  # noqa: F821
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# Бенчмарк читання діапазонів дат: звичайна таблиця рядів (унікальний індекс
+# та BRIN по price_date) проти таблиці, партиційованої за місяцями.
+#
+# Запуск (змінна env надається оболонкою Odoo):
+#   odoo-bin shell -d <db> --no-http < benchmarks/bench_partitioning.py
+#
+# Розмір задається кількістю погодинних цін (1M/10M/50M, як рядків попередньої
+# схеми "рядок на годину"); у таблиці рядів це кількість / 24 рядків. Змінна
+# оточення BENCH_SIZES (через кому) замінює набір розмірів. Дані генеруються
+# в тимчасових таблицях усередині savepoint, що відкочується.
+
+import math
+import os
+import statistics
+import time
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+
+SIZES = tuple(int(size) for size in os.environ.get('BENCH_SIZES', '1000000,10000000,50000000').split(','))
+DAYS = 5 * 365
+START_DATE = date(2000, 1, 1)
+REPEAT = 20
+
+QUERIES = (
+    ('країна, місяць', """
+        SELECT price_date, prices FROM {table}
+         WHERE country_id = 1 AND price_date BETWEEN %(date_from)s AND %(date_from)s + 29
+    """),
+    ('країна, рік', """
+        SELECT price_date, prices FROM {table}
+         WHERE country_id = 1 AND price_date BETWEEN %(date_from)s AND %(date_from)s + 364
+    """),
+    ('усі країни, тиждень', """
+        SELECT country_id, price_date, cardinality(prices) FROM {table}
+         WHERE price_date BETWEEN %(date_from)s AND %(date_from)s + 6
+    """),
+)
+
+
+def _create_tables(cr, countries):
+    end_date = START_DATE + timedelta(days=DAYS - 1)
+    # Без INCLUDING DEFAULTS: id береться з тимчасової послідовності, а не з
+    # послідовності робочої таблиці (її значення не відкочуються)
+    cr.execute("CREATE TEMP SEQUENCE bench_series_id_seq")
+    cr.execute("""
+        CREATE TEMP TABLE bench_series_plain (LIKE electricity_price_series)
+    """)
+    cr.execute("ALTER TABLE bench_series_plain ALTER COLUMN id SET DEFAULT nextval('bench_series_id_seq')")
+    cr.execute("""
+        INSERT INTO bench_series_plain (country_id, entsoe_domain_id, price_date, resolution, prices,
+                                        create_uid, create_date, write_uid, write_date)
+        SELECT c, c, d::date, 60,
+               ARRAY(SELECT round((random() * 300)::numeric, 2)::float8
+                       FROM generate_series(1, 24) AS p
+                      WHERE d IS NOT NULL),
+               1, now(), 1, now()
+          FROM generate_series(%(start)s::date, %(end)s::date, interval '1 day') d,
+               generate_series(1, %(countries)s) c
+    """, {'countries': countries, 'start': START_DATE, 'end': end_date})
+
+    cr.execute("""
+        CREATE TEMP TABLE bench_series_part
+            (LIKE electricity_price_series)
+            PARTITION BY RANGE (price_date)
+    """)
+    month = START_DATE
+    while month <= end_date:
+        cr.execute(f"""
+            CREATE TEMP TABLE bench_series_part_p{month:%Y%m} PARTITION OF bench_series_part
+                FOR VALUES FROM (%s) TO (%s)
+        """, (str(month), str(month + relativedelta(months=1))))
+        month += relativedelta(months=1)
+    cr.execute("INSERT INTO bench_series_part SELECT * FROM bench_series_plain")
+
+    for table in ('bench_series_plain', 'bench_series_part'):
+        cr.execute(f"CREATE UNIQUE INDEX ON {table} (country_id, price_date, resolution)")
+        cr.execute(f"CREATE INDEX ON {table} USING brin (price_date)")
+        cr.execute(f"ANALYZE {table}")
+
+
+def _sizes(cr, table):
+    # Розмір партиційованої таблиці - сума її секцій
+    cr.execute("""
+        SELECT count(*), coalesce(sum(pg_table_size(relid)), 0), coalesce(sum(pg_indexes_size(relid)), 0)
+          FROM pg_partition_tree(%s::regclass)
+         WHERE isleaf
+    """, (table,))
+    _partitions, table_size, index_size = cr.fetchone()
+    cr.execute(f"SELECT count(*) FROM {table}")
+    return cr.fetchone()[0], table_size, index_size
+
+
+def _read_latency(cr, query):
+    timings = []
+    for index in range(REPEAT):
+        # Різні діапазони, щоб не вимірювати лише гарячий кеш однієї сторінки
+        params = {'date_from': START_DATE + timedelta(days=(index * 37) % (DAYS - 365))}
+        started = time.perf_counter()
+        cr.execute(query, params)
+        cr.fetchall()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def run(env):
+    cr = env.cr
+    for size in SIZES:
+        countries = math.ceil(size / 24 / DAYS)
+        with cr.savepoint(flush=False) as savepoint:
+            _create_tables(cr, countries)
+
+            print(f"\n{size} погодинних цін: {countries} країн x {DAYS} днів")
+            print(f"{'Таблиця':<16} {'Рядків':>10} {'Таблиця, МБ':>12} {'Індекси, МБ':>12}")
+            for label, table in (('звичайна', 'bench_series_plain'), ('партиційована', 'bench_series_part')):
+                rows, table_size, index_size = _sizes(cr, table)
+                print(f"{label:<16} {rows:>10} {table_size / 2 ** 20:>12.1f} {index_size / 2 ** 20:>12.1f}")
+
+            print(f"{'Запит':<22} {'звичайна, мс':>13} {'партиційована, мс':>18}")
+            for label, query in QUERIES:
+                plain = _read_latency(cr, query.format(table='bench_series_plain'))
+                partitioned = _read_latency(cr, query.format(table='bench_series_part'))
+                print(f"{label:<22} {plain:>13.2f} {partitioned:>18.2f}")
+
+            savepoint.rollback()
+
+
+run(env)  # noqa: F821
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# Бенчмарк API пошуку цін: місяць погодинних запитів get_price
+# з холодним та теплим кешем у порівнянні з пошуком через ORM.
+#
+# Запуск (змінна env надається оболонкою Odoo):
+#   odoo-bin shell -d <db> --no-http < benchmarks/bench_price_lookup.py
+#
+# Тестові ціни записуються в savepoint і відкочуються.
+
+import random
+import time
+from datetime import date, datetime, timedelta
+
+DAYS = 30
+START_DATE = date(2000, 1, 1)
+
+
+def _lookups():
+    return [
+        datetime.combine(START_DATE + timedelta(days=day), datetime.min.time()) + timedelta(hours=hour)
+        for day in range(DAYS)
+        for hour in range(24)
+    ]
+
+
+def _orm_lookups(model, country_id, moments):
+    for moment in moments:
+        model.search([
+            ('country_id', '=', country_id),
+            ('price_date', '=', moment.date()),
+            ('hour', '=', moment.hour),
+        ], limit=1).price
+
+
+def _cached_lookups(model, country_id, moments):
+    for moment in moments:
+        model.get_price(country_id, moment)
+
+
+def _timed(func, *args):
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+def run(env):
+    country = env['res.country'].search([('entsoe_domain_id', '!=', False)], limit=1)
+    if not country:
+        print("Немає країни з доменом ENTSO-E")
+        return
+    model = env['electricity.price.rdn']
+    rnd = random.Random(DAYS)
+    moments = _lookups()
+
+    with env.cr.savepoint(flush=False) as savepoint:
+        model._bulk_upsert_prices(country.id, {
+            (moment.date(), moment.hour): round(rnd.uniform(0, 300), 2) for moment in moments
+        })
+
+        orm = _timed(_orm_lookups, model, country.id, moments)
+        env.registry.clear_cache()
+        cold = _timed(_cached_lookups, model, country.id, moments)
+        warm = _timed(_cached_lookups, model, country.id, moments)
+        series = _timed(model.get_prices, country.id, START_DATE, START_DATE + timedelta(days=DAYS - 1))
+
+        savepoint.rollback()
+    env.invalidate_all()
+    env.registry.clear_cache()
+
+    count = len(moments)
+    print(f"{count} погодинних запитів за {DAYS} днів")
+    print(f"ORM search:        {orm * 1000:9.1f} мс ({count / orm:10.0f} запитів/с)")
+    print(f"get_price холодний: {cold * 1000:8.1f} мс ({count / cold:10.0f} запитів/с)")
+    print(f"get_price теплий:   {warm * 1000:8.1f} мс ({count / warm:10.0f} запитів/с)")
+    print(f"get_prices теплий (весь місяць): {series * 1000:.2f} мс")
+
+
+run(env)  # noqa: F821
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# Бенчмарк зберігання цін: рядок на кожен інтервал (попередня схема electricity_price_rdn)
+# проти добових рядів з масивом цін (electricity_price_series).
+#
+# Запуск (змінна env надається оболонкою Odoo):
+#   odoo-bin shell -d <db> --no-http < benchmarks/bench_series_storage.py
+#
+# Обидві схеми заповнюються синтетичними даними в тимчасових таблицях усередині
+# savepoint, що відкочується. Звіт: розмір таблиці та індексів, затримка читання
+# діапазону для однієї країни (сирі дані та погодинне представлення).
+
+import statistics
+import time
+from datetime import date, timedelta
+
+from odoo.addons.hd_electricity_price.models.electricity_price_series import HOURLY_VIEW_QUERY
+
+COUNTRIES = 10
+DAYS = 3 * 365
+START_DATE = date(2000, 1, 1)
+RESOLUTIONS = (60, 15)
+RANGES = (('місяць', 30), ('рік', 365))
+REPEAT = 20
+
+
+def _create_tables(cr, resolution):
+    slots = 24 * 60 // resolution
+    params = {'countries': COUNTRIES, 'start': START_DATE, 'end': START_DATE + timedelta(days=DAYS - 1),
+              'slots': slots}
+    cr.execute("""
+        CREATE TEMP TABLE bench_price_rows (
+            id serial PRIMARY KEY,
+            country_id integer NOT NULL,
+            entsoe_domain_id integer,
+            price_date date NOT NULL,
+            position integer NOT NULL,
+            price double precision NOT NULL,
+            raw_document_id integer,
+            create_uid integer, create_date timestamp, write_uid integer, write_date timestamp,
+            UNIQUE (country_id, price_date, position)
+        )
+    """)
+    cr.execute("""
+        INSERT INTO bench_price_rows (country_id, entsoe_domain_id, price_date, position, price,
+                                      create_uid, create_date, write_uid, write_date)
+        SELECT c, c, d::date, p, round((random() * 300)::numeric, 2), 1, now(), 1, now()
+          FROM generate_series(1, %(countries)s) c,
+               generate_series(%(start)s::date, %(end)s::date, interval '1 day') d,
+               generate_series(0, %(slots)s - 1) p
+    """, params)
+    cr.execute("""
+        CREATE TEMP TABLE bench_price_series
+            (LIKE electricity_price_series INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING INDEXES)
+    """)
+    cr.execute("""
+        INSERT INTO bench_price_series (country_id, entsoe_domain_id, price_date, resolution, prices,
+                                        create_uid, create_date, write_uid, write_date)
+        SELECT c, c, d::date, %(resolution)s,
+               ARRAY(SELECT round((random() * 300)::numeric, 2)::float8
+                       FROM generate_series(1, %(slots)s) AS p
+                      WHERE d IS NOT NULL),
+               1, now(), 1, now()
+          FROM generate_series(1, %(countries)s) c,
+               generate_series(%(start)s::date, %(end)s::date, interval '1 day') d
+    """, dict(params, resolution=resolution))
+    cr.execute("ANALYZE bench_price_rows")
+    cr.execute("ANALYZE bench_price_series")
+
+
+def _sizes(cr, table):
+    cr.execute("SELECT count(*), pg_table_size(%s), pg_indexes_size(%s)", (table, table))
+    return cr.fetchone()
+
+
+def _read_latency(cr, query, params):
+    timings = []
+    for _i in range(REPEAT):
+        started = time.perf_counter()
+        cr.execute(query, params)
+        cr.fetchall()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def _range_reads(cr, days):
+    params = {'country_id': 1, 'date_from': START_DATE, 'date_to': START_DATE + timedelta(days=days - 1)}
+    rows = _read_latency(cr, """
+        SELECT price_date, position, price
+          FROM bench_price_rows
+         WHERE country_id = %(country_id)s AND price_date BETWEEN %(date_from)s AND %(date_to)s
+         ORDER BY price_date, position
+    """, params)
+    series = _read_latency(cr, """
+        SELECT price_date, prices
+          FROM bench_price_series
+         WHERE country_id = %(country_id)s AND price_date BETWEEN %(date_from)s AND %(date_to)s
+         ORDER BY price_date
+    """, params)
+    hourly = _read_latency(cr, """
+        SELECT price_date, hour, price
+          FROM ({view}) v
+         WHERE country_id = %(country_id)s AND price_date BETWEEN %(date_from)s AND %(date_to)s
+         ORDER BY price_date, hour
+    """.format(view=HOURLY_VIEW_QUERY.format(series_table='bench_price_series')), params)
+    return rows, series, hourly
+
+
+def run(env):
+    cr = env.cr
+    print(f"{COUNTRIES} країн, {DAYS} днів")
+    for resolution in RESOLUTIONS:
+        with cr.savepoint(flush=False) as savepoint:
+            _create_tables(cr, resolution)
+            row_count, row_table, row_index = _sizes(cr, 'bench_price_rows')
+            series_count, series_table, series_index = _sizes(cr, 'bench_price_series')
+
+            print(f"\nPT{resolution}M")
+            print(f"{'Схема':<20} {'Рядків':>10} {'Таблиця, МБ':>12} {'Індекси, МБ':>12}")
+            print(f"{'рядок на інтервал':<20} {row_count:>10} {row_table / 2 ** 20:>12.1f} {row_index / 2 ** 20:>12.1f}")
+            print(f"{'добовий ряд':<20} {series_count:>10} {series_table / 2 ** 20:>12.1f} "
+                  f"{series_index / 2 ** 20:>12.1f}")
+
+            print(f"{'Діапазон':<10} {'рядки, мс':>10} {'ряди, мс':>10} {'погодинно, мс':>14}")
+            for label, days in RANGES:
+                rows, series, hourly = _range_reads(cr, days)
+                print(f"{label:<10} {rows:>10.2f} {series:>10.2f} {hourly:>14.2f}")
+
+            savepoint.rollback()
+
+
+run(env)  # noqa: F821
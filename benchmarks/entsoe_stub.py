@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+# Локальний замінник ENTSO-E Transparency Platform API та генератор синтетичних документів A44.
+#
+# Окремий запуск сервера:
+#   python benchmarks/entsoe_stub.py --port 8765 --resolution 15 --error-mode 429 --error-rate 0.1
+#
+# Потім у налаштуваннях модуля (hd_electricity_price.entsoe_api_base_url) вказати
+# http://127.0.0.1:8765/api; токен може бути довільним.
+
+from datetime import datetime, time, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from zoneinfo import ZoneInfo
+import argparse
+import math
+import random
+import threading
+import time as time_module
+
+NAMESPACE = 'urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:3'
+ACK_NAMESPACE = 'urn:iec62325.351:tc57wg16:451-1:acknowledgementdocument:7:0'
+
+ERROR_MODES = ('none', '429', '503', 'empty', 'ack')
+
+
+def _format_utc(moment):
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%MZ')
+
+
+def local_day_bounds(day, tz_name):
+    """
+    Межі місцевої доби в UTC; тривалість 23/25 годин у дні переходу на літній/зимовий час.
+    """
+    tz = ZoneInfo(tz_name)
+    start = datetime.combine(day, time.min, tzinfo=tz)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz)
+    return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+
+
+def _prices(rnd, count, resolution):
+    # Добовий профіль з ранковим та вечірнім піками плюс шум
+    per_hour = 60 // resolution
+    result = []
+    for position in range(count):
+        hour = (position // per_hour) % 24
+        base = 80 + 40 * math.sin((hour - 6) / 24 * 2 * math.pi) + 30 * (hour in (8, 9, 18, 19, 20))
+        result.append(round(base + rnd.uniform(-15, 15), 2))
+    return result
+
+
+def generate_a44(domain_code, date_from, date_to, resolution=60, curve_type='A01',
+                 tz_name='Europe/Bucharest', seed=None):
+    """
+    Синтетичний Publication_MarketDocument A44: одна TimeSeries на місцеву добу.
+
+    :param resolution: Роздільна здатність у хвилинах (15, 30 або 60)
+    :param curve_type: A01 - усі позиції; A03 - позиції з ціною, що дорівнює
+                       попередній, пропускаються
+    :return: XML документ (str)
+    """
+    rnd = random.Random(seed if seed is not None else f'{domain_code}{date_from}{date_to}{resolution}')
+    doc_start, _end = local_day_bounds(date_from, tz_name)
+    _start, doc_end = local_day_bounds(date_to, tz_name)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        f'<Publication_MarketDocument xmlns="{NAMESPACE}">',
+        '<mRID>stub</mRID><revisionNumber>1</revisionNumber><type>A44</type>',
+        f'<createdDateTime>{datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")}</createdDateTime>',
+        f'<period.timeInterval><start>{_format_utc(doc_start)}</start><end>{_format_utc(doc_end)}</end>'
+        '</period.timeInterval>',
+    ]
+    day = date_from
+    series = 1
+    while day <= date_to:
+        start, end = local_day_bounds(day, tz_name)
+        count = int((end - start).total_seconds() // (resolution * 60))
+        prices = _prices(rnd, count, resolution)
+        if curve_type == 'A03':
+            # Щоб пропуски дійсно траплялись, частина цін повторює попередню
+            for position in range(1, count):
+                if rnd.random() < 0.3:
+                    prices[position] = prices[position - 1]
+        parts.append(
+            f'<TimeSeries><mRID>{series}</mRID><businessType>A62</businessType>'
+            f'<in_Domain.mRID codingScheme="A01">{domain_code}</in_Domain.mRID>'
+            f'<out_Domain.mRID codingScheme="A01">{domain_code}</out_Domain.mRID>'
+            '<currency_Unit.name>EUR</currency_Unit.name><price_Measure_Unit.name>MWH</price_Measure_Unit.name>'
+            f'<curveType>{curve_type}</curveType>'
+            f'<Period><timeInterval><start>{_format_utc(start)}</start><end>{_format_utc(end)}</end></timeInterval>'
+            f'<resolution>PT{resolution}M</resolution>'
+        )
+        for position, price in enumerate(prices, start=1):
+            if curve_type == 'A03' and position > 1 and price == prices[position - 2]:
+                continue
+            parts.append(f'<Point><position>{position}</position><price.amount>{price}</price.amount></Point>')
+        parts.append('</Period></TimeSeries>')
+        day += timedelta(days=1)
+        series += 1
+    parts.append('</Publication_MarketDocument>')
+    return ''.join(parts)
+
+
+def acknowledgement(reason='No matching data found for Data item Day-ahead Prices'):
+    """
+    Acknowledgement_MarketDocument, який API повертає, коли даних немає.
+    """
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<Acknowledgement_MarketDocument xmlns="{ACK_NAMESPACE}">'
+        '<mRID>stub</mRID>'
+        f'<createdDateTime>{datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")}</createdDateTime>'
+        f'<Reason><code>999</code><text>{reason}</text></Reason>'
+        '</Acknowledgement_MarketDocument>'
+    )
+
+
+class EntsoeStubServer(ThreadingHTTPServer):
+    """
+    HTTP-сервер, що відповідає на запити A44 синтетичними документами.
+
+    :param resolution: Роздільна здатність документів у хвилинах
+    :param curve_type: A01 або A03
+    :param tz_name: Часовий пояс, що визначає межі доби (і дні переходу на літній час)
+    :param latency: Затримка відповіді в секундах
+    :param domain_latency: Словник {domain_code: затримка} для повільних зон
+    :param error_mode: Один з ERROR_MODES
+    :param error_rate: Частка запитів, на які повертається помилка
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), resolution=60, curve_type='A01', tz_name='Europe/Bucharest',
+                 latency=0.0, domain_latency=None, error_mode='none', error_rate=0.0, seed=0):
+        super().__init__(address, _StubHandler)
+        self.resolution = resolution
+        self.curve_type = curve_type
+        self.tz_name = tz_name
+        self.latency = latency
+        self.domain_latency = domain_latency or {}
+        self.error_mode = error_mode
+        self.error_rate = error_rate
+        self.request_count = 0
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://{self.server_address[0]}:{self.server_address[1]}/api'
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, name='entsoe_stub', daemon=True)
+        thread.start()
+        return thread
+
+    def _should_fail(self):
+        with self._lock:
+            self.request_count += 1
+            return self.error_mode != 'none' and self._random.random() < self.error_rate
+
+    def build_response(self, params):
+        """
+        :return: Кортеж (HTTP статус, заголовки, тіло)
+        """
+        domain_code = params.get('in_Domain', '')
+        delay = self.domain_latency.get(domain_code, self.latency)
+        if delay:
+            time_module.sleep(delay)
+
+        if self._should_fail():
+            if self.error_mode == '429':
+                return 429, {'Retry-After': '1'}, b'Too Many Requests'
+            if self.error_mode == '503':
+                return 503, {}, b'Service Unavailable'
+            if self.error_mode == 'empty':
+                return 200, {'Content-Type': 'text/xml'}, b''
+            return 200, {'Content-Type': 'text/xml'}, acknowledgement().encode('utf-8')
+
+        try:
+            period_start = datetime.strptime(params['periodStart'], '%Y%m%d%H%M').replace(tzinfo=timezone.utc)
+            period_end = datetime.strptime(params['periodEnd'], '%Y%m%d%H%M').replace(tzinfo=timezone.utc)
+        except (KeyError, ValueError):
+            return 400, {}, b'Invalid periodStart/periodEnd'
+
+        # Місцеві доби, що перетинаються із запитаним періодом
+        tz = ZoneInfo(self.tz_name)
+        date_from = period_start.astimezone(tz).date()
+        date_to = (period_end - timedelta(seconds=1)).astimezone(tz).date()
+        body = generate_a44(domain_code, date_from, date_to, self.resolution, self.curve_type, self.tz_name)
+        return 200, {'Content-Type': 'text/xml'}, body.encode('utf-8')
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        status, headers, body = self.server.build_response(params)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server._lock:
+            self.server.bytes_sent += len(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальний замінник API ENTSO-E для бенчмарків")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--resolution', type=int, choices=(15, 30, 60), default=60)
+    parser.add_argument('--curve-type', choices=('A01', 'A03'), default='A01')
+    parser.add_argument('--timezone', default='Europe/Bucharest')
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--slow-domain', action='append', default=[], metavar='CODE:MS',
+                        help="Затримка для окремого домену, можна вказати кілька разів")
+    parser.add_argument('--error-mode', choices=ERROR_MODES, default='none')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    domain_latency = {}
+    for item in args.slow_domain:
+        code, _sep, delay = item.rpartition(':')
+        domain_latency[code] = float(delay) / 1000
+    server = EntsoeStubServer(
+        (args.host, args.port), resolution=args.resolution, curve_type=args.curve_type, tz_name=args.timezone,
+        latency=args.latency_ms / 1000, domain_latency=domain_latency,
+        error_mode=args.error_mode, error_rate=args.error_rate,
+    )
+    print(f"ENTSO-E stub: {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+from . import import_archive
\ No newline at end of file
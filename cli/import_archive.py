@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# Команда odoo-bin для імпорту архівів документів A44 з файлової системи сервера:
+#   odoo-bin hd_price_import -c odoo.conf -d <db> --path /data/entsoe/2019.zip --path /data/entsoe/2020/
+
+import argparse
+import logging
+import os
+import sys
+
+from odoo import api, SUPERUSER_ID
+from odoo.cli import Command
+from odoo.modules.registry import Registry
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+
+class ImportPriceArchive(Command):
+    """Імпорт архівів документів A44 ENTSO-E (XML, XML.GZ, ZIP) з файлової системи"""
+    name = 'hd_price_import'
+
+    def run(self, cmdargs):
+        parser = argparse.ArgumentParser(
+            prog=f'{os.path.basename(sys.argv[0])} {self.name}',
+            description=self.__doc__,
+            epilog="Інші аргументи (-c, -d, --db_host, ...) передаються конфігурації Odoo.",
+        )
+        parser.add_argument('--path', dest='paths', action='append', required=True,
+                            help="Файл або каталог з документами; можна вказати кілька разів")
+        args, odoo_args = parser.parse_known_args(cmdargs)
+        config.parse_config(odoo_args)
+        dbname = config['db_name']
+        if not dbname:
+            parser.error("Вкажіть базу даних (-d)")
+
+        registry = Registry(dbname)
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            archive_import_model = env['electricity.price.archive.import']
+            for path in args.paths:
+                path = os.path.abspath(path)
+                # Незавершений імпорт того самого шляху продовжується з місця зупинки
+                archive_import = archive_import_model.search(
+                    [('source_path', '=', path), ('state', '!=', 'done')], limit=1)
+                if not archive_import:
+                    archive_import = archive_import_model.create({'name': path, 'source_path': path})
+                    cr.commit()
+                if not archive_import._process():
+                    print(f"{path}: імпорт вже виконується іншим процесом")
+                    continue
+                print(f"{path}: {archive_import.state}, документів {archive_import.document_count} "
+                      f"(з помилками {archive_import.failed_count}), цін {archive_import.prices_saved}")
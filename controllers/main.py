@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+# Потокове вивантаження цін за діапазон дат у форматі CSV або JSON Lines
+
+from odoo import fields, http
+from odoo.http import request
+from werkzeug.exceptions import BadRequest
+from werkzeug.wrappers import Response
+import csv
+import io
+import json
+import logging
+import zlib
+
+_logger = logging.getLogger(__name__)
+
+# Кількість рядків, що читаються з серверного курсора за один раз
+EXPORT_BATCH_SIZE = 5000
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+# long - рядок на годину; country - колонка на країну; hour - колонка на годину
+EXPORT_LAYOUTS = ('long', 'country', 'hour')
+
+_ORDER_BY = {
+    'long': 'p.country_id, p.price_date, p.hour',
+    'hour': 'p.country_id, p.price_date, p.hour',
+    'country': 'p.price_date, p.hour, p.country_id',
+}
+
+
+def _fetch_batches(cr, query, params):
+    """
+    Читання результату запиту пакетами через серверний курсор PostgreSQL,
+    щоб пам'ять не залежала від розміру діапазону.
+    """
+    cr.execute(f"DECLARE price_export NO SCROLL CURSOR FOR {query}", params)
+    try:
+        while True:
+            cr.execute("FETCH %s FROM price_export", (EXPORT_BATCH_SIZE,))
+            rows = cr.fetchall()
+            if not rows:
+                return
+            yield rows
+    finally:
+        cr.execute("CLOSE price_export")
+
+
+def _group_consecutive(batches, key_size):
+    """
+    Групування впорядкованого потоку рядків за першими key_size колонками.
+
+    :return: Генератор пар (ключ, список решти колонок)
+    """
+    current_key = None
+    group = []
+    for rows in batches:
+        for row in rows:
+            key = row[:key_size]
+            if key != current_key:
+                if group:
+                    yield current_key, group
+                current_key = key
+                group = []
+            group.append(row[key_size:])
+    if group:
+        yield current_key, group
+
+
+class ElectricityPriceExportController(http.Controller):
+
+    @http.route('/hd_electricity_price/prices/export', type='http', auth='user', methods=['GET'])
+    def export_prices(self, date_from, date_to, countries=None, format='csv', layout='long', **kwargs):
+        """
+        Вивантаження погодинних цін.
+
+        :param date_from: Перша дата (YYYY-MM-DD)
+        :param date_to: Остання дата включно (YYYY-MM-DD)
+        :param countries: Коди країн через кому (ISO 3166-1 alpha-2); за замовчуванням -
+                          усі країни з доменом ENTSO-E
+        :param format: csv або jsonl
+        :param layout: long - рядок на годину, country - колонка на країну,
+                       hour - колонка на годину
+        """
+        if format not in EXPORT_FORMATS:
+            raise BadRequest("format: очікується одне з %s" % ', '.join(EXPORT_FORMATS))
+        if layout not in EXPORT_LAYOUTS:
+            raise BadRequest("layout: очікується одне з %s" % ', '.join(EXPORT_LAYOUTS))
+        try:
+            date_from = fields.Date.to_date(date_from)
+            date_to = fields.Date.to_date(date_to)
+        except ValueError as e:
+            raise BadRequest("Некоректна дата: %s" % e)
+        if date_from > date_to:
+            raise BadRequest("date_from не може бути пізніше date_to")
+
+        request.env['electricity.price.rdn'].check_access('read')
+        country_domain = [('entsoe_domain_id', '!=', False)]
+        if countries:
+            codes = [code.strip().upper() for code in countries.split(',') if code.strip()]
+            country_domain = [('code', 'in', codes)]
+        country_records = request.env['res.country'].search(country_domain, order='code')
+        if not country_records:
+            raise BadRequest("Не знайдено жодної країни")
+        codes = {country.id: country.code for country in country_records}
+
+        writer = _CsvWriter if format == 'csv' else _JsonLinesWriter
+        chunks = self._stream_rows(
+            request.env.registry, writer(layout, [codes[country_id] for country_id in country_records.ids]),
+            layout, codes, date_from, date_to)
+
+        headers = [
+            ('Content-Type', EXPORT_FORMATS[format]),
+            ('Content-Disposition', 'attachment; filename="prices_%s_%s.%s"' % (date_from, date_to, format)),
+        ]
+        if 'gzip' in request.httprequest.headers.get('Accept-Encoding', ''):
+            chunks = _gzip_stream(chunks)
+            headers.append(('Content-Encoding', 'gzip'))
+        return Response(chunks, headers=headers, direct_passthrough=True)
+
+    @staticmethod
+    def _stream_rows(registry, writer, layout, codes, date_from, date_to):
+        # Курсор запиту закривається до початку передачі відповіді,
+        # тому генератор читає дані у власному курсорі
+        query = f"""
+            SELECT p.country_id, p.price_date, p.hour, p.price
+              FROM electricity_price_rdn p
+             WHERE p.country_id = ANY(%(country_ids)s)
+               AND p.price_date BETWEEN %(date_from)s AND %(date_to)s
+             ORDER BY {_ORDER_BY[layout]}
+        """
+        params = {'country_ids': list(codes), 'date_from': date_from, 'date_to': date_to}
+        with registry.cursor() as cr:
+            yield writer.header()
+            batches = _fetch_batches(cr, query, params)
+            if layout == 'long':
+                for rows in batches:
+                    yield writer.rows((codes[country_id], price_date, hour, price)
+                                      for country_id, price_date, hour, price in rows)
+            elif layout == 'hour':
+                for (country_id, price_date), group in _group_consecutive(batches, 2):
+                    prices = [None] * 24
+                    for hour, price in group:
+                        if 0 <= hour < 24:
+                            prices[hour] = price
+                    yield writer.rows([(codes[country_id], price_date, prices)])
+            else:
+                for (price_date, hour), group in _group_consecutive(batches, 2):
+                    prices = {codes[country_id]: price for country_id, price in group}
+                    yield writer.rows([(price_date, hour, prices)])
+
+
+def _gzip_stream(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _CsvWriter:
+    """
+    Перетворення рядків вивантаження у байти CSV.
+    """
+
+    def __init__(self, layout, codes):
+        self.layout = layout
+        self.codes = codes
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator='\n')
+
+    def _flush(self):
+        data = self.buffer.getvalue().encode('utf-8')
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+    def header(self):
+        if self.layout == 'long':
+            self.writer.writerow(['country', 'date', 'hour', 'price'])
+        elif self.layout == 'hour':
+            self.writer.writerow(['country', 'date'] + ['h%02d' % hour for hour in range(24)])
+        else:
+            self.writer.writerow(['date', 'hour'] + self.codes)
+        return self._flush()
+
+    def rows(self, rows):
+        if self.layout == 'long':
+            self.writer.writerows(rows)
+        elif self.layout == 'hour':
+            self.writer.writerows([code, price_date] + ['' if price is None else price for price in prices]
+                                  for code, price_date, prices in rows)
+        else:
+            self.writer.writerows([price_date, hour] + [prices.get(code, '') for code in self.codes]
+                                  for price_date, hour, prices in rows)
+        return self._flush()
+
+
+class _JsonLinesWriter:
+    """
+    Перетворення рядків вивантаження у байти JSON Lines.
+    """
+
+    def __init__(self, layout, codes):
+        self.layout = layout
+        self.codes = codes
+
+    def header(self):
+        return b''
+
+    def rows(self, rows):
+        if self.layout == 'long':
+            lines = ({'country': code, 'date': str(price_date), 'hour': hour, 'price': price}
+                     for code, price_date, hour, price in rows)
+        elif self.layout == 'hour':
+            lines = ({'country': code, 'date': str(price_date), 'prices': prices}
+                     for code, price_date, prices in rows)
+        else:
+            lines = ({'date': str(price_date), 'hour': hour, 'prices': {code: prices.get(code) for code in self.codes}}
+                     for price_date, hour, prices in rows)
+        return ''.join(json.dumps(line) + '\n' for line in lines).encode('utf-8')
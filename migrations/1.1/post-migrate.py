@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Згортання дублікатів api_response_raw у дедупліковані записи electricity.price.raw.document
+
+from odoo import api, SUPERUSER_ID
+from odoo.tools.sql import column_exists, table_exists
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    # При оновленні одразу до 1.3 таблиця вже перейменована (migrations/1.3/pre-migrate.py)
+    table = 'electricity_price_rdn_legacy' if table_exists(cr, 'electricity_price_rdn_legacy') else 'electricity_price_rdn'
+    if not version or not column_exists(cr, table, 'api_response_raw'):
+        return
+    cr.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS raw_document_id integer")
+
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    raw_document_model = env['electricity.price.raw.document']
+
+    # Одна група на кожен унікальний текст відповіді
+    cr.execute(f"""
+        SELECT md5(api_response_raw), min(id), min(entsoe_domain_id),
+               min(price_date), max(price_date), min(create_date)
+          FROM {table}
+         WHERE api_response_raw IS NOT NULL
+         GROUP BY md5(api_response_raw)
+    """)
+    groups = cr.fetchall()
+    _logger.info("Міграція сирих відповідей API: %s унікальних документів", len(groups))
+
+    cr.execute("CREATE TEMP TABLE raw_document_migration (digest varchar PRIMARY KEY, document_id integer) ON COMMIT DROP")
+    for digest, sample_id, domain_id, date_from, date_to, fetch_date in groups:
+        cr.execute(f"SELECT api_response_raw FROM {table} WHERE id = %s", (sample_id,))
+        raw_response = cr.fetchone()[0]
+        document = raw_document_model._store_response(raw_response, domain_id, date_from, date_to, fetch_date)
+        cr.execute("INSERT INTO raw_document_migration VALUES (%s, %s)", (digest, document.id))
+
+    env.flush_all()
+    cr.execute(f"""
+        UPDATE {table} p
+           SET raw_document_id = m.document_id
+          FROM raw_document_migration m
+         WHERE p.api_response_raw IS NOT NULL
+           AND md5(p.api_response_raw) = m.digest
+    """)
+    _logger.info("Міграція сирих відповідей API: оновлено %s записів цін", cr.rowcount)
+
+    cr.execute(f"ALTER TABLE {table} DROP COLUMN api_response_raw")
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+# Початкове заповнення денних і місячних агрегатів з наявних погодинних цін
+
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['electricity.price.rdn.daily']._rebuild_all()
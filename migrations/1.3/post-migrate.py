@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# Перенесення погодинних цін зі старої таблиці у добові ряди electricity_price_series
+
+from odoo import api, SUPERUSER_ID
+from odoo.tools.sql import table_exists
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    if not version or not table_exists(cr, 'electricity_price_rdn_legacy'):
+        return
+
+    cr.execute("""
+        INSERT INTO electricity_price_series (
+            country_id, entsoe_domain_id, price_date, resolution, prices, raw_document_id,
+            create_uid, create_date, write_uid, write_date
+        )
+        SELECT d.country_id, d.entsoe_domain_id, d.price_date, 60,
+               ARRAY(
+                   SELECT l.price
+                     FROM generate_series(0, 23) AS h(hour)
+                     LEFT JOIN electricity_price_rdn_legacy l
+                       ON l.country_id = d.country_id AND l.price_date = d.price_date AND l.hour = h.hour
+                    ORDER BY h.hour
+               ),
+               d.raw_document_id, d.create_uid, d.create_date, d.write_uid, d.write_date
+          FROM (
+              SELECT country_id, price_date, max(entsoe_domain_id) AS entsoe_domain_id,
+                     max(raw_document_id) AS raw_document_id,
+                     min(create_uid) AS create_uid, min(create_date) AS create_date,
+                     max(write_uid) AS write_uid, max(write_date) AS write_date
+                FROM electricity_price_rdn_legacy
+               WHERE hour BETWEEN 0 AND 23
+               GROUP BY country_id, price_date
+          ) d
+        ON CONFLICT (country_id, price_date, resolution) DO NOTHING
+    """)
+    _logger.info("Міграція цін у добові ряди: створено %s рядів", cr.rowcount)
+    cr.execute("DROP TABLE electricity_price_rdn_legacy")
+
+    # Агрегати версії 1.2 могли бути перебудовані до перенесення цін
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['electricity.price.rdn.daily']._rebuild_all()
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+# Погодинна таблиця цін стає SQL-представленням над electricity_price_series:
+# стара таблиця перейменовується, щоб ORM міг створити на її місці представлення
+
+from odoo.tools.sql import table_kind, TableKind
+
+
+def migrate(cr, version):
+    if not version or table_kind(cr, 'electricity_price_rdn') != TableKind.Regular:
+        return
+    cr.execute("ALTER TABLE electricity_price_rdn RENAME TO electricity_price_rdn_legacy")
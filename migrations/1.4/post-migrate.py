@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Часові пояси для доменів, створених користувачами (домени модуля отримують tz
+# з файлу даних), та повторне завантаження цін, збережених з фіксованим зсувом UTC+2
+
+from odoo import api, SUPERUSER_ID
+import logging
+
+import pytz
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    cr.execute("""
+        SELECT d.id, upper(c.code)
+          FROM electricity_entsoe_domain d
+          JOIN res_country c ON c.id = d.country_id
+         WHERE NOT EXISTS (
+               SELECT 1 FROM ir_model_data m
+                WHERE m.model = 'electricity.entsoe.domain' AND m.res_id = d.id
+         )
+    """)
+    timezones = {
+        domain_id: pytz.country_timezones[code][0]
+        for domain_id, code in cr.fetchall()
+        if pytz.country_timezones.get(code)
+    }
+    if timezones:
+        cr.execute("""
+            UPDATE electricity_entsoe_domain d
+               SET tz = t.tz
+              FROM unnest(%s::int[], %s::varchar[]) AS t(id, tz)
+             WHERE d.id = t.id
+        """, (list(timezones), list(timezones.values())))
+    _logger.info("Встановлено часові пояси для %s доменів ENTSO-E без XML id", len(timezones))
+
+    # Ціни, збережені з фіксованим зсувом, вважаються повними, тож крон пропусків
+    # їх не оновить: завантажуємо весь збережений період кожної країни повторно
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    cr.execute("""
+        SELECT s.country_id, min(s.price_date), max(s.price_date)
+          FROM electricity_price_series s
+          JOIN res_country c ON c.id = s.country_id
+         WHERE c.entsoe_domain_id IS NOT NULL
+         GROUP BY s.country_id
+    """)
+    import_job = env['electricity.price.import.job']
+    for country_id, date_from, date_to in cr.fetchall():
+        import_job._enqueue(env['res.country'].browse(country_id), date_from, date_to)
+        _logger.info("Поставлено в чергу повторне завантаження цін країни %s за %s - %s",
+                     country_id, date_from, date_to)
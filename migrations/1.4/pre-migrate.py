@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+# Дані доменів мають noupdate: на час оновлення знімаємо позначку з доменів модуля,
+# щоб файл даних встановив їм поле tz, що з'явилось у цій версії. Після
+# завантаження файлу позначка noupdate повертається
+
+def migrate(cr, version):
+    if not version:
+        return
+    cr.execute("""
+        UPDATE ir_model_data
+           SET noupdate = false
+         WHERE module = 'hd_electricity_price' AND model = 'electricity.entsoe.domain'
+    """)
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+# Перерахунок домену ENTSO-E у рядах цін, що розійшлися з доменом країни до появи залежності
+
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    recompute_model = env['electricity.price.domain.recompute']
+    stale = recompute_model._count_stale()
+    recompute_model._enqueue(env['res.country'].browse(list(stale)))
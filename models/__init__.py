@@ -1,4 +1,13 @@
 from . import entsoe_domain
 from . import res_country_extension
+from . import electricity_price_raw_document
+from . import electricity_price_series
+from . import electricity_price_series_archive
 from . import electricity_price
+from . import electricity_price_aggregate
+from . import electricity_price_analytics
+from . import electricity_price_fetch_log
+from . import electricity_price_archive_import
+from . import electricity_price_import_job
+from . import electricity_price_domain_recompute
 from . import res_config_settings
\ No newline at end of file
@@ -1,88 +1,371 @@
 # -*- coding: utf-8 -*-
 # Модель для зберігання цін на електроенергію та логіка API-інтеграції
 
-from odoo import fields, models, api, _
+from odoo import fields, models, api, tools, _
 from odoo.exceptions import UserError
-from datetime import datetime, timedelta
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, time, timedelta
+from time import perf_counter
+import math
+import os
 import requests
-import xml.etree.ElementTree as ET
 import logging
 
+from ..tools.entsoe_client import get_client
+from ..tools.entsoe_parser import EntsoeAcknowledgement, ParseError, iter_periods
+from ..tools.local_time import local_slots
+from ..tools.rate_limiter import get_rate_limiter
+from .electricity_price_series import HOURLY_VIEW_QUERY, MINUTES_PER_DAY, SERIES_RESOLUTIONS
+from .entsoe_domain import DEFAULT_DOMAIN_TIMEZONE
+
 _logger = logging.getLogger(__name__)
 
+# Максимальна довжина діапазону (днів) одного запиту A44; API дозволяє до одного року,
+# залишаємо запас на зсув періоду запиту для часових поясів
+ENTSOE_MAX_RANGE_DAYS = 360
+# Квота ENTSO-E Transparency Platform - 400 запитів на хвилину
+ENTSOE_DEFAULT_RATE_LIMIT = 400
+ENTSOE_DEFAULT_FETCH_WORKERS = 4
+# Кеш відповідей API: час життя незавершених періодів (с) та максимальний розмір (МБ)
+ENTSOE_DEFAULT_CACHE_TTL = 3600
+ENTSOE_DEFAULT_CACHE_MAX_MB = 200
+
+# Автоматичне завантаження: глибина пошуку пропусків (днів) та година UTC,
+# після якої ціни на завтра вже мають бути опубліковані
+DEFAULT_GAP_LOOKBACK_DAYS = 7
+DEFAULT_PUBLISH_HOUR_UTC = 12
+
+NAN = float('nan')
+
+# Поля, зміна яких робить недійсним кеш get_price/get_prices
+PRICE_LOOKUP_FIELDS = {'country_id', 'price_date', 'hour', 'price'}
+# Ключ cr.precommit.data з парами (країна, дата), змінними в поточній транзакції
+PRICE_LOOKUP_CHANGED_KEY = 'hd_electricity_price.price_lookup_changed'
+# Таблиця поколінь кешу цін: покоління країни входить у ключ кешу get_price/get_prices.
+# Покоління беруться з послідовності, тож значення з відкоченої транзакції не повторюються
+PRICE_LOOKUP_GENERATION_TABLE = 'electricity_price_lookup_generation'
+PRICE_LOOKUP_GENERATION_SEQUENCE = 'electricity_price_lookup_generation_seq'
+
 
 class ElectricityPriceRdn(models.Model):
+    """
+    Погодинні ціни. Дані зберігаються в electricity.price.series (один рядок
+    на країну, дату та роздільну здатність), ця модель - SQL-представлення
+    над рядами, тому створення, зміна та видалення записів переадресовуються
+    у відповідні ряди.
+    """
     _name = 'electricity.price.rdn'
     _description = 'Ціна Електроенергії РДН'
     _order = 'price_date desc, hour asc'
+    _auto = False
 
     country_id = fields.Many2one('res.country', string='Країна', required=True,
                                  help="Країна, для якої завантажено ціну")
-
-    # Змінено з related на обчислюване поле (computed field)
-    entsoe_domain_id = fields.Many2one(
-        'electricity.entsoe.domain',
-        string='Домен ENTSO-E',
-        compute='_compute_entsoe_domain_id',  # Вказуємо метод для обчислення
-        store=True,  # Зберігати обчислене значення в базі даних
-        readonly=True,  # Поле буде тільки для читання
-        help="Домен ENTSO-E, що обчислюється на основі обраної країни."
-    )
-
+    entsoe_domain_id = fields.Many2one('electricity.entsoe.domain', string='Домен ENTSO-E', readonly=True,
+                                       help="Домен ENTSO-E, що обчислюється на основі обраної країни.")
     price_date = fields.Date(string='Дата', required=True, help="Дата, до якої відноситься ціна")
-    hour = fields.Integer(string='Година', required=True, help="Година (0-23) за місцевим часом домену")
+    hour = fields.Integer(string='Година', required=True,
+                          help="Година (0-23) за місцевим часом домену; 24 - повторна година "
+                               "доби переходу на зимовий час")
     price = fields.Float(string='Ціна (EUR/MWh)', required=True, digits=(10, 4),
                          help="Ціна електроенергії за мегават-годину")
-    api_response_raw = fields.Text(string='Сира відповідь API', readonly=True,
-                                   help="Сира XML-відповідь від API для перевірки")
+    series_id = fields.Many2one('electricity.price.series', string='Ряд цін', readonly=True)
+    domain_stale = fields.Boolean(related='series_id.domain_stale', string='Застарілий домен')
+    raw_document_id = fields.Many2one('electricity.price.raw.document', string='Сира відповідь API',
+                                      readonly=True,
+                                      help="Збережена (стиснена) XML-відповідь API, з якої отримано ціну")
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("CREATE OR REPLACE VIEW electricity_price_rdn AS (%s)"
+                            % HOURLY_VIEW_QUERY.format(series_table='electricity_price_series'))
+        self.env.cr.execute(f"CREATE SEQUENCE IF NOT EXISTS {PRICE_LOOKUP_GENERATION_SEQUENCE}")
+        self.env.cr.execute(f"""
+            CREATE TABLE IF NOT EXISTS {PRICE_LOOKUP_GENERATION_TABLE} (
+                country_id integer PRIMARY KEY REFERENCES res_country(id) ON DELETE CASCADE,
+                generation bigint NOT NULL DEFAULT 0
+            )
+        """)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.check_access('create')
+        prices = {}
+        keys = []
+        for vals in vals_list:
+            missing = [name for name in ('country_id', 'price_date', 'hour', 'price') if vals.get(name) is None]
+            if missing:
+                raise UserError(_("Не заповнено обов'язкові поля: %s") % ', '.join(missing))
+            key = (vals['country_id'], fields.Date.to_date(vals['price_date']), vals['hour'])
+            prices.setdefault(key[0], {})[key[1:]] = vals['price']
+            keys.append(key)
+        series_model = self.env['electricity.price.series']
+        for country_id, country_prices in prices.items():
+            series_model._set_hour_prices(country_id, country_prices)
+        return self._browse_keys(keys)
+
+    def write(self, vals):
+        if not PRICE_LOOKUP_FIELDS.intersection(vals):
+            return True
+        self.check_access('write')
+        prices = {}
+        for record in self:
+            old_key = (record.country_id.id, record.price_date, record.hour)
+            new_key = (
+                vals.get('country_id', old_key[0]),
+                fields.Date.to_date(vals['price_date']) if 'price_date' in vals else old_key[1],
+                vals.get('hour', old_key[2]),
+            )
+            if new_key != old_key:
+                prices.setdefault(old_key[0], {}).setdefault(old_key[1:], None)
+            prices.setdefault(new_key[0], {})[new_key[1:]] = vals.get('price', record.price)
+        series_model = self.env['electricity.price.series']
+        for country_id, country_prices in prices.items():
+            series_model._set_hour_prices(country_id, country_prices)
+        return True
+
+    def unlink(self):
+        self.check_access('unlink')
+        prices = {}
+        for record in self:
+            prices.setdefault(record.country_id.id, {})[(record.price_date, record.hour)] = None
+        series_model = self.env['electricity.price.series']
+        for country_id, country_prices in prices.items():
+            series_model._set_hour_prices(country_id, country_prices)
+        return True
 
-    _sql_constraints = [
-        ('unique_price_per_hour', 'unique(country_id, price_date, hour)',
-         'Ціна для цієї країни, дати та години вже існує!'),
-    ]
+    @api.model
+    def _browse_keys(self, keys):
+        """
+        Записи представлення за ключами (country_id, price_date, hour) у порядку ключів.
+        """
+        if not keys:
+            return self.browse()
+        self.env.cr.execute("""
+            SELECT p.country_id, p.price_date, p.hour, p.id
+              FROM unnest(%s::int[], %s::date[], %s::int[]) AS k(country_id, price_date, hour)
+              JOIN electricity_price_rdn p
+                ON p.country_id = k.country_id AND p.price_date = k.price_date AND p.hour = k.hour
+        """, ([key[0] for key in keys], [key[1] for key in keys], [key[2] for key in keys]))
+        ids = {row[:3]: row[3] for row in self.env.cr.fetchall()}
+        return self.browse([ids[key] for key in keys if key in ids])
+
+    # ------------------------------------------------------------------
+    # API швидкого пошуку цін
+    # ------------------------------------------------------------------
 
-    # Метод для обчислення значення entsoe_domain_id
-    @api.depends('country_id')  # Цей метод буде викликатися при зміні country_id
-    def _compute_entsoe_domain_id(self):
-        for record in self:
-            if record.country_id and record.country_id.entsoe_domain_id:
-                record.entsoe_domain_id = record.country_id.entsoe_domain_id
-            else:
-                record.entsoe_domain_id = False
+    @api.model
+    def _invalidate_price_lookup(self, keys):
+        """
+        Скидання кешу цін змінених країн. Змінені пари (країна, дата)
+        збираються до фіксації транзакції й до неї читаються в обхід кешу;
+        перед фіксацією (precommit) країни отримують нове покоління кешу, тож
+        усі воркери після фіксації читають ціни під новим ключем кешу. Інші
+        кеші реєстру не скидаються. Покоління відкоченої транзакції більше не
+        видається, тож закешовані в ній ціни ніколи не будуть прочитані.
+
+        :param keys: Пари (country_id, price_date), ціни яких змінились
+        """
+        precommit = self.env.cr.precommit
+        changed = precommit.data.get(PRICE_LOOKUP_CHANGED_KEY)
+        if changed is None:
+            changed = precommit.data[PRICE_LOOKUP_CHANGED_KEY] = set()
+            precommit.add(self._bump_price_lookup_generation)
+        changed.update(keys)
+
+    def _bump_price_lookup_generation(self):
+        changed = self.env.cr.precommit.data.get(PRICE_LOOKUP_CHANGED_KEY)
+        country_ids = sorted({country_id for country_id, _day in changed or ()})
+        if not country_ids:
+            return
+        self.env.cr.execute(f"""
+            INSERT INTO {PRICE_LOOKUP_GENERATION_TABLE} (country_id, generation)
+            SELECT country_id, nextval('{PRICE_LOOKUP_GENERATION_SEQUENCE}')
+              FROM unnest(%s::int[]) AS c(country_id)
+            ON CONFLICT (country_id) DO UPDATE SET generation = EXCLUDED.generation
+        """, (country_ids,))
+
+    def _get_price_lookup_generation(self, country_id):
+        self.env.cr.execute(f"SELECT generation FROM {PRICE_LOOKUP_GENERATION_TABLE} WHERE country_id = %s",
+                            (country_id,))
+        row = self.env.cr.fetchone()
+        return row[0] if row else 0
+
+    def _lookup_day_series(self, country_id, day, generation):
+        changed = self.env.cr.precommit.data.get(PRICE_LOOKUP_CHANGED_KEY)
+        if changed and (country_id, day) in changed:
+            return self._read_day_series(country_id, day)
+        return self._get_day_series(country_id, day, generation)
+
+    @tools.ormcache('country_id', 'day', 'generation')
+    def _get_day_series(self, country_id, day, generation):
+        """
+        Ціни країни за добу, кешовані в LRU-кеші реєстру поточного воркера.
+        Покоління кешу країни в ключі робить недійсними записи, збережені до
+        зміни цін; старі записи витісняються з LRU-кешу.
+        Результат спільний для всіх викликів, його не можна змінювати.
+        """
+        return self._read_day_series(country_id, day)
+
+    def _read_day_series(self, country_id, day):
+        """
+        :return: array('d') з 24 цін за годинами, NaN для відсутніх годин
+        """
+        self.env.cr.execute("""
+            SELECT hour, price
+              FROM electricity_price_rdn
+             WHERE country_id = %s AND price_date = %s
+        """, (country_id, day))
+        series = array('d', [NAN] * 24)
+        for hour, price in self.env.cr.fetchall():
+            if 0 <= hour < 24:
+                series[hour] = price
+        return series
+
+    @api.model
+    def get_price(self, country, dt):
+        """
+        Ціна для країни на певну годину.
+
+        :param country: Країна (запис res.country або її ID)
+        :param dt: datetime за місцевим часом домену
+        :return: Ціна (EUR/MWh) або None, якщо ціна не завантажена
+        """
+        self.check_access('read')
+        country_id = country.id if isinstance(country, models.BaseModel) else country
+        generation = self._get_price_lookup_generation(country_id)
+        price = self._lookup_day_series(country_id, dt.date(), generation)[dt.hour]
+        return None if math.isnan(price) else price
+
+    @api.model
+    def get_prices(self, country, date_from, date_to):
+        """
+        Погодинні ціни країни за діапазон дат.
+
+        :param country: Країна (запис res.country або її ID)
+        :param date_from: Перша дата (date object)
+        :param date_to: Остання дата включно (date object)
+        :return: array('d') довжиною 24 * кількість днів; індекс = день * 24 + година,
+                 NaN для відсутніх годин
+        """
+        self.check_access('read')
+        country_id = country.id if isinstance(country, models.BaseModel) else country
+        generation = self._get_price_lookup_generation(country_id)
+        series = array('d')
+        day = date_from
+        while day <= date_to:
+            series.extend(self._lookup_day_series(country_id, day, generation))
+            day += timedelta(days=1)
+        return series
 
     @api.model
     def _cron_fetch_daily_prices(self):
         """
         Автоматичне завантаження цін для всіх країн з налаштованими доменами ENTSO-E.
         Викликається за розкладом.
+
+        Завантажуються лише відсутні або неповні дні у вікні
+        hd_electricity_price.gap_lookback_days днів, а також завтрашній день,
+        якщо ціни на добу наперед вже мали бути опубліковані.
         """
         _logger.info("Початок автоматичного завантаження цін на електроенергію")
 
-        # Отримання всіх країн з налаштованими доменами ENTSO-E
-        countries_with_domains = self.env['res.country'].search([
-            ('entsoe_domain_id', '!=', False)
-        ])
-
-        if not countries_with_domains:
-            _logger.warning("Не знайдено країн з налаштованими доменами ENTSO-E")
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        lookback_days = int(get_param('hd_electricity_price.gap_lookback_days', DEFAULT_GAP_LOOKBACK_DAYS)
+                            or DEFAULT_GAP_LOOKBACK_DAYS)
+        publish_hour = int(get_param('hd_electricity_price.day_ahead_publish_hour_utc', DEFAULT_PUBLISH_HOUR_UTC)
+                           or DEFAULT_PUBLISH_HOUR_UTC)
+
+        today = fields.Date.today()
+        date_from = today - timedelta(days=lookback_days)
+        date_to = today
+        if fields.Datetime.now().hour >= publish_hour:
+            date_to = today + timedelta(days=1)
+
+        gaps = self._find_missing_days(date_from, date_to)
+        if not gaps:
+            _logger.info("Усі ціни за %s - %s вже завантажено", date_from, date_to)
             return
 
-        # Завантаження цін для вчорашнього дня (дані зазвичай доступні наступного дня)
-        target_date = fields.Date.today() - timedelta(days=1)
+        jobs = self._merge_gap_ranges(gaps)
+        _logger.info("Знайдено %s неповних днів, %s діапазонів для завантаження", len(gaps), len(jobs))
 
         success_count = 0
         error_count = 0
 
-        for country in countries_with_domains:
-            try:
-                self._fetch_and_store_prices(country.id, target_date)
-                success_count += 1
-                _logger.info(f"Успішно завантажено ціни для {country.name} на {target_date}")
-            except Exception as e:
+        # Мережева частина виконується паралельно, запис - у курсорі крону.
+        # Дні відомі як неповні, тож кешована відповідь (можливо, опублікована
+        # частково) не використовується
+        saved, errors = self._fetch_and_store_parallel(jobs, use_cache=False)
+
+        for country, range_from, range_to in jobs:
+            if country.id in errors:
                 error_count += 1
-                _logger.error(f"Помилка завантаження цін для {country.name} на {target_date}: {e}")
+            elif saved.get(country.id):
+                success_count += 1
+                _logger.info("Успішно завантажено ціни для %s на %s - %s", country.name, range_from, range_to)
+            else:
+                _logger.warning("Не отримано даних про ціни для %s на %s - %s", country.name, range_from, range_to)
 
-        _logger.info(f"Завершено автоматичне завантаження. Успішно: {success_count}, Помилок: {error_count}")
+        _logger.info("Завершено автоматичне завантаження. Успішно: %s, Помилок: %s", success_count, error_count)
+
+    @api.model
+    def _find_missing_days(self, date_from, date_to, country_ids=None):
+        """
+        Пошук одним SQL-запитом усіх пар (країна, дата) у діапазоні, для яких
+        збережено менше годин, ніж очікується. Тривалість доби розраховується
+        за часовим поясом домену країни: 23-годинній добі переходу на літній
+        час достатньо 23 записів; у 25-годинній добі повторна година (з номером
+        24) не враховується, тож доба без однієї зі звичайних годин теж
+        вважається неповною.
+
+        :param date_from: Перша дата (date object)
+        :param date_to: Остання дата включно (date object)
+        :param country_ids: ID країн для перевірки (None - усі країни з доменом ENTSO-E)
+        :return: Список пар (country_id, date), впорядкований за країною та датою
+        """
+        self.flush_model()
+        self.env.cr.execute("""
+            WITH counts AS (
+                SELECT country_id, price_date, count(*) FILTER (WHERE hour < 24) AS hours
+                  FROM electricity_price_rdn
+                 WHERE price_date BETWEEN %(date_from)s AND %(date_to)s
+                 GROUP BY country_id, price_date
+            )
+            SELECT c.id, d.day::date
+              FROM res_country c
+              JOIN electricity_entsoe_domain e ON e.id = c.entsoe_domain_id
+             CROSS JOIN generate_series(%(date_from)s::date, %(date_to)s::date, interval '1 day') AS d(day)
+              LEFT JOIN counts p ON p.country_id = c.id AND p.price_date = d.day::date
+             WHERE (%(country_ids)s IS NULL OR c.id = ANY(%(country_ids)s))
+               AND coalesce(p.hours, 0) < least(24, extract(epoch FROM
+                       ((d.day + interval '1 day')::timestamp AT TIME ZONE coalesce(e.tz, %(tz)s))
+                       - (d.day::timestamp AT TIME ZONE coalesce(e.tz, %(tz)s))) / 3600)
+             ORDER BY c.id, d.day
+        """, {'date_from': date_from, 'date_to': date_to, 'tz': DEFAULT_DOMAIN_TIMEZONE,
+              'country_ids': list(country_ids) if country_ids is not None else None})
+        return self.env.cr.fetchall()
+
+    @api.model
+    def _merge_gap_ranges(self, gaps):
+        """
+        Об'єднання послідовних днів однієї країни в діапазони для запитів.
+
+        :param gaps: Список пар (country_id, date), впорядкований за країною та датою
+        :return: Список кортежів (country, date_from, date_to)
+        """
+        ranges = []
+        for country_id, day in gaps:
+            if ranges and ranges[-1][0] == country_id and ranges[-1][2] + timedelta(days=1) == day:
+                ranges[-1][2] = day
+            else:
+                ranges.append([country_id, day, day])
+        countries = self.env['res.country'].browse([country_id for country_id, _from, _to in ranges])
+        return [
+            (country, range_from, range_to)
+            for country, (_country_id, range_from, range_to) in zip(countries, ranges)
+        ]
 
     @api.model
     def _fetch_and_store_prices(self, country_id, target_date):
@@ -92,17 +375,66 @@ class ElectricityPriceRdn(models.Model):
         :param country_id: ID країни
         :param target_date: Дата для завантаження (date object)
         """
-        # Отримання країни та її домену ENTSO-E
         country = self.env['res.country'].browse(country_id)
+        prices_saved = self._fetch_and_store_range(country, target_date, target_date)
+
+        if prices_saved == 0:
+            _logger.warning("Не знайдено даних про ціни для дати %s", target_date)
+            raise UserError(_("Не отримано даних про ціни для %s на %s") % (country.name, target_date))
+
+    @api.model
+    def _fetch_and_store_range(self, country, date_from, date_to):
+        """
+        Завантаження та збереження цін для країни за діапазон дат.
+        Діапазон ділиться на найбільші частини, дозволені API ENTSO-E,
+        кожна частина завантажується одним запитом.
+
+        :param country: Країна (запис res.country або її ID)
+        :param date_from: Перша дата діапазону (date object)
+        :param date_to: Остання дата діапазону включно (date object)
+        :return: Кількість збережених записів
+        """
+        if isinstance(country, int):
+            country = self.env['res.country'].browse(country)
         if not country.exists():
             raise UserError(_("Країна не знайдена"))
 
         if not country.entsoe_domain_id:
             raise UserError(_("Для країни %s не налаштовано домен ENTSO-E") % country.name)
 
-        domain_code = country.entsoe_domain_id.domain_code
+        if date_from > date_to:
+            raise UserError(_("Дата початку не може бути пізніше дати завершення"))
+
+        prices_saved = 0
+        for chunk_from, chunk_to in self._split_date_range(date_from, date_to):
+            prices_saved += self._fetch_and_store_chunk(country, chunk_from, chunk_to)
+
+        _logger.info("Збережено %s записів цін для %s за %s - %s", prices_saved, country.name, date_from, date_to)
+        return prices_saved
+
+    @api.model
+    def _split_date_range(self, date_from, date_to, max_days=ENTSOE_MAX_RANGE_DAYS):
+        """
+        Розбиття діапазону дат на частини не довші за max_days днів
+        (за замовчуванням - найбільший діапазон одного запиту API).
+
+        :return: Список пар (chunk_from, chunk_to), обидві дати включно
+        """
+        chunks = []
+        chunk_from = date_from
+        while chunk_from <= date_to:
+            chunk_to = min(chunk_from + timedelta(days=max_days - 1), date_to)
+            chunks.append((chunk_from, chunk_to))
+            chunk_from = chunk_to + timedelta(days=1)
+        return chunks
 
-        # Отримання налаштувань API
+    @api.model
+    def _get_api_settings(self):
+        """
+        Отримання налаштувань API ENTSO-E.
+
+        :return: Кортеж (api_base_url, api_token)
+        """
         api_base_url = self.env['ir.config_parameter'].sudo().get_param(
             'hd_electricity_price.entsoe_api_base_url',
             'https://web-api.tp.entsoe.eu/api'
@@ -114,231 +446,313 @@ class ElectricityPriceRdn(models.Model):
         if not api_token:
             raise UserError(_("Не налаштовано токен API ENTSO-E. Перейдіть до Налаштування модуля."))
 
+        return api_base_url, api_token
+
+    @api.model
+    def _get_rate_limiter(self, api_token):
+        """
+        Спільний для процесу обмежувач частоти запитів для токена API.
+        Ліміт задається параметром hd_electricity_price.rate_limit_per_minute.
+        """
+        rate_per_minute = int(self.env['ir.config_parameter'].sudo().get_param(
+            'hd_electricity_price.rate_limit_per_minute', ENTSOE_DEFAULT_RATE_LIMIT
+        ) or ENTSOE_DEFAULT_RATE_LIMIT)
+        return get_rate_limiter(api_token, max(1, rate_per_minute))
+
+    @api.model
+    def _get_entsoe_client(self):
+        """
+        Спільний для процесу клієнт API ENTSO-E з пулом з'єднань та дисковим
+        кешем відповідей у data_dir Odoo (окремо для кожної бази даних).
+        """
+        api_base_url, api_token = self._get_api_settings()
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        cache_ttl = int(get_param('hd_electricity_price.cache_ttl', ENTSOE_DEFAULT_CACHE_TTL)
+                        or ENTSOE_DEFAULT_CACHE_TTL)
+        cache_max_mb = int(get_param('hd_electricity_price.cache_max_mb', ENTSOE_DEFAULT_CACHE_MAX_MB)
+                           or ENTSOE_DEFAULT_CACHE_MAX_MB)
+        cache_dir = os.path.join(tools.config['data_dir'], 'entsoe_cache', self.env.cr.dbname)
+
+        client = get_client(api_base_url, api_token, cache_dir, cache_ttl, cache_max_mb * 1024 * 1024)
+        client.rate_limiter = self._get_rate_limiter(api_token)
+        return client
+
+    @api.model
+    def _prepare_chunk_params(self, country, date_from, date_to):
+        """
+        Параметри запиту A44 до API ENTSO-E за діапазон дат.
+
+        :param country: Запис res.country з налаштованим доменом ENTSO-E
+        :param date_from: Перша дата (date object)
+        :param date_to: Остання дата включно (date object)
+        :return: Словник параметрів запиту (без токена, його додає клієнт API)
+        """
+        domain_code = country.entsoe_domain_id.domain_code
+
         # Підготовка параметрів запиту для Day Ahead Prices
-        # Формат: YYYYMMDDHHMM для періодів
-        # Запитуємо повний день (00:00 - 23:59)
-        period_start = target_date.strftime('%Y%m%d') + '0000'
-        period_end = target_date.strftime('%Y%m%d') + '2300'
+        # Формат: YYYYMMDDHHMM (UTC). Початок зсунуто назад, щоб покрити
+        # місцеву північ доменів зі зсувом до UTC+3, кінець - північ після date_to.
+        period_start = datetime.combine(date_from, time.min) - timedelta(hours=3)
+        period_end = datetime.combine(date_to, time.min) + timedelta(days=1)
 
-        params = {
-            'securityToken': api_token,
+        return {
             'documentType': 'A44',  # Price Document (Day Ahead Prices)
             'in_Domain': domain_code,
             'out_Domain': domain_code,
-            'periodStart': period_start,
-            'periodEnd': period_end,
+            'periodStart': period_start.strftime('%Y%m%d%H%M'),
+            'periodEnd': period_end.strftime('%Y%m%d%H%M'),
         }
 
-        _logger.info(f"Запит до ENTSO-E API для домену {domain_code}, дата {target_date}")
-        _logger.info(f"Параметри: {params}")
-
-        try:
-            # Виконання HTTP запиту
-            response = requests.get(api_base_url, params=params, timeout=30)
-            response.raise_for_status()
-
-            # Перевірка чи отримали XML
-            if not response.text.strip():
-                raise UserError(_("Отримано порожню відповідь від API"))
+    @api.model
+    def _fetch_and_store_chunk(self, country, date_from, date_to, use_cache=True):
+        """
+        Один запит A44 до API ENTSO-E за діапазон дат та збереження всіх
+        TimeSeries відповіді за один прохід. Метрики запиту записуються
+        в журнал electricity.price.fetch.log.
+
+        :param country: Запис res.country з налаштованим доменом ENTSO-E
+        :param date_from: Перша дата (date object)
+        :param date_to: Остання дата включно (date object)
+        :param use_cache: False - не брати відповідь з кешу клієнта API
+        :return: Кількість збережених записів
+        :raise AccessError: якщо користувач не може створювати ціни
+        """
+        # Перевірка до запиту до API: ціни зберігаються прямим SQL
+        self.check_access('create')
+        client = self._get_entsoe_client()
+        params = self._prepare_chunk_params(country, date_from, date_to)
+        fetch_log = self.env['electricity.price.fetch.log'].sudo()
 
-            _logger.info(f"Отримано відповідь API: {response.text[:500]}...")
+        _logger.info("Запит до ENTSO-E API для домену %s, період %s - %s", params['in_Domain'], date_from, date_to)
+        _logger.debug("Параметри: %s", params)
 
-            # Парсинг XML відповіді
+        stats = {}
+        response = None
+        try:
             try:
-                root = ET.fromstring(response.text)
-            except ET.ParseError as e:
-                _logger.error(f"Помилка парсингу XML: {e}")
-                _logger.error(f"XML відповідь: {response.text[:1000]}...")
-                raise UserError(_("Неправильний формат XML у відповіді API"))
+                response = client.fetch(params, use_cache)
+            except requests.exceptions.RequestException as e:
+                _logger.error("Помилка HTTP запиту: %s", e)
+                raise UserError(_("Помилка з'єднання з API ENTSO-E: %s") % str(e)) from e
+            prices_saved = self._store_chunk_response(country, date_from, date_to, response, stats)
+        except Exception as e:
+            # Поточна транзакція буде відкочена, тому журнал пишеться окремо
+            fetch_log._log_fetch_separately(country, date_from, date_to, response, stats, error=e)
+            raise
+
+        fetch_log._log_fetch(country, date_from, date_to, response, stats)
+        self._mark_response_final(client, country, date_from, date_to, params, response)
+        return prices_saved
 
-            # Парсинг та збереження цін
-            prices_saved = self._parse_and_save_prices(root, country_id, target_date, response.text)
-
-            if prices_saved == 0:
-                _logger.warning(f"Не знайдено даних про ціни для дати {target_date}")
-                raise UserError(_("Не отримано даних про ціни для %s на %s") % (country.name, target_date))
+    @api.model
+    def _fetch_and_store_parallel(self, jobs, use_cache=True):
+        """
+        Паралельне завантаження цін для кількох країн.
+
+        HTTP-запити виконуються в пулі потоків (hd_electricity_price.fetch_workers)
+        через спільний клієнт API з обмежувачем частоти та кешем відповідей.
+        Збереження відбувається в поточному курсорі в міру надходження
+        відповідей, кожна відповідь - у власному savepoint, тож помилка однієї
+        країни не відкочує інші.
+
+        :param jobs: Список кортежів (country, date_from, date_to)
+        :param use_cache: False - не брати відповіді з кешу клієнта API
+        :return: Кортеж словників ({country_id: кількість збережених записів},
+                 {country_id: виняток})
+        """
+        client = self._get_entsoe_client()
+        fetch_log = self.env['electricity.price.fetch.log'].sudo()
+        workers = int(self.env['ir.config_parameter'].sudo().get_param(
+            'hd_electricity_price.fetch_workers', ENTSOE_DEFAULT_FETCH_WORKERS
+        ) or ENTSOE_DEFAULT_FETCH_WORKERS)
+
+        # Параметри готуються в основному потоці: робочі потоки не мають доступу до env
+        chunks = []
+        for country, date_from, date_to in jobs:
+            for chunk_from, chunk_to in self._split_date_range(date_from, date_to):
+                params = self._prepare_chunk_params(country, chunk_from, chunk_to)
+                chunks.append((country, chunk_from, chunk_to, params))
+
+        saved = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='entsoe_fetch') as executor:
+            futures = {
+                executor.submit(client.fetch, params, use_cache): (country, chunk_from, chunk_to, params)
+                for country, chunk_from, chunk_to, params in chunks
+            }
+            for future in as_completed(futures):
+                country, chunk_from, chunk_to, params = futures[future]
+                if country.id in errors:
+                    continue
+                stats = {}
+                response = None
+                try:
+                    try:
+                        response = future.result()
+                    except requests.exceptions.RequestException as e:
+                        raise UserError(_("Помилка з'єднання з API ENTSO-E: %s") % str(e)) from e
+                    with self.env.cr.savepoint():
+                        count = self._store_chunk_response(country, chunk_from, chunk_to, response, stats)
+                    saved[country.id] = saved.get(country.id, 0) + count
+                    fetch_log._log_fetch(country, chunk_from, chunk_to, response, stats)
+                    self._mark_response_final(client, country, chunk_from, chunk_to, params, response)
+                except Exception as e:
+                    errors[country.id] = e
+                    _logger.error("Помилка завантаження цін для %s на %s - %s: %s",
+                                  country.name, chunk_from, chunk_to, e)
+                    fetch_log._log_fetch(country, chunk_from, chunk_to, response, stats, error=e)
 
-            _logger.info(f"Збережено {prices_saved} записів цін для {country.name} на {target_date}")
+        _logger.info("Кеш відповідей API ENTSO-E: %s", client.stats())
+        return saved, errors
 
-        except requests.exceptions.RequestException as e:
-            _logger.error(f"Помилка HTTP запиту: {e}")
-            raise UserError(_("Помилка з'єднання з API ENTSO-E: %s") % str(e))
+    @api.model
+    def _mark_response_final(self, client, country, date_from, date_to, params, response):
+        """
+        Позначення відповіді API в кеші як остаточної, якщо після її збереження
+        в базі є всі години періоду. Неповна відповідь (наприклад, ціни ще
+        публікуються) лишається в кеші лише до завершення терміну дії.
+        """
+        if response.from_cache:
+            return
+        if not self._find_missing_days(date_from, date_to, country.ids):
+            client.mark_final(params)
 
-    def _parse_and_save_prices(self, xml_root, country_id, target_date, raw_response):
+    @api.model
+    def _store_chunk_response(self, country, date_from, date_to, response, stats=None):
         """
-        Парсинг XML відповіді та збереження цін у базі даних.
+        Парсинг відповіді A44 та збереження цін за діапазон дат.
 
-        :param xml_root: Корінь XML дерева
-        :param country_id: ID країни
-        :param target_date: Дата (date object)
-        :param raw_response: Сира XML відповідь для збереження
+        :param country: Запис res.country з налаштованим доменом ENTSO-E
+        :param date_from: Перша дата (date object)
+        :param date_to: Остання дата включно (date object)
+        :param response: EntsoeResponse з текстом відповіді API
+        :param stats: Словник, у який додаються метрики обробки
         :return: Кількість збережених записів
         """
-        prices_saved = 0
+        stats = stats if stats is not None else {}
+        response_text = response.text
 
-        # Namespace для ENTSO-E XML
-        ns = {'ns': 'urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:3'}
+        # Перевірка чи отримали XML
+        if not response_text.strip():
+            raise UserError(_("Отримано порожню відповідь від API"))
 
-        # Знаходження всіх TimeSeries
-        timeseries_list = xml_root.findall('ns:TimeSeries', ns)
+        if _logger.isEnabledFor(logging.DEBUG):
+            _logger.debug("Отримано відповідь API: %s...", response_text[:500])
 
-        if not timeseries_list:
-            _logger.warning("Не знайдено жодного TimeSeries у XML відповіді")
-            return 0
+        # Відповідь зберігається один раз і спільна для всіх годинних записів
+        started = perf_counter()
+        raw_document = self.env['electricity.price.raw.document'].sudo()._store_response(
+            response_text, country.entsoe_domain_id.id, date_from, date_to)
+        stats['db_write_time'] = stats.get('db_write_time', 0.0) + perf_counter() - started
 
-        _logger.info(f"Знайдено {len(timeseries_list)} TimeSeries в XML")
+        # Парсинг та збереження цін
+        try:
+            return self._parse_and_save_prices(response_text, country.id, date_from, date_to, raw_document.id,
+                                               stats=stats)
+        except ParseError as e:
+            _logger.error("Помилка парсингу XML: %s", e)
+            _logger.error("XML відповідь: %s...", response_text[:1000])
+            raise UserError(_("Неправильний формат XML у відповіді API")) from e
+
+    def _parse_and_save_prices(self, source, country_id, date_from, date_to, raw_document_id=None, stats=None):
+        """
+        Потоковий парсинг документа A44 та збереження цін у базі даних.
 
-        for ts_index, timeseries in enumerate(timeseries_list):
-            _logger.info(f"Обробка TimeSeries {ts_index + 1}")
+        Ціни зберігаються з роздільною здатністю документа (15, 30 або 60
+        хвилин) як добові ряди electricity.price.series за місцевим часом
+        домену країни.
 
-            # Отримання інформації про період
-            period = timeseries.find('ns:Period', ns)
-            if period is None:
-                _logger.warning(f"TimeSeries {ts_index + 1}: Period не знайдено")
-                continue
+        :param source: XML відповідь (str, bytes або файлоподібний об'єкт)
+        :param country_id: ID країни
+        :param date_from: Перша дата, ціни якої зберігаються (date object)
+        :param date_to: Остання дата включно (date object)
+        :param raw_document_id: ID збереженої сирої відповіді (electricity.price.raw.document)
+        :param stats: Словник, у який додаються parse_time, db_write_time та rows_*
+        :return: Кількість збережених годинних цін
+        """
+        stats = stats if stats is not None else {}
+        # Ряди в пам'яті: {(дата, роздільна здатність): список цін за інтервалами доби}
+        series = {}
+        counters = {'negative': 0, 'out_of_range': 0, 'unsupported': 0}
+        tz = self.env['res.country'].browse(country_id).entsoe_domain_id.tz
 
-            # Парсинг дати початку періоду
-            time_interval = period.find('ns:timeInterval', ns)
-            if time_interval is None:
-                _logger.warning(f"TimeSeries {ts_index + 1}: timeInterval не знайдено")
-                continue
+        started = perf_counter()
+        try:
+            for period in iter_periods(source):
+                self._collect_period(period, series, counters, date_from, date_to, tz=tz)
+        except EntsoeAcknowledgement as ack:
+            _logger.info("API ENTSO-E не повернуло даних: %s", ack.reason)
+            return 0
+        finally:
+            stats['parse_time'] = stats.get('parse_time', 0.0) + perf_counter() - started
+            stats['rows_skipped'] = stats.get('rows_skipped', 0) + sum(counters.values())
+
+        if counters['negative']:
+            _logger.warning("Пропущено %s точок з негативною ціною", counters['negative'])
+        if counters['unsupported']:
+            _logger.warning("Пропущено %s точок з непідтримуваною роздільною здатністю", counters['unsupported'])
+
+        started = perf_counter()
+        prices_saved = self.env['electricity.price.series']._upsert_series(
+            country_id, series, raw_document_id, stats=stats)
+        stats['db_write_time'] = stats.get('db_write_time', 0.0) + perf_counter() - started
+        _logger.info("Загалом збережено %s записів цін", prices_saved)
+        return prices_saved
 
-            start_time_elem = time_interval.find('ns:start', ns)
-            if start_time_elem is None:
-                _logger.warning(f"TimeSeries {ts_index + 1}: start time не знайдено")
-                continue
+    @api.model
+    def _collect_period(self, period, series, counters, date_from=None, date_to=None, tz=None):
+        """
+        Розкладання точок Period по добових рядах за місцевим часом домену.
+
+        Місцеві дата та інтервал доби визначаються для всіх точок Period одним
+        проходом за кешованою таблицею зсувів часового поясу. У 23-годинну добу
+        інтервали пропущеної години лишаються порожніми, інтервали повторної
+        години 25-годинної доби дописуються в кінець ряду (година 24).
+
+        :param period: PricePeriod з entsoe_parser
+        :param series: Словник {(дата, роздільна здатність): список цін}, що доповнюється
+        :param counters: Лічильники пропущених точок (negative, out_of_range, unsupported)
+        :param date_from: Перша дата, що зберігається (None - без обмеження)
+        :param date_to: Остання дата включно (None - без обмеження)
+        :param tz: Часовий пояс IANA домену (None - DEFAULT_DOMAIN_TIMEZONE)
+        """
+        resolution = period.resolution
+        if resolution not in SERIES_RESOLUTIONS:
+            counters['unsupported'] += len(period.points)
+            return
+        step = resolution * 60
+        slots = MINUTES_PER_DAY // resolution
 
-            start_time_str = start_time_elem.text
-            _logger.info(f"TimeSeries {ts_index + 1}: початок періоду {start_time_str}")
+        points = [(timestamp, price) for timestamp, price in period.points if price >= 0]
+        counters['negative'] += len(period.points) - len(points)
+        positions = local_slots(tz or DEFAULT_DOMAIN_TIMEZONE, [timestamp for timestamp, _price in points], step)
 
-            # Конвертація UTC часу в дату
-            try:
-                # Формат: 2025-07-14T22:00Z або 2025-07-15T22:00:00Z
-                if start_time_str.endswith('Z'):
-                    if '.' in start_time_str:
-                        # Формат з мікросекундами
-                        start_datetime_utc = datetime.strptime(start_time_str, '%Y-%m-%dT%H:%M:%S.%fZ')
-                    elif start_time_str.count(':') == 2:
-                        # Формат з секундами
-                        start_datetime_utc = datetime.strptime(start_time_str, '%Y-%m-%dT%H:%M:%SZ')
-                    else:
-                        # Формат без секунд
-                        start_datetime_utc = datetime.strptime(start_time_str, '%Y-%m-%dT%H:%MZ')
-                else:
-                    raise ValueError(f"Несподіваний формат часу: {start_time_str}")
-
-                _logger.info(f"TimeSeries {ts_index + 1}: UTC час початку {start_datetime_utc}")
-
-            except ValueError as e:
-                _logger.error(f"TimeSeries {ts_index + 1}: Помилка парсингу дати початку періоду: {e}")
+        for (point_date, slot), (_timestamp, price) in zip(positions, points):
+            # Перевіряємо чи цей час входить у цільовий діапазон дат
+            if (date_from and point_date < date_from) or (date_to and point_date > date_to):
+                counters['out_of_range'] += 1
                 continue
 
-            # Отримання всіх точок цін
-            points = period.findall('ns:Point', ns)
-            _logger.info(f"TimeSeries {ts_index + 1}: знайдено {len(points)} точок")
-
-            for point in points:
-                try:
-                    position_elem = point.find('ns:position', ns)
-                    price_elem = point.find('ns:price.amount', ns)
-
-                    if position_elem is None or price_elem is None:
-                        _logger.warning(f"TimeSeries {ts_index + 1}: Пропущено точку - відсутній position або price")
-                        continue
-
-                    # Перевірка на валідність даних
-                    position_text = position_elem.text
-                    price_text = price_elem.text
-
-                    if not position_text or not price_text:
-                        _logger.warning(
-                            f"TimeSeries {ts_index + 1}: Порожні значення position='{position_text}' або price='{price_text}'")
-                        continue
+            values = series.get((point_date, resolution))
+            if values is None:
+                values = series[(point_date, resolution)] = [None] * slots
+            if slot >= len(values):
+                values.extend([None] * (slot + 1 - len(values)))
+            values[slot] = price
 
-                    try:
-                        position = int(position_text.strip())
-                        price = float(price_text.strip())
-                    except (ValueError, TypeError) as conv_error:
-                        _logger.error(
-                            f"TimeSeries {ts_index + 1}: Помилка конвертації position='{position_text}' або price='{price_text}': {conv_error}")
-                        continue
-
-                    # Перевірка розумності значень
-                    if position < 1 or position > 24:
-                        _logger.warning(f"TimeSeries {ts_index + 1}: Неправильна позиція {position}, пропускаємо")
-                        continue
-
-                    if price < 0:
-                        _logger.warning(f"TimeSeries {ts_index + 1}: Негативна ціна {price}, пропускаємо")
-                        continue
-
-                    # Position 1 відповідає першій годині періоду
-                    # Час точки = час початку + (position - 1) годин
-                    point_datetime_utc = start_datetime_utc + timedelta(hours=position - 1)
-
-                    # Для Румынії потрібно конвертувати UTC в місцевий час
-                    # Румунія: UTC+2 (зимовий час) або UTC+3 (літній час)
-                    # Спрощуємо: використовуємо UTC+2 як базу
-                    # В реальному проекті краще використовувати pytz
-                    local_offset = 2  # Часова зона Румунії UTC+2/+3
-                    point_datetime_local = point_datetime_utc + timedelta(hours=local_offset)
-
-                    point_date = point_datetime_local.date()
-                    local_hour = point_datetime_local.hour
-
-                    _logger.debug(
-                        f"Position {position}: UTC {point_datetime_utc} -> Local {point_datetime_local} (дата {point_date}, година {local_hour}), ціна {price}")
-
-                    # Перевіряємо чи цей час відповідає цільовій даті
-                    if point_date != target_date:
-                        _logger.debug(f"Пропускаємо дату {point_date}, очікуємо {target_date}")
-                        continue
-
-                    # Додаткова перевірка на валідність години
-                    if local_hour < 0 or local_hour > 23:
-                        _logger.warning(f"TimeSeries {ts_index + 1}: Неправильна година {local_hour}, пропускаємо")
-                        continue
-
-                    # Перевірка чи запис вже існує
-                    existing_record = self.search([
-                        ('country_id', '=', country_id),
-                        ('price_date', '=', point_date),
-                        ('hour', '=', local_hour)
-                    ])
-
-                    # Підготовка даних для збереження
-                    record_data = {
-                        'price': price,
-                        'api_response_raw': raw_response
-                    }
-
-                    if existing_record:
-                        # Оновлення існуючого запису
-                        existing_record.write(record_data)
-                        _logger.debug(f"Оновлено запис для {point_date} {local_hour}:00, ціна {price}")
-                    else:
-                        # Створення нового запису
-                        record_data.update({
-                            'country_id': country_id,
-                            'price_date': point_date,
-                            'hour': local_hour,
-                        })
-
-                        # Додаткова перевірка перед створенням
-                        if all(v is not None for v in [country_id, point_date, local_hour, price]):
-                            self.create(record_data)
-                            _logger.debug(f"Створено запис для {point_date} {local_hour}:00, ціна {price}")
-                        else:
-                            _logger.error(
-                                f"Не вдається створити запис - None значення: country_id={country_id}, date={point_date}, hour={local_hour}, price={price}")
-                            continue
-
-                    prices_saved += 1
-
-                except Exception as e:
-                    _logger.error(
-                        f"TimeSeries {ts_index + 1}: Помилка обробки точки position={position_text if 'position_text' in locals() else 'N/A'}: {e}")
-                    continue
+    @api.model
+    def _bulk_upsert_prices(self, country_id, prices, raw_document_id=None, stats=None):
+        """
+        Збереження пакета погодинних цін як погодинних рядів одним запитом
+        INSERT ... ON CONFLICT (див. electricity.price.series._upsert_series).
 
-        _logger.info(f"Загалом збережено {prices_saved} записів цін")
-        return prices_saved
\ No newline at end of file
+        :param country_id: ID країни
+        :param prices: Словник {(price_date, hour): price}
+        :param raw_document_id: ID збереженої сирої відповіді
+        :param stats: Словник, у який додаються rows_inserted та rows_updated
+        :return: Кількість збережених (створених або оновлених) записів
+        """
+        series = {}
+        for (price_date, hour), price in prices.items():
+            series.setdefault((price_date, 60), [None] * 24)[hour] = price
+        return self.env['electricity.price.series']._upsert_series(country_id, series, raw_document_id, stats=stats)
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+# Матеріалізовані денні та місячні агрегати цін, що оновлюються інкрементально при імпорті
+
+from odoo import fields, models, api, _
+import logging
+
+from .electricity_price_series import HOURLY_VIEW_QUERY
+from .electricity_price_series_archive import ARCHIVE_DAYS_QUERY
+
+_logger = logging.getLogger(__name__)
+
+# Пікові години (08:00-20:00 місцевого часу) у робочі дні, як для продукту Peak
+PEAK_HOUR_FROM = 8
+PEAK_HOUR_TO = 19
+
+# Вирази агрегатів над рядками electricity_price_rdn (аліас p)
+_AGGREGATE_COLUMNS = """
+    avg(p.price), min(p.price), max(p.price),
+    avg(p.price) FILTER (WHERE p.hour BETWEEN {peak_from} AND {peak_to} AND extract(isodow FROM p.price_date) < 6),
+    avg(p.price) FILTER (WHERE NOT (p.hour BETWEEN {peak_from} AND {peak_to} AND extract(isodow FROM p.price_date) < 6)),
+""".format(peak_from=PEAK_HOUR_FROM, peak_to=PEAK_HOUR_TO)
+
+_AGGREGATE_UPDATE = """
+    entsoe_domain_id = EXCLUDED.entsoe_domain_id,
+    price_avg = EXCLUDED.price_avg,
+    price_min = EXCLUDED.price_min,
+    price_max = EXCLUDED.price_max,
+    peak_avg = EXCLUDED.peak_avg,
+    offpeak_avg = EXCLUDED.offpeak_avg,
+    max_spread = EXCLUDED.max_spread,
+    write_uid = EXCLUDED.write_uid,
+    write_date = EXCLUDED.write_date
+"""
+
+# Погодинні ціни актуальних рядів разом з місяцями, перенесеними в архів
+# (у форматі рядків electricity_price_rdn); доби, що знову є в актуальних
+# рядах, беруться з них. Для повного перебудування агрегатів та оновлення
+# архівних місяців
+_HOURLY_WITH_ARCHIVE_QUERY = """(
+    WITH all_series AS (
+        SELECT id, country_id, entsoe_domain_id, price_date, resolution, prices, raw_document_id
+          FROM electricity_price_series
+         UNION ALL
+        SELECT NULL::int, a.country_id, c.entsoe_domain_id, a.price_date, a.resolution, a.prices, NULL::int
+          FROM ({archive_days}) a
+          JOIN res_country c ON c.id = a.country_id
+         WHERE NOT EXISTS (
+               SELECT 1 FROM electricity_price_series l
+                WHERE l.country_id = a.country_id AND l.price_date = a.price_date
+         )
+    )
+    {hourly}
+)""".format(
+    archive_days=ARCHIVE_DAYS_QUERY.format(archive='electricity_price_series_archive'),
+    hourly=HOURLY_VIEW_QUERY.format(series_table='all_series'),
+)
+
+
+class ElectricityPriceAggregateMixin(models.AbstractModel):
+    _name = 'electricity.price.aggregate.mixin'
+    _description = 'Спільні показники агрегатів цін'
+
+    country_id = fields.Many2one('res.country', string='Країна', required=True, readonly=True, index=True)
+    entsoe_domain_id = fields.Many2one('electricity.entsoe.domain', string='Домен ENTSO-E', readonly=True)
+    price_avg = fields.Float(string='Середня ціна (Base)', digits=(10, 4), readonly=True, aggregator='avg')
+    price_min = fields.Float(string='Мінімальна ціна', digits=(10, 4), readonly=True, aggregator='min')
+    price_max = fields.Float(string='Максимальна ціна', digits=(10, 4), readonly=True, aggregator='max')
+    peak_avg = fields.Float(string='Середня ціна (Peak)', digits=(10, 4), readonly=True, aggregator='avg',
+                            help="Середня ціна годин 08:00-20:00 у робочі дні")
+    offpeak_avg = fields.Float(string='Середня ціна (Off-peak)', digits=(10, 4), readonly=True, aggregator='avg',
+                               help="Середня ціна решти годин")
+    max_spread = fields.Float(string='Макс. спред', digits=(10, 4), readonly=True, aggregator='max',
+                              help="Різниця між максимальною та мінімальною погодинною ціною доби")
+
+
+class ElectricityPriceRdnDaily(models.Model):
+    _name = 'electricity.price.rdn.daily'
+    _inherit = 'electricity.price.aggregate.mixin'
+    _description = 'Денні показники цін РДН'
+    _order = 'price_date desc, country_id'
+    _rec_name = 'price_date'
+
+    price_date = fields.Date(string='Дата', required=True, readonly=True, index=True)
+    hour_count = fields.Integer(string='Кількість годин', readonly=True, aggregator='sum')
+
+    _sql_constraints = [
+        ('unique_country_date', 'unique(country_id, price_date)',
+         'Денні показники для цієї країни та дати вже існують!'),
+    ]
+
+    def action_open_hours(self):
+        """
+        Деталізація дня: погодинні ціни країни за дату.
+        """
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _("Ціни %s за %s") % (self.country_id.name, self.price_date),
+            'res_model': 'electricity.price.rdn',
+            'view_mode': 'graph,pivot,tree',
+            'domain': [('country_id', '=', self.country_id.id), ('price_date', '=', self.price_date)],
+            'context': {'create': False},
+        }
+
+    @api.model
+    def _refresh_keys(self, keys):
+        """
+        Інкрементальне оновлення денних і місячних агрегатів лише для
+        зачеплених пар (країна, дата). Дні місяців, перенесених в архів,
+        перераховуються разом з архівом, щоб архівні доби не випали з
+        агрегатів.
+
+        :param keys: Ітерабельна колекція пар (country_id, price_date)
+        """
+        keys = set(keys)
+        if not keys:
+            return
+        self.env['electricity.price.rdn'].flush_model()
+        months = {(country_id, price_date.replace(day=1)) for country_id, price_date in keys}
+        archived = self.env['electricity.price.series.archive']._get_archived_months(months)
+
+        monthly = self.env['electricity.price.rdn.monthly']
+        for include_archive in (False, True):
+            part = {key for key in keys if ((key[0], key[1].replace(day=1)) in archived) == include_archive}
+            if part:
+                self._refresh_days(part, include_archive)
+                monthly._refresh_months({(country_id, price_date.replace(day=1)) for country_id, price_date in part},
+                                        include_archive=include_archive)
+        self.invalidate_model()
+
+    @api.model
+    def _refresh_days(self, keys, include_archive=False):
+        """
+        Перерахунок денних агрегатів для пар (country_id, price_date).
+
+        :param include_archive: Читати також місяці, перенесені в архів
+        """
+        cr = self.env.cr
+        hourly = _HOURLY_WITH_ARCHIVE_QUERY if include_archive else 'electricity_price_rdn'
+        params = {
+            'country_ids': [key[0] for key in keys],
+            'dates': [key[1] for key in keys],
+            'uid': self.env.uid,
+        }
+
+        # Дні, для яких більше немає цін
+        cr.execute(f"""
+            DELETE FROM electricity_price_rdn_daily d
+             USING unnest(%(country_ids)s::int[], %(dates)s::date[]) AS k(country_id, price_date)
+             WHERE d.country_id = k.country_id AND d.price_date = k.price_date
+               AND NOT EXISTS (
+                   SELECT 1 FROM {hourly} p
+                    WHERE p.country_id = k.country_id AND p.price_date = k.price_date
+               )
+        """, params)
+        cr.execute(f"""
+            INSERT INTO electricity_price_rdn_daily (
+                country_id, price_date, entsoe_domain_id,
+                price_avg, price_min, price_max, peak_avg, offpeak_avg, max_spread, hour_count,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT p.country_id, p.price_date, max(p.entsoe_domain_id),
+                   {_AGGREGATE_COLUMNS}
+                   max(p.price) - min(p.price), count(*),
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM unnest(%(country_ids)s::int[], %(dates)s::date[]) AS k(country_id, price_date)
+              JOIN {hourly} p
+                ON p.country_id = k.country_id AND p.price_date = k.price_date
+             GROUP BY p.country_id, p.price_date
+            ON CONFLICT (country_id, price_date) DO UPDATE
+               SET hour_count = EXCLUDED.hour_count, {_AGGREGATE_UPDATE}
+        """, params)
+
+    @api.model
+    def _rebuild_all(self):
+        """
+        Повне перебудування денних і місячних агрегатів з погодинних цін,
+        включно з місяцями, перенесеними в архів.
+        Використовується для виправлення розбіжностей.
+        """
+        self.env['electricity.price.rdn'].flush_model()
+        self.env['electricity.price.series.archive'].flush_model()
+        cr = self.env.cr
+        cr.execute("DELETE FROM electricity_price_rdn_daily")
+        cr.execute(f"""
+            INSERT INTO electricity_price_rdn_daily (
+                country_id, price_date, entsoe_domain_id,
+                price_avg, price_min, price_max, peak_avg, offpeak_avg, max_spread, hour_count,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT p.country_id, p.price_date, max(p.entsoe_domain_id),
+                   {_AGGREGATE_COLUMNS}
+                   max(p.price) - min(p.price), count(*),
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM {_HOURLY_WITH_ARCHIVE_QUERY} p
+             GROUP BY p.country_id, p.price_date
+        """, {'uid': self.env.uid})
+        _logger.info("Перебудовано денні агрегати цін: %s записів", cr.rowcount)
+        cr.execute("DELETE FROM electricity_price_rdn_monthly")
+        cr.execute("SELECT DISTINCT country_id, date_trunc('month', price_date)::date FROM electricity_price_rdn_daily")
+        self.env['electricity.price.rdn.monthly']._refresh_months(cr.fetchall(), include_archive=True)
+        self.invalidate_model()
+        self.env['electricity.price.rdn.monthly'].invalidate_model()
+
+
+class ElectricityPriceRdnMonthly(models.Model):
+    _name = 'electricity.price.rdn.monthly'
+    _inherit = 'electricity.price.aggregate.mixin'
+    _description = 'Місячні показники цін РДН'
+    _order = 'month desc, country_id'
+    _rec_name = 'month'
+
+    month = fields.Date(string='Місяць', required=True, readonly=True, index=True,
+                        help="Перший день місяця")
+    day_count = fields.Integer(string='Кількість днів', readonly=True, aggregator='sum')
+
+    _sql_constraints = [
+        ('unique_country_month', 'unique(country_id, month)',
+         'Місячні показники для цієї країни та місяця вже існують!'),
+    ]
+
+    @api.model
+    def _refresh_months(self, keys, include_archive=False):
+        """
+        Перерахунок місячних агрегатів для пар (country_id, перший день місяця).
+        Спред місяця - найбільший денний спред.
+
+        :param include_archive: Читати також місяці, перенесені в архів
+                                (повне перебудування)
+        """
+        keys = set(keys)
+        if not keys:
+            return
+        cr = self.env.cr
+        params = {
+            'country_ids': [key[0] for key in keys],
+            'months': [key[1] for key in keys],
+            'uid': self.env.uid,
+        }
+        hourly = _HOURLY_WITH_ARCHIVE_QUERY if include_archive else 'electricity_price_rdn'
+        cr.execute("""
+            DELETE FROM electricity_price_rdn_monthly m
+             USING unnest(%(country_ids)s::int[], %(months)s::date[]) AS k(country_id, month)
+             WHERE m.country_id = k.country_id AND m.month = k.month
+               AND NOT EXISTS (
+                   SELECT 1 FROM electricity_price_rdn_daily d
+                    WHERE d.country_id = k.country_id
+                      AND d.price_date >= k.month AND d.price_date < k.month + interval '1 month'
+               )
+        """, params)
+        cr.execute(f"""
+            INSERT INTO electricity_price_rdn_monthly (
+                country_id, month, entsoe_domain_id,
+                price_avg, price_min, price_max, peak_avg, offpeak_avg, max_spread, day_count,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT p.country_id, k.month, max(p.entsoe_domain_id),
+                   {_AGGREGATE_COLUMNS}
+                   (SELECT max(d.max_spread) FROM electricity_price_rdn_daily d
+                     WHERE d.country_id = k.country_id
+                       AND d.price_date >= k.month AND d.price_date < k.month + interval '1 month'),
+                   count(DISTINCT p.price_date),
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM unnest(%(country_ids)s::int[], %(months)s::date[]) AS k(country_id, month)
+              JOIN {hourly} p
+                ON p.country_id = k.country_id
+               AND p.price_date >= k.month AND p.price_date < k.month + interval '1 month'
+             GROUP BY p.country_id, k.country_id, k.month
+            ON CONFLICT (country_id, month) DO UPDATE
+               SET day_count = EXCLUDED.day_count, {_AGGREGATE_UPDATE}
+        """, params)
+        self.invalidate_model()
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+# Векторизована аналітика цін (спреди, ковзні середні, перцентилі, найдешевші години) на NumPy
+
+from odoo import fields, models, api, _
+from odoo.exceptions import UserError
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+import logging
+import warnings
+
+from ..tools.local_time import local_slots
+from .electricity_price_series_archive import ARCHIVE_DAYS_QUERY
+from .entsoe_domain import DEFAULT_DOMAIN_TIMEZONE
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_logger = logging.getLogger(__name__)
+
+
+def _to_float(value):
+    # NaN не серіалізується в JSON-RPC, відсутні значення повертаються як None
+    return None if value != value else round(float(value), 4)
+
+
+def _to_list(values):
+    return [_to_float(value) for value in values]
+
+
+class ElectricityPriceAnalytics(models.AbstractModel):
+    """
+    Аналітика над збереженими рядами цін. Дані за весь запит читаються одним
+    SQL-запитом у матрицю NumPy (країна x день x година), метрики обчислюються
+    без циклів Python по годинах.
+
+    Публічні методи доступні через RPC, дати приймаються як date або 'YYYY-MM-DD'.
+    """
+    _name = 'electricity.price.analytics'
+    _description = 'Аналітика цін РДН'
+
+    @api.model
+    def _load_matrix(self, country_ids, date_from, date_to):
+        """
+        Погодинні ціни країн за діапазон дат.
+
+        :return: Кортеж (country_ids, date_from, матриця shape (країни, дні, 24)
+                 з NaN для відсутніх годин)
+        """
+        if np is None:
+            raise UserError(_("Для аналітики цін потрібна бібліотека Python numpy"))
+        self.env['electricity.price.rdn'].check_access('read')
+
+        country_ids = [int(country_id) for country_id in country_ids]
+        date_from = fields.Date.to_date(date_from)
+        date_to = fields.Date.to_date(date_to)
+        if not country_ids or date_from > date_to:
+            raise UserError(_("Оберіть країни та коректний період"))
+
+        days = (date_to - date_from).days + 1
+        matrix = np.full((len(country_ids), days, 24), np.nan)
+        country_index = {country_id: index for index, country_id in enumerate(country_ids)}
+
+        # Для кожної дати - ряд з найдрібнішою роздільною здатністю, як у погодинному
+        # представленні; місяці, перенесені в архів, читаються з архіву
+        self.env['electricity.price.series'].flush_model()
+        self.env['electricity.price.series.archive'].flush_model()
+        archive = """(
+            SELECT * FROM electricity_price_series_archive
+             WHERE country_id = ANY(%(country_ids)s) AND price_month BETWEEN %(month_from)s AND %(date_to)s
+        )"""
+        self.env.cr.execute(f"""
+            SELECT DISTINCT ON (s.country_id, s.price_date)
+                   s.country_id, s.price_date - %(date_from)s, s.resolution, s.prices
+              FROM (
+                    SELECT country_id, price_date, resolution, prices
+                      FROM electricity_price_series
+                     WHERE country_id = ANY(%(country_ids)s)
+                       AND price_date BETWEEN %(date_from)s AND %(date_to)s
+                     UNION ALL
+                    SELECT * FROM ({ARCHIVE_DAYS_QUERY.format(archive=archive)}) a
+                     WHERE a.price_date BETWEEN %(date_from)s AND %(date_to)s
+                   ) s
+             ORDER BY s.country_id, s.price_date, s.resolution
+        """, {'country_ids': country_ids, 'date_from': date_from, 'date_to': date_to,
+              'month_from': date_from.replace(day=1)})
+
+        # Ряди однакової роздільної здатності та довжини усереднюються до годин разом
+        groups = {}
+        for country_id, day, resolution, prices in self.env.cr.fetchall():
+            if prices:
+                group = groups.setdefault((resolution, len(prices)), ([], [], []))
+                group[0].append(country_index[country_id])
+                group[1].append(day)
+                group[2].append(prices)
+        for (resolution, length), (countries, day_indexes, values) in groups.items():
+            per_hour = 60 // resolution
+            hours = min(24, length // per_hour)
+            intervals = np.array(values, dtype=float)[:, :hours * per_hour].reshape(len(values), hours, per_hour)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                matrix[countries, day_indexes, :hours] = np.nanmean(intervals, axis=2)
+        return country_ids, date_from, matrix
+
+    @api.model
+    def _dates(self, date_from, days):
+        return [str(date_from + timedelta(days=day)) for day in range(days)]
+
+    @api.model
+    def _local_hours(self, tz_name, date_from, days):
+        """
+        Години, що існують за місцевим часом у кожну добу періоду: у добу
+        переходу на літній час пропущеної години немає.
+
+        :return: Булева матриця shape (дні, 24)
+        """
+        zone = ZoneInfo(tz_name)
+        start = int(datetime.combine(date_from, time.min, tzinfo=zone).timestamp())
+        end = int(datetime.combine(date_from + timedelta(days=days), time.min, tzinfo=zone).timestamp())
+        existing = np.zeros((days, 24), dtype=bool)
+        for day, hour in local_slots(tz_name, range(start, end, 3600), 3600):
+            day_index = (day - date_from).days
+            if 0 <= day_index < days and hour < 24:
+                existing[day_index, hour] = True
+        return existing
+
+    @api.model
+    def get_spreads(self, country_id, other_country_id, date_from, date_to):
+        """
+        Погодинний спред між двома зонами (ціна першої мінус ціна другої).
+
+        :return: Словник зі статистикою спреду та середнім денним спредом
+        """
+        _ids, date_from, matrix = self._load_matrix([country_id, other_country_id], date_from, date_to)
+        spread = matrix[0] - matrix[1]
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            daily = np.nanmean(spread, axis=1)
+            valid = spread[~np.isnan(spread)]
+            return {
+                'dates': self._dates(date_from, matrix.shape[1]),
+                'daily_mean': _to_list(daily),
+                'hourly_mean': _to_list(np.nanmean(spread, axis=0)),
+                'mean': _to_float(valid.mean()) if valid.size else None,
+                'min': _to_float(valid.min()) if valid.size else None,
+                'max': _to_float(valid.max()) if valid.size else None,
+                'std': _to_float(valid.std()) if valid.size else None,
+                'positive_share': _to_float((valid > 0).mean()) if valid.size else None,
+                'hours': int(valid.size),
+            }
+
+    @api.model
+    def get_rolling_averages(self, country_ids, date_from, date_to, windows=(7, 30)):
+        """
+        Середня денна ціна та ковзні середні за windows днів. Дні без цін не
+        враховуються; значення з'являється, коли у вікні є хоча б один день.
+
+        :return: {'dates': [...], 'countries': {'<country_id>': {'daily': [...], '7': [...], ...}}}
+        """
+        country_ids, date_from, matrix = self._load_matrix(country_ids, date_from, date_to)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            daily = np.nanmean(matrix, axis=2)
+
+        present = ~np.isnan(daily)
+        # Кумулятивні суми дозволяють отримати суму будь-якого вікна за O(1)
+        sums = np.concatenate([np.zeros((len(country_ids), 1)), np.cumsum(np.where(present, daily, 0.0), axis=1)], axis=1)
+        counts = np.concatenate([np.zeros((len(country_ids), 1)), np.cumsum(present, axis=1)], axis=1)
+        result = {str(country_id): {'daily': _to_list(daily[index])} for index, country_id in enumerate(country_ids)}
+        for window in windows:
+            window = int(window)
+            end = np.arange(1, daily.shape[1] + 1)
+            start = np.maximum(end - window, 0)
+            window_sum = sums[:, end] - sums[:, start]
+            window_count = counts[:, end] - counts[:, start]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                rolling = np.where(window_count > 0, window_sum / window_count, np.nan)
+            for index, country_id in enumerate(country_ids):
+                result[str(country_id)][str(window)] = _to_list(rolling[index])
+        return {'dates': self._dates(date_from, daily.shape[1]), 'countries': result}
+
+    @api.model
+    def get_hourly_percentiles(self, country_ids, date_from, date_to, percentiles=(10, 50, 90)):
+        """
+        Перцентилі цін для кожної години доби за період.
+
+        :return: {'<country_id>': {'10': [24 значення], '50': [...], ...}}
+        """
+        country_ids, _date_from, matrix = self._load_matrix(country_ids, date_from, date_to)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            values = np.nanpercentile(matrix, [float(percent) for percent in percentiles], axis=1)
+        return {
+            str(country_id): {str(percent): _to_list(values[position, index]) for position, percent in enumerate(percentiles)}
+            for index, country_id in enumerate(country_ids)
+        }
+
+    @api.model
+    def get_cheapest_hours(self, country_id, date_from, date_to, count=4, consecutive=False):
+        """
+        Найдешевші години кожної доби, наприклад для розкладу заряду батареї.
+
+        :param count: Кількість годин
+        :param consecutive: True - найдешевше безперервне вікно з count годин
+        :return: Список {'date', 'hours', 'avg_price'}; дні без повних даних пропускаються
+
+        Пропущена година доби переходу на літній час не є відсутніми даними:
+        доба повна, якщо є ціни всіх годин, що існують за місцевим часом, а
+        вікно з count годин може проходити через пропущену годину.
+        """
+        count = int(count)
+        if not 1 <= count <= 24:
+            raise UserError(_("Кількість годин має бути від 1 до 24"))
+        _ids, date_from, matrix = self._load_matrix([country_id], date_from, date_to)
+        prices = matrix[0]
+        tz = self.env['res.country'].browse(int(country_id)).entsoe_domain_id.tz or DEFAULT_DOMAIN_TIMEZONE
+        existing = self._local_hours(tz, date_from, prices.shape[0])
+        complete = ~(np.isnan(prices) & existing).any(axis=1) & (existing.sum(axis=1) >= count)
+
+        # Години, що існують, зсуваються на початок рядка (стабільно, зі збереженням
+        # порядку): order - номери годин за позиціями, решта позицій - NaN
+        order = np.argsort(~existing, axis=1, kind='stable')
+        compact = np.where(np.take_along_axis(existing, order, axis=1),
+                           np.take_along_axis(prices, order, axis=1), np.nan)
+        if consecutive:
+            sums = np.concatenate([np.zeros((compact.shape[0], 1)), np.cumsum(compact, axis=1)], axis=1)
+            window_sums = sums[:, count:] - sums[:, :-count]
+            starts = np.argmin(np.where(np.isnan(window_sums), np.inf, window_sums), axis=1)
+            positions = starts[:, None] + np.arange(count)
+        else:
+            positions = np.argpartition(np.where(np.isnan(compact), np.inf, compact), count - 1, axis=1)[:, :count]
+        hours = np.sort(np.take_along_axis(order, positions, axis=1), axis=1)
+        averages = np.take_along_axis(prices, hours, axis=1).mean(axis=1)
+
+        dates = self._dates(date_from, prices.shape[0])
+        return [
+            {'date': dates[day], 'hours': hours[day].tolist(), 'avg_price': round(float(averages[day]), 4)}
+            for day in np.flatnonzero(complete)
+        ]
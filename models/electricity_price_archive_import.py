@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+# Офлайн-імпорт архівів документів A44 (XML/ZIP) з пакетним записом та продовженням після збою
+
+from odoo import fields, models, api, _
+from odoo.exceptions import UserError, ValidationError
+import io
+import logging
+import os
+
+from ..tools.entsoe_archive import iter_archive_documents, iter_path_documents
+from ..tools.entsoe_parser import EntsoeAcknowledgement, ParseError, iter_periods
+
+_logger = logging.getLogger(__name__)
+
+# Кількість добових рядів у пам'яті, після якої пакет записується та фіксується
+ARCHIVE_BATCH_SERIES = 2000
+# Перший ключ рекомендаційного блокування PostgreSQL для імпортів архівів
+ARCHIVE_LOCK_NAMESPACE = 7301
+
+
+def _merge_values(target, values):
+    # Ціни пізнішого документа мають перевагу, відсутні не затирають наявні
+    if len(target) < len(values):
+        target.extend([None] * (len(values) - len(target)))
+    for position, value in enumerate(values):
+        if value is not None:
+            target[position] = value
+
+
+class ElectricityPriceArchiveImport(models.Model):
+    _name = 'electricity.price.archive.import'
+    _description = 'Імпорт архіву документів ENTSO-E'
+    _order = 'id desc'
+
+    name = fields.Char(string='Назва', required=True, readonly=True)
+    source_path = fields.Char(string='Шлях на сервері', readonly=True,
+                              help="Файл (XML, XML.GZ, ZIP) або каталог з такими файлами")
+    attachment_id = fields.Many2one('ir.attachment', string='Завантажений файл', readonly=True, ondelete='set null')
+    state = fields.Selection([
+        ('pending', 'Очікує'),
+        ('running', 'Виконується'),
+        ('done', 'Завершено'),
+        ('error', 'Помилка'),
+    ], string='Стан', required=True, readonly=True, default='pending')
+    document_count = fields.Integer(string='Оброблено документів', readonly=True)
+    failed_count = fields.Integer(string='Документів з помилками', readonly=True)
+    prices_saved = fields.Integer(string='Збережено цін', readonly=True)
+    last_member = fields.Char(string='Останній оброблений документ', readonly=True,
+                              help="Документи архіву обробляються в сталому порядку (за назвою), тож "
+                                   "повторний запуск пропускає перші \"Оброблено документів\" документів "
+                                   "і продовжує імпорт з місця зупинки.")
+    error_message = fields.Text(string='Помилка', readonly=True)
+    date_start = fields.Datetime(string='Початок', readonly=True)
+    date_done = fields.Datetime(string='Завершення', readonly=True)
+
+    @api.constrains('source_path', 'attachment_id')
+    def _check_source(self):
+        for record in self:
+            if bool(record.source_path) == bool(record.attachment_id):
+                raise ValidationError(_("Вкажіть або завантажений файл, або шлях на сервері."))
+
+    def action_resume(self):
+        """
+        Продовження перерваного імпорту; вже оброблені документи пропускаються.
+        """
+        self.filtered(lambda record: record.state == 'error').write({'state': 'pending'})
+        self.env.ref('hd_electricity_price.ir_cron_import_price_archives')._trigger()
+
+    def action_rerun(self):
+        """
+        Повторний імпорт завершеного архіву з початку: позиція продовження
+        та лічильники скидаються.
+        """
+        self.filtered(lambda record: record.state == 'done').write({
+            'state': 'pending',
+            'last_member': False,
+            'document_count': 0,
+            'failed_count': 0,
+            'prices_saved': 0,
+            'error_message': False,
+            'date_start': False,
+            'date_done': False,
+        })
+        self.env.ref('hd_electricity_price.ir_cron_import_price_archives')._trigger()
+
+    @api.model
+    def _cron_process_pending(self):
+        """
+        Обробка імпортів, що очікують або були перервані. Викликається за розкладом
+        та запускається одразу після створення імпорту майстром.
+        """
+        for record in self.search([('state', 'in', ('pending', 'running'))], order='id'):
+            record._process()
+
+    def _iter_documents(self):
+        self.ensure_one()
+        if self.attachment_id:
+            attachment = self.attachment_id
+            # Файл у файловому сховищі читається потоково, без завантаження в пам'ять
+            if attachment.store_fname:
+                fileobj = open(attachment._full_path(attachment.store_fname), 'rb')
+            else:
+                fileobj = io.BytesIO(attachment.raw)
+            with fileobj:
+                yield from iter_archive_documents(fileobj, attachment.name)
+        else:
+            if not os.path.exists(self.source_path):
+                raise UserError(_("Шлях %s не знайдено на сервері") % self.source_path)
+            yield from iter_path_documents(self.source_path)
+
+    def _process(self, commit=True):
+        """
+        Потоковий імпорт документів архіву. Ряди цін накопичуються в пам'яті
+        та записуються пакетами по ARCHIVE_BATCH_SERIES; після кожного пакета
+        прогрес фіксується (commit), тож перерваний імпорт продовжується з
+        першого незаписаного документа: документи йдуть у сталому порядку,
+        і перші document_count з них пропускаються.
+
+        Сирі відповіді для архівних документів не зберігаються: джерелом
+        лишається сам архів.
+
+        :param commit: Фіксувати транзакцію після кожного пакета
+        :return: True, якщо імпорт оброблено, False - якщо його вже виконує інший процес
+        """
+        self.ensure_one()
+        cr = self.env.cr
+        # Блокування не дає двом процесам обробляти один архів; з проміжними
+        # commit потрібне блокування сесії, інакше - до кінця транзакції
+        lock_function = 'pg_try_advisory_lock' if commit else 'pg_try_advisory_xact_lock'
+        cr.execute(f"SELECT {lock_function}(%s, %s)", (ARCHIVE_LOCK_NAMESPACE, self.id))
+        if not cr.fetchone()[0]:
+            _logger.info("Імпорт архіву %s вже виконується іншим процесом", self.name)
+            return False
+
+        try:
+            self.write({'state': 'running', 'date_start': self.date_start or fields.Datetime.now(),
+                        'error_message': False})
+            if commit:
+                cr.commit()
+
+            checkpoint = self.document_count
+            domain_countries, domain_timezones = self._get_domain_countries()
+            unknown_domains = set()
+            batch = {}
+            members = []
+            failed = 0
+            series_count = 0
+
+            for index, (member, stream) in enumerate(self._iter_documents()):
+                if index < checkpoint:
+                    if index == checkpoint - 1 and self.last_member and member != self.last_member:
+                        raise UserError(_("Вміст архіву змінився з часу попереднього запуску: очікувався "
+                                          "документ %s, знайдено %s") % (self.last_member, member))
+                    continue
+                try:
+                    series_count += self._collect_document(stream, domain_countries, domain_timezones, batch,
+                                                           unknown_domains)
+                except EntsoeAcknowledgement:
+                    pass
+                except (ParseError, OSError, EOFError) as e:
+                    failed += 1
+                    _logger.warning("Документ %s пропущено: %s", member, e)
+                members.append(member)
+
+                if series_count >= ARCHIVE_BATCH_SERIES:
+                    self._write_batch(batch, members, failed, commit)
+                    batch, members, failed, series_count = {}, [], 0, 0
+
+            self._write_batch(batch, members, failed, commit)
+            if unknown_domains:
+                _logger.warning("Домени без країни пропущено: %s", ', '.join(sorted(unknown_domains)))
+            self.write({'state': 'done', 'date_done': fields.Datetime.now()})
+            if commit:
+                cr.commit()
+            _logger.info("Імпорт архіву %s завершено: %s документів, %s цін",
+                         self.name, self.document_count, self.prices_saved)
+        except Exception as e:
+            _logger.exception("Помилка імпорту архіву %s", self.name)
+            if not commit:
+                raise
+            cr.rollback()
+            self.write({'state': 'error', 'error_message': str(e)})
+            cr.commit()
+        finally:
+            if commit:
+                cr.execute("SELECT pg_advisory_unlock(%s, %s)", (ARCHIVE_LOCK_NAMESPACE, self.id))
+        return True
+
+    @api.model
+    def _get_domain_countries(self):
+        """
+        :return: Кортеж словників ({код домену ENTSO-E: [ID країн]}, {код домену: часовий пояс})
+        """
+        domain_countries = {}
+        domain_timezones = {}
+        for country in self.env['res.country'].search([('entsoe_domain_id', '!=', False)]):
+            domain = country.entsoe_domain_id
+            domain_countries.setdefault(domain.domain_code, []).append(country.id)
+            domain_timezones[domain.domain_code] = domain.tz
+        return domain_countries, domain_timezones
+
+    @api.model
+    def _collect_document(self, stream, domain_countries, domain_timezones, batch, unknown_domains):
+        """
+        Парсинг одного документа та додавання його рядів до пакета.
+        Пакет змінюється лише після успішного парсингу всього документа.
+
+        :param batch: Словник {country_id: {(дата, роздільна здатність): список цін}}
+        :return: Кількість нових рядів у пакеті
+        """
+        price_model = self.env['electricity.price.rdn']
+        counters = {'negative': 0, 'out_of_range': 0, 'unsupported': 0}
+        document = {}
+        for period in iter_periods(stream):
+            if period.domain_code not in domain_countries:
+                unknown_domains.add(period.domain_code)
+                continue
+            price_model._collect_period(period, document.setdefault(period.domain_code, {}), counters,
+                                        tz=domain_timezones.get(period.domain_code))
+
+        added = 0
+        for domain_code, series in document.items():
+            for country_id in domain_countries[domain_code]:
+                country_batch = batch.setdefault(country_id, {})
+                for key, values in series.items():
+                    if key in country_batch:
+                        _merge_values(country_batch[key], values)
+                    else:
+                        country_batch[key] = list(values)
+                        added += 1
+        return added
+
+    def _write_batch(self, batch, members, failed, commit):
+        if not members:
+            return
+        series_model = self.env['electricity.price.series']
+        prices_saved = sum(series_model._upsert_series(country_id, series) for country_id, series in batch.items())
+        self.write({
+            'last_member': members[-1],
+            'document_count': self.document_count + len(members),
+            'failed_count': self.failed_count + failed,
+            'prices_saved': self.prices_saved + prices_saved,
+        })
+        if commit:
+            self.env.cr.commit()
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# Фоновий set-based перерахунок домену ENTSO-E у збережених цінах після зміни прив'язки країни
+
+from odoo import fields, models, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Кількість рядів цін, що оновлюються одним запитом; після кожного пакета прогрес фіксується
+DOMAIN_RECOMPUTE_BATCH_ROWS = 50000
+# Перший ключ рекомендаційного блокування PostgreSQL для перерахунку доменів
+DOMAIN_RECOMPUTE_LOCK_NAMESPACE = 7303
+
+# Ряди цін, домен яких не відповідає поточному домену країни
+STALE_SERIES_QUERY = """
+    SELECT s.id
+      FROM electricity_price_series s
+      JOIN res_country c ON c.id = s.country_id
+     WHERE s.entsoe_domain_id IS DISTINCT FROM c.entsoe_domain_id
+"""
+
+
+class ElectricityPriceDomainRecompute(models.Model):
+    """
+    Перерахунок electricity.price.series.entsoe_domain_id для країни, домен
+    якої змінено. Замість перерахунку ORM по кожному запису ряди оновлюються
+    пакетними запитами UPDATE по діапазонах id, тож мільйони рядів
+    обробляються за один прохід з обмеженим обсягом транзакції.
+    """
+    _name = 'electricity.price.domain.recompute'
+    _description = 'Перерахунок домену ENTSO-E для цін'
+    _order = 'id desc'
+
+    country_id = fields.Many2one('res.country', string='Країна', required=True, readonly=True, ondelete='cascade')
+    entsoe_domain_id = fields.Many2one(related='country_id.entsoe_domain_id', string='Поточний домен ENTSO-E')
+    user_id = fields.Many2one('res.users', string='Ініціатор', readonly=True, default=lambda self: self.env.user)
+    state = fields.Selection([
+        ('queued', 'У черзі'),
+        ('running', 'Виконується'),
+        ('done', 'Завершено'),
+        ('error', 'Помилка'),
+    ], string='Стан', required=True, readonly=True, default='queued', index=True)
+    progress = fields.Float(string='Прогрес (%)', readonly=True, digits=(5, 1))
+    rows_total = fields.Integer(string='Рядів цін країни', readonly=True)
+    rows_updated = fields.Integer(string='Оновлено рядів', readonly=True)
+    stale_count = fields.Integer(string='Застарілих рядів', compute='_compute_stale_count',
+                                 help="Ряди цін країни, домен яких досі не відповідає домену країни")
+    error_message = fields.Text(string='Помилка', readonly=True)
+    date_start = fields.Datetime(string='Початок', readonly=True)
+    date_done = fields.Datetime(string='Завершення', readonly=True)
+
+    @api.depends('country_id')
+    def _compute_display_name(self):
+        for job in self:
+            job.display_name = job.country_id.name
+
+    def _compute_stale_count(self):
+        counts = self._count_stale(self.country_id.ids)
+        for job in self:
+            job.stale_count = counts.get(job.country_id.id, 0)
+
+    @api.model
+    def _count_stale(self, country_ids=None):
+        """
+        Перевірка узгодженості: кількість рядів цін із застарілим доменом.
+
+        :param country_ids: ID країн (None - усі країни)
+        :return: Словник {country_id: кількість застарілих рядів}
+        """
+        self.env['electricity.price.series'].flush_model(['country_id', 'entsoe_domain_id'])
+        self.env['res.country'].flush_model(['entsoe_domain_id'])
+        if country_ids is not None and not country_ids:
+            return {}
+        self.env.cr.execute("""
+            SELECT s.country_id, count(*)
+              FROM electricity_price_series s
+              JOIN res_country c ON c.id = s.country_id
+             WHERE s.entsoe_domain_id IS DISTINCT FROM c.entsoe_domain_id
+               AND (%(all)s OR s.country_id = ANY(%(country_ids)s))
+             GROUP BY s.country_id
+        """, {'all': country_ids is None, 'country_ids': list(country_ids or [])})
+        return dict(self.env.cr.fetchall())
+
+    @api.model
+    def _enqueue(self, countries):
+        """
+        Постановка перерахунку в чергу для країн, що мають збережені ціни.
+        Завдання країни, що ще чекає в черзі, використовується повторно.
+
+        :param countries: Записи res.country зі зміненим доменом
+        :return: Записи electricity.price.domain.recompute
+        """
+        if not countries:
+            return self.browse()
+        self.env.cr.execute("""
+            SELECT DISTINCT country_id FROM electricity_price_series WHERE country_id = ANY(%s)
+        """, (countries.ids,))
+        country_ids = {row[0] for row in self.env.cr.fetchall()}
+        if not country_ids:
+            return self.browse()
+
+        queued = self.search([('country_id', 'in', list(country_ids)), ('state', '=', 'queued')])
+        jobs = queued | self.create([
+            {'country_id': country_id}
+            for country_id in country_ids - set(queued.country_id.ids)
+        ])
+        cron = self.env.ref('hd_electricity_price.ir_cron_recompute_price_domains', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+        return jobs
+
+    @api.model
+    def _cron_run_jobs(self):
+        """
+        Виконання завдань у черзі. Завдання в стані "Виконується", блокування
+        якого ніхто не утримує, були перервані та запускаються знову.
+        """
+        for job in self.search([('state', 'in', ('queued', 'running'))], order='id'):
+            job._run()
+
+    def _run(self):
+        """
+        Оновлення домену рядів країни пакетами по DOMAIN_RECOMPUTE_BATCH_ROWS
+        рядів у порядку id; після кожного пакета прогрес фіксується (commit).
+        Денні та місячні агрегати країни оновлюються одним запитом кожні.
+
+        :return: False, якщо завдання вже виконує інший процес
+        """
+        self.ensure_one()
+        cr = self.env.cr
+        cr.execute("SELECT pg_try_advisory_lock(%s, %s)", (DOMAIN_RECOMPUTE_LOCK_NAMESPACE, self.id))
+        if not cr.fetchone()[0]:
+            return False
+
+        try:
+            self.invalidate_recordset()
+            if self.state not in ('queued', 'running'):
+                return True
+            cr.execute("SELECT count(*), min(id), max(id) FROM electricity_price_series WHERE country_id = %s",
+                       (self.country_id.id,))
+            rows_total, min_id, max_id = cr.fetchone()
+            self.write({'state': 'running', 'progress': 0.0, 'rows_total': rows_total, 'rows_updated': 0,
+                        'date_start': fields.Datetime.now(), 'error_message': False})
+            cr.commit()
+
+            params = {'country_id': self.country_id.id, 'limit': DOMAIN_RECOMPUTE_BATCH_ROWS}
+            last_id = (min_id or 0) - 1
+            processed = 0
+            while max_id is not None and last_id < max_id:
+                cr.execute("""
+                    SELECT max(id), count(*) FROM (
+                        SELECT id FROM electricity_price_series
+                         WHERE country_id = %(country_id)s AND id > %(last_id)s
+                         ORDER BY id
+                         LIMIT %(limit)s
+                    ) b
+                """, dict(params, last_id=last_id))
+                upper_id, batch_rows = cr.fetchone()
+                if upper_id is None:
+                    break
+                # Домен читається з країни в кожному пакеті, тож повторна зміна
+                # прив'язки під час виконання застосовується до решти рядів
+                cr.execute("""
+                    UPDATE electricity_price_series s
+                       SET entsoe_domain_id = c.entsoe_domain_id
+                      FROM res_country c
+                     WHERE c.id = s.country_id
+                       AND s.country_id = %(country_id)s
+                       AND s.id > %(last_id)s AND s.id <= %(upper_id)s
+                       AND s.entsoe_domain_id IS DISTINCT FROM c.entsoe_domain_id
+                """, dict(params, last_id=last_id, upper_id=upper_id))
+                processed += batch_rows
+                self.write({
+                    'rows_updated': self.rows_updated + cr.rowcount,
+                    'progress': 100.0 * processed / rows_total if rows_total else 100.0,
+                })
+                cr.commit()
+                last_id = upper_id
+
+            for table in ('electricity_price_rdn_daily', 'electricity_price_rdn_monthly'):
+                cr.execute(f"""
+                    UPDATE {table} a
+                       SET entsoe_domain_id = c.entsoe_domain_id
+                      FROM res_country c
+                     WHERE c.id = a.country_id AND a.country_id = %s
+                       AND a.entsoe_domain_id IS DISTINCT FROM c.entsoe_domain_id
+                """, (self.country_id.id,))
+            self.write({'state': 'done', 'progress': 100.0, 'date_done': fields.Datetime.now()})
+            self.env['electricity.price.series'].invalidate_model(['entsoe_domain_id'])
+            self.env['electricity.price.rdn'].invalidate_model(['entsoe_domain_id'])
+        except Exception as e:
+            _logger.exception("Помилка перерахунку домену ENTSO-E для %s", self.country_id.name)
+            cr.rollback()
+            self.write({'state': 'error', 'error_message': str(e), 'date_done': fields.Datetime.now()})
+        finally:
+            cr.execute("SELECT pg_advisory_unlock(%s, %s)", (DOMAIN_RECOMPUTE_LOCK_NAMESPACE, self.id))
+        cr.commit()
+
+        stale = self._count_stale(self.country_id.ids).get(self.country_id.id)
+        if stale and self.state == 'done':
+            _logger.warning("Після перерахунку для %s лишилось %s рядів цін із застарілим доменом ENTSO-E",
+                            self.country_id.name, stale)
+        return True
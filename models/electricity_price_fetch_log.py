@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# Журнал продуктивності завантажень цін з API ENTSO-E
+
+from odoo import fields, models, api
+
+
+class ElectricityPriceFetchLog(models.Model):
+    _name = 'electricity.price.fetch.log'
+    _description = 'Журнал завантаження цін ENTSO-E'
+    _order = 'fetch_date desc, id desc'
+    _rec_name = 'fetch_date'
+
+    fetch_date = fields.Datetime(string='Час завантаження', required=True, readonly=True,
+                                 default=fields.Datetime.now, index=True)
+    country_id = fields.Many2one('res.country', string='Країна', readonly=True, ondelete='cascade')
+    entsoe_domain_id = fields.Many2one('electricity.entsoe.domain', string='Домен ENTSO-E', readonly=True,
+                                       ondelete='set null', index=True)
+    date_from = fields.Date(string='Дата початку', readonly=True)
+    date_to = fields.Date(string='Дата завершення', readonly=True)
+    state = fields.Selection([
+        ('success', 'Успішно'),
+        ('no_data', 'Немає даних'),
+        ('error', 'Помилка'),
+    ], string='Результат', required=True, readonly=True, default='success')
+    http_latency_ms = fields.Float(string='Затримка HTTP (мс)', digits=(12, 1), readonly=True, aggregator='avg')
+    bytes_received = fields.Integer(string='Отримано байт', readonly=True, aggregator='sum')
+    parse_time_ms = fields.Float(string='Парсинг (мс)', digits=(12, 1), readonly=True, aggregator='avg')
+    db_write_time_ms = fields.Float(string='Запис у БД (мс)', digits=(12, 1), readonly=True, aggregator='avg')
+    rows_inserted = fields.Integer(string='Створено рядків', readonly=True, aggregator='sum')
+    rows_updated = fields.Integer(string='Оновлено рядків', readonly=True, aggregator='sum')
+    rows_skipped = fields.Integer(string='Пропущено точок', readonly=True, aggregator='sum',
+                                  help="Точки відповіді, що не були збережені (поза діапазоном дат або некоректні)")
+    cache_hit = fields.Boolean(string='З кешу', readonly=True,
+                               help="Відповідь отримано з локального кешу без звернення до API")
+    error_class = fields.Char(string='Клас помилки', readonly=True)
+    error_message = fields.Char(string='Помилка', readonly=True)
+
+    @api.model
+    def _log_fetch(self, country, date_from, date_to, response=None, stats=None, error=None):
+        """
+        Збереження запису журналу для одного запиту до API.
+
+        :param country: Запис res.country
+        :param response: EntsoeResponse або None, якщо відповідь не отримано
+        :param stats: Словник метрик обробки (parse_time, db_write_time, rows_*)
+        :param error: Виняток, якщо обробка завершилась помилкою
+        :return: Запис electricity.price.fetch.log
+        """
+        stats = stats or {}
+        rows_saved = stats.get('rows_inserted', 0) + stats.get('rows_updated', 0)
+        if error is not None:
+            state = 'error'
+        elif rows_saved:
+            state = 'success'
+        else:
+            state = 'no_data'
+        # Для винятків-обгорток (UserError) зберігається клас первинної помилки
+        cause = error.__cause__ or error if error is not None else None
+        return self.create({
+            'country_id': country.id,
+            'entsoe_domain_id': country.entsoe_domain_id.id,
+            'date_from': date_from,
+            'date_to': date_to,
+            'state': state,
+            'http_latency_ms': response.elapsed * 1000 if response else 0.0,
+            'bytes_received': response.size if response and not response.from_cache else 0,
+            'cache_hit': bool(response and response.from_cache),
+            'parse_time_ms': stats.get('parse_time', 0.0) * 1000,
+            'db_write_time_ms': stats.get('db_write_time', 0.0) * 1000,
+            'rows_inserted': stats.get('rows_inserted', 0),
+            'rows_updated': stats.get('rows_updated', 0),
+            'rows_skipped': stats.get('rows_skipped', 0),
+            'error_class': type(cause).__name__ if cause is not None else False,
+            'error_message': str(error)[:500] if error is not None else False,
+        })
+
+    @api.model
+    def _log_fetch_separately(self, *args, **kwargs):
+        """
+        Як _log_fetch, але в окремій транзакції: запис журналу зберігається,
+        навіть якщо поточна транзакція буде відкочена через помилку.
+        """
+        with self.env.registry.cursor() as cr:
+            self.with_env(self.env(cr=cr))._log_fetch(*args, **kwargs)
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# Фонові завдання завантаження цін з API ENTSO-E з прогресом та сповіщенням про завершення
+
+from odoo import fields, models, api, _
+from odoo.exceptions import UserError
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Частина діапазону, після якої оновлюється прогрес завдання (днів)
+IMPORT_JOB_CHUNK_DAYS = 31
+# Перший ключ рекомендаційного блокування PostgreSQL для виконання завдань імпорту
+IMPORT_JOB_LOCK_NAMESPACE = 7302
+
+
+class ElectricityPriceImportJob(models.Model):
+    _name = 'electricity.price.import.job'
+    _description = 'Завдання завантаження цін ENTSO-E'
+    _order = 'id desc'
+
+    country_id = fields.Many2one('res.country', string='Країна', required=True, readonly=True, ondelete='cascade')
+    date_from = fields.Date(string='Дата початку', required=True, readonly=True)
+    date_to = fields.Date(string='Дата завершення', required=True, readonly=True)
+    user_id = fields.Many2one('res.users', string='Ініціатор', readonly=True, default=lambda self: self.env.user)
+    state = fields.Selection([
+        ('queued', 'У черзі'),
+        ('running', 'Виконується'),
+        ('done', 'Завершено'),
+        ('error', 'Помилка'),
+    ], string='Стан', required=True, readonly=True, default='queued', index=True)
+    progress = fields.Float(string='Прогрес (%)', readonly=True, digits=(5, 1))
+    prices_saved = fields.Integer(string='Збережено цін', readonly=True)
+    error_message = fields.Text(string='Помилка', readonly=True)
+    date_start = fields.Datetime(string='Початок', readonly=True)
+    date_done = fields.Datetime(string='Завершення', readonly=True)
+
+    @api.depends('country_id', 'date_from', 'date_to')
+    def _compute_display_name(self):
+        for job in self:
+            job.display_name = f'{job.country_id.name}: {job.date_from} - {job.date_to}'
+
+    def init(self):
+        # Для країни та періоду може бути лише одне незавершене завдання;
+        # індекс є цільовим для INSERT ... ON CONFLICT у _enqueue.
+        # Дублікати, створені до появи індексу, закриваються
+        self.env.cr.execute("""
+            UPDATE electricity_price_import_job j
+               SET state = 'error', error_message = 'Дублікат завдання'
+             WHERE j.state IN ('queued', 'running')
+               AND EXISTS (
+                   SELECT 1 FROM electricity_price_import_job o
+                    WHERE o.country_id = j.country_id AND o.date_from = j.date_from
+                      AND o.date_to = j.date_to AND o.state IN ('queued', 'running')
+                      AND o.id < j.id
+               )
+        """)
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS electricity_price_import_job_active_uniq
+                ON electricity_price_import_job (country_id, date_from, date_to)
+             WHERE state IN ('queued', 'running')
+        """)
+
+    @api.model
+    def _enqueue(self, country, date_from, date_to):
+        """
+        Постановка завантаження в чергу. Якщо для країни вже є незавершене
+        завдання, що охоплює період, повертається воно.
+
+        Завдання створюється запитом INSERT ... ON CONFLICT за частковим
+        унікальним індексом незавершених завдань, тож одночасні запити на той
+        самий період не створюють дубліката: запит, що конфліктує із завданням,
+        зафіксованим після початку його транзакції, завершується помилкою
+        серіалізації, а повтор запиту (Odoo повторює такі запити) вже бачить
+        це завдання.
+
+        :return: Запис electricity.price.import.job
+        :raise AccessError: якщо користувач не може створювати ціни - завдання
+                            виконується кроном від імені суперкористувача
+        """
+        self.check_access('create')
+        self.env['electricity.price.rdn'].check_access('create')
+        job = self.search([
+            ('country_id', '=', country.id),
+            ('state', 'in', ('queued', 'running')),
+            ('date_from', '<=', date_from),
+            ('date_to', '>=', date_to),
+        ], limit=1)
+        if job:
+            return job
+
+        self.flush_model()
+        now = fields.Datetime.now()
+        self.env.cr.execute("""
+            INSERT INTO electricity_price_import_job (
+                country_id, date_from, date_to, user_id, state, progress, prices_saved,
+                create_uid, create_date, write_uid, write_date
+            )
+            VALUES (%(country_id)s, %(date_from)s, %(date_to)s, %(uid)s, 'queued', 0, 0,
+                    %(uid)s, %(now)s, %(uid)s, %(now)s)
+            ON CONFLICT (country_id, date_from, date_to) WHERE state IN ('queued', 'running') DO NOTHING
+            RETURNING id
+        """, {'country_id': country.id, 'date_from': date_from, 'date_to': date_to,
+              'uid': self.env.uid, 'now': now})
+        row = self.env.cr.fetchone()
+        if not row:
+            return self.search([
+                ('country_id', '=', country.id),
+                ('state', 'in', ('queued', 'running')),
+                ('date_from', '=', date_from),
+                ('date_to', '=', date_to),
+            ], limit=1)
+
+        self.env.ref('hd_electricity_price.ir_cron_run_price_import_jobs').sudo()._trigger()
+        return self.browse(row[0])
+
+    @api.model
+    def _cron_run_jobs(self):
+        """
+        Виконання завдань у черзі. Завдання в стані "Виконується", блокування
+        якого ніхто не утримує, були перервані та запускаються знову.
+        """
+        for job in self.search([('state', 'in', ('queued', 'running'))], order='id'):
+            job._run()
+
+    def _run(self):
+        """
+        Виконання завдання частинами по IMPORT_JOB_CHUNK_DAYS днів; після кожної
+        частини прогрес фіксується (commit). Після завершення ініціатор
+        отримує сповіщення через шину.
+
+        :return: False, якщо завдання вже виконує інший процес
+        """
+        self.ensure_one()
+        cr = self.env.cr
+        cr.execute("SELECT pg_try_advisory_lock(%s, %s)", (IMPORT_JOB_LOCK_NAMESPACE, self.id))
+        if not cr.fetchone()[0]:
+            return False
+
+        try:
+            self.invalidate_recordset()
+            if self.state not in ('queued', 'running'):
+                return True
+            self.write({'state': 'running', 'progress': 0.0, 'prices_saved': 0,
+                        'date_start': fields.Datetime.now(), 'error_message': False})
+            cr.commit()
+
+            price_model = self.env['electricity.price.rdn']
+            country = self.country_id
+            if not country.entsoe_domain_id:
+                raise UserError(_("Для країни %s не налаштовано домен ENTSO-E") % country.name)
+
+            chunks = price_model._split_date_range(self.date_from, self.date_to, IMPORT_JOB_CHUNK_DAYS)
+            for index, (chunk_from, chunk_to) in enumerate(chunks, start=1):
+                # Повторний імпорт завжди запитує API, а не кеш відповідей
+                prices_saved = price_model._fetch_and_store_chunk(country, chunk_from, chunk_to, use_cache=False)
+                self.write({
+                    'prices_saved': self.prices_saved + prices_saved,
+                    'progress': 100.0 * index / len(chunks),
+                })
+                cr.commit()
+
+            self.write({'state': 'done', 'date_done': fields.Datetime.now()})
+        except Exception as e:
+            _logger.exception("Помилка завдання завантаження цін %s", self.display_name)
+            cr.rollback()
+            self.write({'state': 'error', 'error_message': str(e), 'date_done': fields.Datetime.now()})
+        finally:
+            cr.execute("SELECT pg_advisory_unlock(%s, %s)", (IMPORT_JOB_LOCK_NAMESPACE, self.id))
+
+        self._notify_done()
+        cr.commit()
+        return True
+
+    def _notify_done(self):
+        self.ensure_one()
+        if self.state == 'done':
+            if self.prices_saved:
+                message = _("Ціни для %s за %s - %s завантажено (%s записів).") % (
+                    self.country_id.name, self.date_from, self.date_to, self.prices_saved)
+                notification_type = 'success'
+            else:
+                message = _("Не отримано даних про ціни для %s за %s - %s") % (
+                    self.country_id.name, self.date_from, self.date_to)
+                notification_type = 'warning'
+        else:
+            message = _("Не вдалося імпортувати ціни: %s") % self.error_message
+            notification_type = 'danger'
+        self.env['bus.bus']._sendone(self.user_id.partner_id, 'simple_notification', {
+            'title': _('Імпорт цін'),
+            'message': message,
+            'type': notification_type,
+            'sticky': notification_type != 'success',
+        })
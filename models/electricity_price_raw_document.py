@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# Модель для дедуплікованого зберігання сирих відповідей API ENTSO-E
+
+from odoo import fields, models, api
+import base64
+import hashlib
+import zlib
+
+
+class ElectricityPriceRawDocument(models.Model):
+    _name = 'electricity.price.raw.document'
+    _description = 'Сира відповідь API ENTSO-E'
+    _order = 'fetch_date desc, id desc'
+    _rec_name = 'content_hash'
+
+    content_hash = fields.Char(string='Хеш вмісту (SHA-256)', required=True, readonly=True, index=True,
+                               help="SHA-256 від нестисненого тексту відповіді, ключ дедуплікації")
+    entsoe_domain_id = fields.Many2one('electricity.entsoe.domain', string='Домен ENTSO-E', readonly=True,
+                                       ondelete='set null')
+    period_start = fields.Date(string='Початок періоду', readonly=True)
+    period_end = fields.Date(string='Кінець періоду', readonly=True)
+    fetch_date = fields.Datetime(string='Час отримання', readonly=True, default=fields.Datetime.now)
+    data_compressed = fields.Binary(string='Стиснений вміст', attachment=False, readonly=True,
+                                    help="Відповідь API, стиснена zlib")
+    raw_size = fields.Integer(string='Розмір (байт)', readonly=True)
+    compressed_size = fields.Integer(string='Стиснений розмір (байт)', readonly=True)
+    content = fields.Text(string='Сира відповідь API', compute='_compute_content',
+                          help="Розпакована XML-відповідь; обчислюється лише при відкритті запису")
+
+    _sql_constraints = [
+        ('content_hash_unique', 'unique(content_hash)', 'Відповідь з таким вмістом вже збережена!'),
+    ]
+
+    @api.depends('data_compressed')
+    def _compute_content(self):
+        # bin_size=False гарантує, що буде прочитано сам вміст, а не його розмір
+        for record, record_data in zip(self, self.with_context(bin_size=False)):
+            if record_data.data_compressed:
+                record.content = zlib.decompress(base64.b64decode(record_data.data_compressed)).decode('utf-8')
+            else:
+                record.content = False
+
+    @api.model
+    def _store_response(self, raw_response, domain_id, period_start, period_end, fetch_date=None):
+        """
+        Збереження відповіді API один раз: повторна відповідь з тим самим вмістом
+        повертає вже існуючий запис.
+
+        :param raw_response: Сира XML відповідь (str)
+        :param domain_id: ID домену ENTSO-E
+        :param period_start: Перша дата періоду запиту
+        :param period_end: Остання дата періоду запиту
+        :param fetch_date: Час отримання (за замовчуванням - зараз)
+        :return: Запис electricity.price.raw.document
+        """
+        raw_bytes = raw_response.encode('utf-8')
+        content_hash = hashlib.sha256(raw_bytes).hexdigest()
+
+        existing = self.search([('content_hash', '=', content_hash)], limit=1)
+        if existing:
+            return existing
+
+        compressed = zlib.compress(raw_bytes, 9)
+        return self.create({
+            'content_hash': content_hash,
+            'entsoe_domain_id': domain_id,
+            'period_start': period_start,
+            'period_end': period_end,
+            'fetch_date': fetch_date or fields.Datetime.now(),
+            'data_compressed': base64.b64encode(compressed),
+            'raw_size': len(raw_bytes),
+            'compressed_size': len(compressed),
+        })
@@ -0,0 +1,414 @@
+# -*- coding: utf-8 -*-
+# Компактне зберігання цін: один рядок на (країна, дата, роздільна здатність) з масивом цін
+
+from odoo import fields, models, api, tools, _
+from odoo.tools import SQL
+from odoo.exceptions import UserError
+from dateutil.relativedelta import relativedelta
+import logging
+
+from ..tools.local_time import REPEATED_HOUR
+from .electricity_price_domain_recompute import STALE_SERIES_QUERY
+
+_logger = logging.getLogger(__name__)
+
+# Роздільні здатності документів A44, що зберігаються як окремі ряди (хвилини)
+SERIES_RESOLUTIONS = (15, 30, 60)
+MINUTES_PER_DAY = 24 * 60
+
+# Погодинне представлення рядів: для кожної дати береться ряд з найдрібнішою
+# роздільною здатністю, ціни інтервалів усереднюються до годин.
+# id = id ряду * 100 + година, тож він стабільний, поки існує ряд.
+# Інтервали після кінця доби - повторна година 25-годинної доби (година 24).
+HOURLY_VIEW_QUERY = """
+    SELECT s.id * 100 + h.hour AS id,
+           s.id AS series_id,
+           s.country_id,
+           s.entsoe_domain_id,
+           s.price_date,
+           h.hour,
+           h.price,
+           s.raw_document_id
+      FROM {series_table} s
+     CROSS JOIN LATERAL (
+           SELECT ((p.position - 1) * s.resolution / 60)::int AS hour, avg(p.price) AS price
+             FROM unnest(s.prices) WITH ORDINALITY AS p(price, position)
+            WHERE p.price IS NOT NULL
+            GROUP BY 1
+     ) h
+     WHERE NOT EXISTS (
+           SELECT 1 FROM {series_table} f
+            WHERE f.country_id = s.country_id AND f.price_date = s.price_date
+              AND f.resolution < s.resolution
+     )
+"""
+
+
+# Партиціонування таблиці рядів (вмикається вручну): секція на кожен місяць,
+# секція за замовчуванням для решти дат та кількість місяців, секції яких
+# створюються наперед
+PARTITION_DEFAULT = 'electricity_price_series_default'
+PARTITION_MONTHS_AHEAD = 3
+
+
+def _partition_name(month):
+    return f'electricity_price_series_p{month:%Y%m}'
+
+
+def _array_literal(values):
+    """
+    Текстовий літерал масиву PostgreSQL; None - відсутня ціна (NULL).
+    """
+    return '{%s}' % ','.join('NULL' if value is None else repr(float(value)) for value in values)
+
+
+def _covered_hours(resolution, values):
+    """
+    Кількість годин, для яких у ряді є хоча б одна ціна.
+    """
+    return len({position * resolution // 60 for position, value in enumerate(values) if value is not None})
+
+
+class ElectricityPriceSeries(models.Model):
+    _name = 'electricity.price.series'
+    _description = 'Добовий ряд цін РДН'
+    _order = 'price_date desc, country_id, resolution'
+    _rec_name = 'price_date'
+
+    country_id = fields.Many2one('res.country', string='Країна', required=True, readonly=True, index=True)
+    entsoe_domain_id = fields.Many2one(
+        'electricity.entsoe.domain',
+        string='Домен ENTSO-E',
+        compute='_compute_entsoe_domain_id',
+        store=True,
+        readonly=True,
+        help="Домен ENTSO-E, що обчислюється на основі обраної країни. Після зміни домену країни "
+             "збережені ряди оновлює фонове завдання перерахунку."
+    )
+    domain_stale = fields.Boolean(string='Застарілий домен', compute='_compute_domain_stale',
+                                  search='_search_domain_stale',
+                                  help="Домен ряду не відповідає поточному домену країни (перерахунок ще не виконано)")
+    price_date = fields.Date(string='Дата', required=True, readonly=True,
+                             help="Дата за місцевим часом домену")
+    resolution = fields.Integer(string='Роздільна здатність (хв)', required=True, readonly=True,
+                                help="Тривалість інтервалу ціни: 15, 30 або 60 хвилин")
+    raw_document_id = fields.Many2one('electricity.price.raw.document', string='Сира відповідь API',
+                                      readonly=True, ondelete='set null', index='btree_not_null')
+    point_count = fields.Integer(string='Кількість цін', compute='_compute_point_count',
+                                 help="Кількість інтервалів ряду, для яких збережено ціну")
+
+    _sql_constraints = [
+        ('unique_series', 'unique(country_id, price_date, resolution)',
+         'Ряд цін для цієї країни, дати та роздільної здатності вже існує!'),
+    ]
+
+    def init(self):
+        # Масив цін не має відповідного типу поля ORM, тому колонка керується напряму
+        self.env.cr.execute("ALTER TABLE electricity_price_series ADD COLUMN IF NOT EXISTS prices float8[]")
+        # Усі читання фільтрують діапазон дат; BRIN-індекс займає кілька сторінок,
+        # бо ряди додаються переважно в порядку дат
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS electricity_price_series_price_date_brin
+                ON electricity_price_series USING brin (price_date)
+        """)
+
+    @api.depends('country_id.entsoe_domain_id')
+    def _compute_entsoe_domain_id(self):
+        # Зміна домену самої країни сюди не доходить: її обробляє
+        # electricity.price.domain.recompute одним проходом SQL (див. res.country.modified)
+        for record in self:
+            record.entsoe_domain_id = record.country_id.entsoe_domain_id
+
+    @api.depends('entsoe_domain_id', 'country_id.entsoe_domain_id')
+    def _compute_domain_stale(self):
+        for record in self:
+            record.domain_stale = record.entsoe_domain_id != record.country_id.entsoe_domain_id
+
+    def _search_domain_stale(self, operator, value):
+        if operator not in ('=', '!=') or not isinstance(value, bool):
+            raise UserError(_("Непідтримуваний пошук за полем 'Застарілий домен'"))
+        stale = (operator == '=') == value
+        return [('id', 'in' if stale else 'not in', SQL(STALE_SERIES_QUERY))]
+
+    def _compute_point_count(self):
+        counts = {}
+        if self.ids:
+            self.env.cr.execute("""
+                SELECT s.id, (SELECT count(*) FROM unnest(s.prices) AS p(price) WHERE p.price IS NOT NULL)
+                  FROM electricity_price_series s
+                 WHERE s.id IN %s
+            """, (tuple(self.ids),))
+            counts = dict(self.env.cr.fetchall())
+        for record in self:
+            record.point_count = counts.get(record.id, 0)
+
+    @api.model
+    def _upsert_series(self, country_id, series, raw_document_id=None, stats=None, merge=True):
+        """
+        Set-based збереження рядів цін одним запитом INSERT ... ON CONFLICT.
+
+        :param country_id: ID країни
+        :param series: Словник {(price_date, resolution): список цін}; None - ціна
+                       відсутня, довжина списку - кількість інтервалів доби за
+                       годинником (з повторною годиною 25-годинної доби в кінці)
+        :param raw_document_id: ID збереженої сирої відповіді
+        :param stats: Словник, у який додаються rows_inserted та rows_updated
+        :param merge: True - відсутні ціни нового ряду не затирають збережені;
+                      False - ряд замінюється повністю
+        :return: Кількість збережених годинних цін
+        :raise AccessError: якщо користувач не може створювати ціни
+        """
+        # Прямий SQL оминає права доступу ORM, тож вони перевіряються явно;
+        # крон та фонові завдання виконуються від імені суперкористувача
+        self.env['electricity.price.rdn'].check_access('create')
+        if not series:
+            return 0
+
+        country = self.env['res.country'].browse(country_id)
+        keys = sorted(series)
+        if merge:
+            prices_update = """ARRAY(
+                       SELECT coalesce(m.new_price, m.old_price)
+                         FROM unnest(EXCLUDED.prices, s.prices) WITH ORDINALITY AS m(new_price, old_price, position)
+                        ORDER BY m.position
+                   )"""
+        else:
+            prices_update = "EXCLUDED.prices"
+
+        self.flush_model()
+        self.env.cr.execute(f"""
+            INSERT INTO electricity_price_series AS s (
+                country_id, entsoe_domain_id, price_date, resolution, prices, raw_document_id,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT %(country_id)s, %(domain_id)s, t.price_date, t.resolution, t.prices::float8[],
+                   %(raw_document_id)s, %(uid)s, %(now)s, %(uid)s, %(now)s
+              FROM unnest(%(dates)s::date[], %(resolutions)s::int[], %(prices)s::text[])
+                AS t(price_date, resolution, prices)
+            ON CONFLICT (country_id, price_date, resolution) DO UPDATE
+               SET prices = {prices_update},
+                   raw_document_id = coalesce(EXCLUDED.raw_document_id, s.raw_document_id),
+                   entsoe_domain_id = EXCLUDED.entsoe_domain_id,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+            RETURNING price_date, resolution, (xmax = 0)
+        """, {
+            'country_id': country_id,
+            'domain_id': country.entsoe_domain_id.id or None,
+            'raw_document_id': raw_document_id,
+            'uid': self.env.uid,
+            'now': fields.Datetime.now(),
+            'dates': [key[0] for key in keys],
+            'resolutions': [key[1] for key in keys],
+            'prices': [_array_literal(series[key]) for key in keys],
+        })
+
+        prices_saved = 0
+        for price_date, resolution, inserted in self.env.cr.fetchall():
+            hours = _covered_hours(resolution, series[(price_date, resolution)])
+            prices_saved += hours
+            if stats is not None:
+                counter = 'rows_inserted' if inserted else 'rows_updated'
+                stats[counter] = stats.get(counter, 0) + hours
+
+        self._after_prices_changed({(country_id, key[0]) for key in keys})
+        return prices_saved
+
+    @api.model
+    def _set_hour_prices(self, country_id, prices):
+        """
+        Зміна окремих годинних цін (ручне редагування через погодинну модель).
+        Година записується в усі інтервали ряду, що показується для дати;
+        якщо ряду немає, створюється погодинний.
+
+        :param country_id: ID країни
+        :param prices: Словник {(price_date, hour): ціна або None для видалення};
+                       година REPEATED_HOUR - повторна година 25-годинної доби
+        """
+        if not prices:
+            return
+        dates = sorted({price_date for price_date, _hour in prices})
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT DISTINCT ON (price_date) price_date, resolution, prices
+              FROM electricity_price_series
+             WHERE country_id = %s AND price_date = ANY(%s)
+             ORDER BY price_date, resolution
+        """, (country_id, dates))
+        existing = {price_date: (resolution, values or []) for price_date, resolution, values in self.env.cr.fetchall()}
+
+        series = {}
+        for (price_date, hour), price in sorted(prices.items()):
+            if not 0 <= hour <= REPEATED_HOUR:
+                raise UserError(_("Година має бути в межах 0-%s, отримано %s") % (REPEATED_HOUR, hour))
+            if price_date not in existing:
+                if price is None:
+                    continue
+                existing[price_date] = (60, [None] * 24)
+            resolution, values = existing[price_date]
+            per_hour = 60 // resolution
+            first = hour * per_hour
+            if len(values) < first + per_hour:
+                values.extend([None] * (first + per_hour - len(values)))
+            values[first:first + per_hour] = [price] * per_hour
+            series[(price_date, resolution)] = values
+
+        self._upsert_series(country_id, series, merge=False)
+
+        # Ряди без жодної ціни не зберігаються
+        self.env.cr.execute("""
+            DELETE FROM electricity_price_series s
+             WHERE s.country_id = %s AND s.price_date = ANY(%s)
+               AND NOT EXISTS (SELECT 1 FROM unnest(s.prices) AS p(price) WHERE p.price IS NOT NULL)
+        """, (country_id, dates))
+        if self.env.cr.rowcount:
+            self._after_prices_changed({(country_id, price_date) for price_date in dates})
+
+    @api.model
+    def _after_prices_changed(self, keys):
+        """
+        Скидання кешів і оновлення агрегатів після прямих змін таблиці рядів.
+
+        :param keys: Пари (country_id, price_date), ціни яких змінились
+        """
+        # Кеш ORM та кеш цін більше не відповідають вмісту таблиці
+        self.invalidate_model()
+        price_model = self.env['electricity.price.rdn']
+        price_model.invalidate_model()
+        price_model._invalidate_price_lookup(keys)
+        self.env['electricity.price.rdn.daily']._refresh_keys(keys)
+
+    @api.model
+    def _is_partitioned(self):
+        self.env.cr.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('electricity_price_series')")
+        row = self.env.cr.fetchone()
+        return bool(row) and row[0] == 'p'
+
+    @api.model
+    def _get_partition(self, month):
+        """
+        :return: Назва секції місяця або None, якщо таблиця не партиційована
+                 чи секцію не створено
+        """
+        if not self._is_partitioned():
+            return None
+        name = _partition_name(month)
+        self.env.cr.execute("SELECT to_regclass(%s)", (name,))
+        return name if self.env.cr.fetchone()[0] else None
+
+    @api.model
+    def _create_partition(self, month, parent='electricity_price_series'):
+        """
+        Створення секції місяця. Ряди цього місяця, що потрапили в секцію за
+        замовчуванням, переносяться в нову секцію.
+
+        :param month: Перший день місяця (date object)
+        :param parent: Партиційована таблиця
+        """
+        cr = self.env.cr
+        name = _partition_name(month)
+        bounds = (str(month), str(month + relativedelta(months=1)))
+        cr.execute(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        cr.execute(f"""
+            WITH moved AS (
+                DELETE FROM {PARTITION_DEFAULT} WHERE price_date >= %s AND price_date < %s RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """, bounds)
+        cr.execute(f"ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", bounds)
+
+    @api.model
+    def _upcoming_months(self):
+        month = fields.Date.context_today(self).replace(day=1)
+        return {month + relativedelta(months=offset) for offset in range(PARTITION_MONTHS_AHEAD + 1)}
+
+    @api.model
+    def _enable_partitioning(self):
+        """
+        Перетворення таблиці рядів на партиційовану за місяцями (price_date).
+        Таблиця перебудовується в одній транзакції з повним блокуванням, тож
+        операцію варто виконувати у вікно обслуговування.
+
+        Первинний ключ стає (id, price_date), бо унікальні обмеження
+        партиційованої таблиці мають містити ключ партиціонування; решта
+        обмежень та індексів відтворюються з тими ж назвами, тож оновлення
+        модуля їх не змінює.
+
+        :return: False, якщо таблиця вже партиційована
+        """
+        if self._is_partitioned():
+            return False
+        self.flush_model()
+        cr = self.env.cr
+        cr.execute("LOCK TABLE electricity_price_series IN ACCESS EXCLUSIVE MODE")
+        cr.execute("""
+            SELECT conname, pg_get_constraintdef(oid)
+              FROM pg_constraint
+             WHERE conrelid = 'electricity_price_series'::regclass AND contype IN ('f', 'u')
+        """)
+        constraints = cr.fetchall()
+        cr.execute("""
+            SELECT pg_get_indexdef(i.indexrelid)
+              FROM pg_index i
+             WHERE i.indrelid = 'electricity_price_series'::regclass
+               AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+        """)
+        indexes = [row[0] for row in cr.fetchall()]
+        cr.execute("SELECT pg_get_serial_sequence('electricity_price_series', 'id')")
+        sequence = cr.fetchone()[0]
+        cr.execute("SELECT DISTINCT date_trunc('month', price_date)::date FROM electricity_price_series")
+        months = {row[0] for row in cr.fetchall()} | self._upcoming_months()
+
+        # Представлення залежить від таблиці й відтворюється після перебудови
+        tools.drop_view_if_exists(cr, 'electricity_price_rdn')
+        cr.execute("""
+            CREATE TABLE electricity_price_series_partitioned
+                (LIKE electricity_price_series INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+                PARTITION BY RANGE (price_date)
+        """)
+        cr.execute(f"CREATE TABLE {PARTITION_DEFAULT} PARTITION OF electricity_price_series_partitioned DEFAULT")
+        for month in sorted(months):
+            self._create_partition(month, parent='electricity_price_series_partitioned')
+        cr.execute("INSERT INTO electricity_price_series_partitioned SELECT * FROM electricity_price_series")
+
+        cr.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+        cr.execute("DROP TABLE electricity_price_series")
+        cr.execute("ALTER TABLE electricity_price_series_partitioned RENAME TO electricity_price_series")
+        cr.execute(f"ALTER SEQUENCE {sequence} OWNED BY electricity_price_series.id")
+        cr.execute("ALTER TABLE electricity_price_series ADD PRIMARY KEY (id, price_date)")
+        for name, definition in constraints:
+            cr.execute(f'ALTER TABLE electricity_price_series ADD CONSTRAINT "{name}" {definition}')
+        for definition in indexes:
+            cr.execute(definition)
+
+        self.env['electricity.price.rdn'].init()
+        cr.execute("ANALYZE electricity_price_series")
+        self.invalidate_model()
+        _logger.info("Таблицю рядів цін партиційовано: %s місячних секцій", len(months))
+        return True
+
+    @api.model
+    def _ensure_partitions(self):
+        """
+        Створення секцій для наступних місяців та для місяців, ряди яких
+        потрапили в секцію за замовчуванням (наприклад, імпорт старих архівів).
+        """
+        cr = self.env.cr
+        cr.execute(f"SELECT DISTINCT date_trunc('month', price_date)::date FROM {PARTITION_DEFAULT}")
+        months = {row[0] for row in cr.fetchall()} | self._upcoming_months()
+        for month in sorted(months):
+            cr.execute("SELECT to_regclass(%s)", (_partition_name(month),))
+            if not cr.fetchone()[0]:
+                self._create_partition(month)
+
+    @api.model
+    def _cron_maintain_storage(self):
+        """
+        Щоденне обслуговування зберігання: секції партиційованої таблиці та
+        перенесення старих рядів в архів за терміном зберігання.
+        """
+        if self._is_partitioned():
+            self.flush_model()
+            self._ensure_partitions()
+            self.env.cr.commit()
+        self.env['electricity.price.series.archive']._apply_retention()
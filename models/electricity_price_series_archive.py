@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+# Архів старих рядів цін: один рядок на (країна, місяць, роздільна здатність) зі стиснутим масивом
+
+from odoo import fields, models, api
+from dateutil.relativedelta import relativedelta
+import logging
+import psycopg2
+
+_logger = logging.getLogger(__name__)
+
+# Максимальна тривалість доби (хв) - ширина рядка місячного масиву (25-годинна доба)
+ARCHIVE_DAY_MINUTES = 25 * 60
+
+# Розгортання місячних рядків архіву в добові ряди з тими ж колонками, що
+# й electricity_price_series. {archive} - таблиця або підзапит з колонками архіву.
+ARCHIVE_DAYS_QUERY = """
+    SELECT a.country_id, (a.price_month + d.day - 1) AS price_date, a.resolution, r.prices
+      FROM {archive} a
+     CROSS JOIN LATERAL generate_series(1, array_length(a.prices, 1)) AS d(day)
+     CROSS JOIN LATERAL (SELECT ARRAY(SELECT unnest(a.prices[d.day:d.day][:])) AS prices) r
+     WHERE array_remove(r.prices, NULL) <> '{{}}'
+"""
+
+
+class ElectricityPriceSeriesArchive(models.Model):
+    """
+    Ряди цін, старші за термін зберігання. Доби місяця зберігаються одним
+    двовимірним масивом (доба x інтервал), доповненим до 25 годин, тож на
+    місяць припадає один рядок таблиці, а масив стискається TOAST.
+
+    Архів не входить у погодинне представлення, але читається аналітикою
+    (electricity.price.analytics) разом з актуальними рядами.
+    """
+    _name = 'electricity.price.series.archive'
+    _description = 'Архів рядів цін РДН'
+    _order = 'price_month desc, country_id, resolution'
+    _rec_name = 'price_month'
+    _log_access = False
+
+    country_id = fields.Many2one('res.country', string='Країна', required=True, readonly=True)
+    price_month = fields.Date(string='Місяць', required=True, readonly=True, help="Перший день місяця")
+    resolution = fields.Integer(string='Роздільна здатність (хв)', required=True, readonly=True)
+
+    _sql_constraints = [
+        ('unique_archive', 'unique(country_id, price_month, resolution)',
+         'Архів цін для цієї країни, місяця та роздільної здатності вже існує!'),
+    ]
+
+    def init(self):
+        cr = self.env.cr
+        cr.execute("ALTER TABLE electricity_price_series_archive ADD COLUMN IF NOT EXISTS prices float8[]")
+        # LZ4 (PostgreSQL 14+, якщо сервер зібрано з ним) стискає швидше за типовий pglz
+        try:
+            with cr.savepoint(flush=False):
+                cr.execute("ALTER TABLE electricity_price_series_archive ALTER COLUMN prices SET COMPRESSION lz4")
+        except psycopg2.Error:
+            _logger.info("Стиснення LZ4 недоступне, архів цін використовує типове стиснення TOAST")
+
+    @api.model
+    def _get_cutoff(self):
+        """
+        :return: Перший місяць, що лишається в актуальних рядах, або None, якщо
+                 термін зберігання не задано
+        """
+        years = int(self.env['ir.config_parameter'].sudo().get_param('hd_electricity_price.retention_years', 0) or 0)
+        if years <= 0:
+            return None
+        return fields.Date.context_today(self).replace(day=1) - relativedelta(years=years)
+
+    @api.model
+    def _get_archived_months(self, months):
+        """
+        :param months: Пари (country_id, перший день місяця)
+        :return: Множина пар з months, для яких є рядки архіву
+        """
+        if not months:
+            return set()
+        self.flush_model()
+        months = list(months)
+        self.env.cr.execute("""
+            SELECT DISTINCT a.country_id, a.price_month
+              FROM electricity_price_series_archive a
+              JOIN unnest(%s::int[], %s::date[]) AS k(country_id, price_month)
+                ON k.country_id = a.country_id AND k.price_month = a.price_month
+        """, ([month[0] for month in months], [month[1] for month in months]))
+        return set(self.env.cr.fetchall())
+
+    @api.model
+    def _apply_retention(self, commit=True):
+        """
+        Перенесення в архів усіх місяців, старших за термін зберігання
+        (параметр hd_electricity_price.retention_years). Денні та місячні
+        агрегати не змінюються.
+
+        :param commit: Фіксувати транзакцію після кожного місяця
+        :return: Кількість перенесених місяців
+        """
+        cutoff = self._get_cutoff()
+        if not cutoff:
+            return 0
+        series_model = self.env['electricity.price.series']
+        series_model.flush_model()
+        self.env.cr.execute("""
+            SELECT DISTINCT date_trunc('month', price_date)::date
+              FROM electricity_price_series
+             WHERE price_date < %s
+             ORDER BY 1
+        """, (cutoff,))
+        months = [row[0] for row in self.env.cr.fetchall()]
+        for month in months:
+            self._archive_month(month)
+            if commit:
+                self.env.cr.commit()
+            _logger.info("Ціни за %s перенесено в архів", month.strftime('%Y-%m'))
+        return len(months)
+
+    @api.model
+    def _archive_month(self, month):
+        """
+        Перенесення рядів одного місяця в архів одним запитом. Ряди, що вже є
+        в архіві за цей місяць, об'єднуються з перенесеними (перенесені мають
+        перевагу). Секція місяця партиційованої таблиці видаляється цілком.
+
+        :param month: Перший день місяця (date object)
+        """
+        cr = self.env.cr
+        series_model = self.env['electricity.price.series']
+        partition = series_model._get_partition(month)
+        if partition:
+            # Блокування не дає записати в секцію ряди, які зникнуть разом з нею
+            cr.execute(f"LOCK TABLE {partition} IN ACCESS EXCLUSIVE MODE")
+            moved = f"SELECT country_id, price_date, resolution, prices FROM {partition}"
+        else:
+            moved = """
+                DELETE FROM electricity_price_series
+                 WHERE price_date >= %(month)s AND price_date < %(month_end)s
+                RETURNING country_id, price_date, resolution, prices
+            """
+
+        cr.execute(f"""
+            WITH moved AS ({moved}),
+            archived AS (
+                DELETE FROM electricity_price_series_archive a
+                 WHERE a.price_month = %(month)s
+                   AND (a.country_id, a.resolution) IN (SELECT country_id, resolution FROM moved)
+                RETURNING a.country_id, a.price_month, a.resolution, a.prices
+            ),
+            days AS (
+                SELECT country_id, price_date, resolution, prices FROM moved
+                 UNION ALL
+                SELECT o.country_id, o.price_date, o.resolution, o.prices
+                  FROM ({ARCHIVE_DAYS_QUERY.format(archive='archived')}) o
+                 WHERE NOT EXISTS (
+                       SELECT 1 FROM moved m
+                        WHERE m.country_id = o.country_id AND m.price_date = o.price_date
+                          AND m.resolution = o.resolution
+                 )
+            )
+            INSERT INTO electricity_price_series_archive (country_id, price_month, resolution, prices)
+            SELECT k.country_id, %(month)s, k.resolution,
+                   array_agg(coalesce(s.prices[1:k.width], '{{}}')
+                             || array_fill(NULL::float8, ARRAY[k.width - coalesce(cardinality(s.prices[1:k.width]), 0)])
+                             ORDER BY d.day)
+              FROM (SELECT DISTINCT country_id, resolution, %(day_minutes)s / resolution AS width FROM days) k
+             CROSS JOIN generate_series(%(month)s::date, %(month_end)s::date - 1, interval '1 day') AS d(day)
+              LEFT JOIN days s
+                ON s.country_id = k.country_id AND s.resolution = k.resolution AND s.price_date = d.day
+             GROUP BY k.country_id, k.resolution
+        """, {'month': month, 'month_end': month + relativedelta(months=1), 'day_minutes': ARCHIVE_DAY_MINUTES})
+
+        if partition:
+            cr.execute(f"DROP TABLE {partition}")
+        series_model.invalidate_model()
+        self.invalidate_model()
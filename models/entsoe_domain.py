@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 from odoo import fields, models, api
+from odoo.addons.base.models.res_partner import _tz_get
+
+# Часовий пояс домену за замовчуванням (Румунія/Україна, UTC+2/+3)
+DEFAULT_DOMAIN_TIMEZONE = 'Europe/Bucharest'
 
 class ElectricityEntsoeDomain(models.Model):
     _name = 'electricity.entsoe.domain'
@@ -22,12 +26,47 @@ class ElectricityEntsoeDomain(models.Model):
         required=True,
         help="Відповідна країна в системі Odoo"
     )
+    tz = fields.Selection(
+        _tz_get,
+        string='Часовий пояс',
+        required=True,
+        default=DEFAULT_DOMAIN_TIMEZONE,
+        help="Часовий пояс торговельної зони. Визначає місцеві дату та годину цін, "
+             "зокрема 23- та 25-годинні доби переходу на літній/зимовий час. "
+             "Зміна не перераховує вже збережені ціни."
+    )
 
     _sql_constraints = [
         ('domain_code_unique', 'unique(domain_code)', 'Код домену ENTSO-E повинен бути унікальним!'),
         ('country_domain_unique', 'unique(country_id)', 'Кожна країна Odoo може бути пов\'язана лише з одним доменом ENTSO-E!'),
     ]
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        domains = super().create(vals_list)
+        domains._sync_country_links()
+        return domains
+
+    def write(self, vals):
+        previous_countries = self.country_id if 'country_id' in vals else None
+        result = super().write(vals)
+        if previous_countries is not None:
+            # Країна, від якої відв'язано домен, більше не посилається на нього
+            previous_countries.filtered(
+                lambda country: country.entsoe_domain_id in self and country not in self.country_id
+            ).write({'entsoe_domain_id': False})
+            self._sync_country_links()
+        return result
+
+    def _sync_country_links(self):
+        """
+        Прив'язка країни до домену (res.country.entsoe_domain_id) узгоджується
+        з країною домену; зміна ставить у чергу перерахунок домену в цінах.
+        """
+        for domain in self:
+            if domain.country_id and domain.country_id.entsoe_domain_id != domain:
+                domain.country_id.entsoe_domain_id = domain
+
     def name_get(self):
         result = []
         for record in self:
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from odoo import fields, models
+from odoo import fields, models, _
 
 class ResConfigSettings(models.TransientModel):
     _inherit = 'res.config.settings'
@@ -14,4 +14,90 @@ class ResConfigSettings(models.TransientModel):
         string="Токен безпеки API ENTSO-E",
         config_parameter='hd_electricity_price.entsoe_api_token',
         help="Ваш персональний токен безпеки для доступу до API ENTSO-E."
-    )
\ No newline at end of file
+    )
+    entsoe_fetch_workers = fields.Integer(
+        string="Кількість паралельних запитів",
+        config_parameter='hd_electricity_price.fetch_workers',
+        default=4,
+        help="Кількість потоків, що одночасно завантажують ціни різних країн під час автоматичного завантаження."
+    )
+    entsoe_rate_limit_per_minute = fields.Integer(
+        string="Ліміт запитів на хвилину",
+        config_parameter='hd_electricity_price.rate_limit_per_minute',
+        default=400,
+        help="Максимальна кількість запитів до API ENTSO-E на хвилину (квота платформи - 400)."
+    )
+    entsoe_cache_ttl = fields.Integer(
+        string="Час життя кешу відповідей (с)",
+        config_parameter='hd_electricity_price.cache_ttl',
+        default=3600,
+        help="Скільки секунд зберігаються в кеші відповіді за незавершені періоди. "
+             "Відповіді за минулі періоди зберігаються без обмеження часу."
+    )
+    entsoe_cache_max_mb = fields.Integer(
+        string="Максимальний розмір кешу (МБ)",
+        config_parameter='hd_electricity_price.cache_max_mb',
+        default=200,
+        help="При перевищенні розміру видаляються відповіді, до яких найдовше не звертались."
+    )
+    entsoe_gap_lookback_days = fields.Integer(
+        string="Глибина пошуку пропусків (днів)",
+        config_parameter='hd_electricity_price.gap_lookback_days',
+        default=7,
+        help="Автоматичне завантаження перевіряє цю кількість минулих днів і завантажує лише відсутні або неповні."
+    )
+    entsoe_publish_hour_utc = fields.Integer(
+        string="Година публікації цін на добу наперед (UTC)",
+        config_parameter='hd_electricity_price.day_ahead_publish_hour_utc',
+        default=12,
+        help="Після цієї години (UTC) автоматичне завантаження запитує і ціни на завтра."
+    )
+    entsoe_retention_years = fields.Integer(
+        string="Термін зберігання рядів цін (років)",
+        config_parameter='hd_electricity_price.retention_years',
+        default=0,
+        help="Місяці, старші за цей термін, щодня переносяться в стиснутий архів: вони лишаються доступними "
+             "аналітиці, але зникають з погодинних цін. 0 - зберігати все."
+    )
+    entsoe_series_partitioned = fields.Boolean(
+        string="Таблиця рядів партиційована",
+        compute='_compute_entsoe_series_partitioned',
+    )
+
+    def _compute_entsoe_series_partitioned(self):
+        partitioned = self.env['electricity.price.series'].sudo()._is_partitioned()
+        for record in self:
+            record.entsoe_series_partitioned = partitioned
+
+    def action_rebuild_price_aggregates(self):
+        """
+        Повне перебудування денних і місячних агрегатів цін.
+        """
+        self.env['electricity.price.rdn.daily'].sudo()._rebuild_all()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Готово'),
+                'message': _('Агрегати цін перебудовано.'),
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
+    def action_enable_price_partitioning(self):
+        """
+        Перетворення таблиці рядів цін на партиційовану за місяцями.
+        """
+        self.env['electricity.price.series'].sudo()._enable_partitioning()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Готово'),
+                'message': _('Таблицю рядів цін партиційовано за місяцями.'),
+                'type': 'success',
+                'sticky': False,
+                'next': {'type': 'ir.actions.act_window_close'},
+            }
+        }
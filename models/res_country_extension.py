@@ -8,4 +8,42 @@ class ResCountry(models.Model):
         'electricity.entsoe.domain',
         string='Домен ENTSO-E',
         help="Домен ENTSO-E, пов'язаний з цією країною для запитів цін на електроенергію."
-    )
\ No newline at end of file
+    )
+
+    def write(self, vals):
+        if 'entsoe_domain_id' not in vals:
+            return super().write(vals)
+        changed = self.filtered(lambda country: country.entsoe_domain_id.id != (vals['entsoe_domain_id'] or False))
+        result = super().write(vals)
+        if changed:
+            self.env['electricity.price.domain.recompute'].sudo()._enqueue(changed)
+        return result
+
+    def modified(self, fnames, create=False, before=False):
+        # Збережений домен цін залежить від домену країни, але перерахунок ORM
+        # пройшов би по кожному ряду цін країни; замість нього write ставить у
+        # чергу пакетний перерахунок SQL (electricity.price.domain.recompute).
+        # Решта залежних полів незбережені, тож достатньо скинути їх кеш
+        if 'entsoe_domain_id' in fnames and not create:
+            dependents = self._get_entsoe_domain_dependents()
+            if dependents is not None:
+                fnames = [fname for fname in fnames if fname != 'entsoe_domain_id']
+                for field in dependents:
+                    self.env[field.model_name].invalidate_model([field.name])
+        return super().modified(fnames, create=create, before=before)
+
+    def _get_entsoe_domain_dependents(self):
+        """
+        Поля, що залежать від домену країни, крім збереженого домену рядів цін.
+
+        :return: Список полів або None, якщо серед них є інші збережені поля
+                 (тоді перерахунок ORM не пропускається)
+        """
+        series_field = self.env['electricity.price.series']._fields['entsoe_domain_id']
+        dependents = [
+            field for field in self.pool.get_dependent_fields(self._fields['entsoe_domain_id'])
+            if field is not series_field
+        ]
+        if any(field.store for field in dependents):
+            return None
+        return dependents
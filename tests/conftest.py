@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+# Тести модулів tools/, що не залежать від Odoo: запуск без сервера Odoo
+#   python -m pytest tests
+#
+# Пакет модуля імпортує Odoo, тому модулі tools/ підключаються напряму з каталогу,
+# а tests/pytest.ini не дає pytest імпортувати пакет модуля.
+
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(__file__)
+FIXTURES_DIR = os.path.join(TESTS_DIR, 'fixtures')
+
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), 'tools'))
+
+
+@pytest.fixture
+def fixture_bytes():
+    def read(name):
+        with open(os.path.join(FIXTURES_DIR, name), 'rb') as fixture_file:
+            return fixture_file.read()
+    return read
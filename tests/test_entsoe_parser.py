@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import io
+
+import pytest
+
+from entsoe_parser import (
+    EntsoeAcknowledgement, EntsoeFormatError, ParseError, iter_periods, iter_prices, parse_resolution, parse_timestamp,
+)
+
+UA_DOMAIN = '10Y1001A1001A869'
+DE_DOMAIN = '10Y1001A1001A83F'
+# 2025-07-13T21:00Z та 2025-07-13T22:00Z - місцева північ 14.07 у Києві та Берліні
+UA_DAY_START = 1752440400
+DE_DAY_START = 1752444000
+
+
+@pytest.mark.parametrize('value, minutes', [
+    ('PT15M', 15), ('PT30M', 30), ('PT60M', 60), ('PT1H', 60), (' PT15M\n', 15),
+])
+def test_parse_resolution(value, minutes):
+    assert parse_resolution(value) == minutes
+
+
+@pytest.mark.parametrize('value', ['P1D', 'PT15S', '15', ''])
+def test_parse_resolution_unsupported(value):
+    with pytest.raises(EntsoeFormatError):
+        parse_resolution(value)
+
+
+@pytest.mark.parametrize('value', ['2025-07-13T21:00Z', '2025-07-13T21:00:00Z', '2025-07-13T21:00:00.000Z'])
+def test_parse_timestamp(value):
+    assert parse_timestamp(value) == UA_DAY_START
+
+
+def test_parse_timestamp_invalid():
+    with pytest.raises(EntsoeFormatError):
+        parse_timestamp('2025-07-13 21:00')
+
+
+def test_invalid_value_is_parse_error(fixture_bytes):
+    data = fixture_bytes('a44_pt60m.xml').replace(b'PT60M', b'P1D')
+
+    with pytest.raises(ParseError):
+        list(iter_periods(data))
+
+
+@pytest.mark.parametrize('name, resolution, count, start', [
+    ('a44_pt60m.xml', 60, 24, UA_DAY_START),
+    ('a44_pt30m.xml', 30, 48, UA_DAY_START),
+    ('a44_pt15m.xml', 15, 96, DE_DAY_START),
+])
+def test_resolutions(fixture_bytes, name, resolution, count, start):
+    periods = list(iter_periods(fixture_bytes(name)))
+
+    assert len(periods) == 1
+    period = periods[0]
+    assert period.resolution == resolution
+    assert period.start == start
+    assert period.end == start + 86400
+    assert len(period.points) == count
+    timestamps = [timestamp for timestamp, _price in period.points]
+    assert timestamps == [start + index * resolution * 60 for index in range(count)]
+
+
+def test_pt60m_prices(fixture_bytes):
+    period, = iter_periods(fixture_bytes('a44_pt60m.xml'))
+
+    assert period.domain_code == UA_DOMAIN
+    assert [price for _timestamp, price in period.points] == [position + 0.5 for position in range(1, 25)]
+
+
+def test_pt15m_prices(fixture_bytes):
+    period, = iter_periods(fixture_bytes('a44_pt15m.xml'))
+
+    assert period.domain_code == DE_DOMAIN
+    assert period.points[0] == (DE_DAY_START, 0.25)
+    assert period.points[-1] == (DE_DAY_START + 95 * 900, 24.0)
+
+
+def test_a03_curve_repeats_previous_price(fixture_bytes):
+    period, = iter_periods(fixture_bytes('a44_a03.xml'))
+
+    prices = [price for _timestamp, price in period.points]
+    assert len(prices) == 24
+    assert prices[:6] == [50.0, 40.0, 40.0, 40.0, 30.0, 35.0]
+    assert prices[6:19] == [35.0] * 13
+    assert prices[19:] == [90.0] * 5
+    assert [timestamp for timestamp, _price in period.points] == [UA_DAY_START + hour * 3600 for hour in range(24)]
+
+
+def test_a01_curve_keeps_gaps_and_drops_out_of_range_positions(fixture_bytes):
+    ua_period, de_period = iter_periods(fixture_bytes('a44_two_domains.xml'))
+
+    assert ua_period.domain_code == UA_DOMAIN
+    assert len(ua_period.points) == 24
+    assert de_period.domain_code == DE_DOMAIN
+    # Позиція 10 відсутня, позиція 30 поза межами 24-годинного періоду
+    assert len(de_period.points) == 23
+    assert DE_DAY_START + 9 * 3600 not in dict(de_period.points)
+    assert max(price for _timestamp, price in de_period.points) == 124
+
+
+@pytest.mark.parametrize('name, count', [
+    ('a44_dst_spring.xml', 23),
+    ('a44_dst_autumn.xml', 25),
+    ('a44_dst_autumn_pt15m.xml', 100),
+])
+def test_dst_days(fixture_bytes, name, count):
+    period, = iter_periods(fixture_bytes(name))
+
+    assert len(period.points) == count
+    assert (period.end - period.start) // (period.resolution * 60) == count
+
+
+def test_iter_prices_accepts_str_bytes_and_file(fixture_bytes):
+    data = fixture_bytes('a44_two_domains.xml')
+    expected = list(iter_prices(data))
+
+    assert len(expected) == 24 + 23
+    assert list(iter_prices(data.decode('utf-8'))) == expected
+    assert list(iter_prices(io.BytesIO(data))) == expected
+
+
+def test_acknowledgement(fixture_bytes):
+    with pytest.raises(EntsoeAcknowledgement) as error:
+        list(iter_periods(fixture_bytes('acknowledgement.xml')))
+
+    assert error.value.reason == 'No matching data found for Data item Day-ahead Prices'
+
+
+def test_malformed_xml(fixture_bytes):
+    data = fixture_bytes('a44_pt60m.xml')
+
+    with pytest.raises(ParseError):
+        list(iter_periods(data[:len(data) // 2]))
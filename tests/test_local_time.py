@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from entsoe_parser import iter_prices
+from local_time import REPEATED_HOUR, local_slots
+
+
+def _timestamps(points):
+    return [timestamp for timestamp, _price in points]
+
+
+def test_regular_day(fixture_bytes):
+    slots = local_slots('Europe/Kyiv', _timestamps(iter_prices(fixture_bytes('a44_pt60m.xml'))), 3600)
+
+    assert slots == [(date(2025, 7, 14), hour) for hour in range(24)]
+
+
+def test_regular_day_pt15m(fixture_bytes):
+    slots = local_slots('Europe/Berlin', _timestamps(iter_prices(fixture_bytes('a44_pt15m.xml'))), 900)
+
+    assert slots == [(date(2025, 7, 14), slot) for slot in range(96)]
+
+
+def test_spring_day_skips_missing_hour(fixture_bytes):
+    slots = local_slots('Europe/Berlin', _timestamps(iter_prices(fixture_bytes('a44_dst_spring.xml'))), 3600)
+
+    assert {day for day, _slot in slots} == {date(2025, 3, 30)}
+    assert [slot for _day, slot in slots] == [0, 1] + list(range(3, 24))
+
+
+def test_autumn_day_puts_repeated_hour_after_end_of_day(fixture_bytes):
+    slots = local_slots('Europe/Berlin', _timestamps(iter_prices(fixture_bytes('a44_dst_autumn.xml'))), 3600)
+
+    assert {day for day, _slot in slots} == {date(2025, 10, 26)}
+    # Перша 02:00 (CEST) - година 2, друга 02:00 (CET) - повторна година
+    assert [slot for _day, slot in slots] == [0, 1, 2, REPEATED_HOUR] + list(range(3, 24))
+
+
+def test_autumn_day_pt15m(fixture_bytes):
+    slots = local_slots('Europe/Berlin', _timestamps(iter_prices(fixture_bytes('a44_dst_autumn_pt15m.xml'))), 900)
+
+    assert [slot for _day, slot in slots] == list(range(12)) + [96, 97, 98, 99] + list(range(12, 96))
+
+
+def test_unordered_timestamps_and_year_boundary():
+    zone = ZoneInfo('Europe/Kyiv')
+    moments = [
+        datetime(2025, 1, 1, 0, tzinfo=zone),
+        datetime(2024, 12, 31, 23, tzinfo=zone),
+        datetime(2025, 7, 1, 12, tzinfo=zone),
+        datetime(2024, 12, 31, 21, tzinfo=zone),
+    ]
+    timestamps = [int(moment.timestamp()) for moment in moments]
+
+    assert local_slots('Europe/Kyiv', timestamps, 3600) == [(moment.date(), moment.hour) for moment in moments]
+
+
+@pytest.mark.parametrize('tz_name', ['Europe/Kyiv', 'Europe/Berlin', 'Europe/Lisbon'])
+def test_matches_zoneinfo_outside_repeated_hour(tz_name):
+    zone = ZoneInfo(tz_name)
+    start = int(datetime(2024, 12, 30, tzinfo=timezone.utc).timestamp())
+    timestamps = list(range(start, start + 800 * 86400, 3600))
+
+    slots = local_slots(tz_name, timestamps, 3600)
+
+    repeated = 0
+    for timestamp, (day, slot) in zip(timestamps, slots):
+        local = datetime.fromtimestamp(timestamp, zone)
+        assert day == local.date()
+        if slot == REPEATED_HOUR:
+            repeated += 1
+            assert local.fold == 1
+        else:
+            assert slot == local.hour
+    # Два переходи на зимовий час за період
+    assert repeated == 2
+
+
+def test_empty():
+    assert local_slots('Europe/Kyiv', [], 3600) == []
+
+
+def test_offsets_cover_requested_years():
+    timestamps = [int((datetime(2030, 3, 31, tzinfo=timezone.utc) + timedelta(hours=hour)).timestamp())
+                  for hour in range(3)]
+
+    assert [slot for _day, slot in local_slots('Europe/Kyiv', timestamps, 3600)] == [2, 4, 5]
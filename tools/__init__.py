@@ -0,0 +1,5 @@
+from . import entsoe_archive
+from . import entsoe_client
+from . import entsoe_parser
+from . import local_time
+from . import rate_limiter
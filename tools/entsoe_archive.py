@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Потокове читання архівів документів ENTSO-E (XML, ZIP, gzip) без розпакування на диск
+
+import gzip
+import logging
+import os
+import zipfile
+
+_logger = logging.getLogger(__name__)
+
+DOCUMENT_EXTENSIONS = ('.xml', '.xml.gz', '.zip')
+
+
+def _is_document(name):
+    return name.lower().endswith(DOCUMENT_EXTENSIONS)
+
+
+def iter_archive_documents(fileobj, name):
+    """
+    Обхід документів у файлі: XML, XML у gzip або ZIP-архів (зокрема вкладені
+    ZIP-архіви). Члени архіву читаються потоково, по одному.
+
+    :param fileobj: Файлоподібний об'єкт з підтримкою seek
+    :param name: Назва файлу; визначає тип вмісту та префікс назв членів
+    :return: Генератор пар (назва документа, файлоподібний об'єкт); об'єкт
+             дійсний лише до наступної ітерації
+    """
+    lower_name = name.lower()
+    # Перевірка вмісту потребує перемотування, тож лише для назв без відомого розширення
+    if lower_name.endswith('.zip') or (not _is_document(lower_name) and zipfile.is_zipfile(fileobj)):
+        fileobj.seek(0)
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in sorted(archive.infolist(), key=lambda item: item.filename):
+                if info.is_dir() or not _is_document(info.filename):
+                    continue
+                member_name = f'{name}/{info.filename}'
+                with archive.open(info) as member:
+                    yield from iter_archive_documents(member, member_name)
+    elif lower_name.endswith('.gz'):
+        fileobj.seek(0)
+        with gzip.GzipFile(fileobj=fileobj) as document:
+            yield name, document
+    else:
+        fileobj.seek(0)
+        yield name, fileobj
+
+
+def iter_path_documents(path):
+    """
+    Обхід документів у файлі або каталозі файлової системи (рекурсивно,
+    у відсортованому порядку, щоб повторний запуск обходив їх так само).
+
+    :return: Генератор пар (назва документа, файлоподібний об'єкт)
+    """
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file_name in sorted(files):
+                if _is_document(file_name):
+                    yield from iter_path_documents(os.path.join(root, file_name))
+        return
+    with open(path, 'rb') as fileobj:
+        yield from iter_archive_documents(fileobj, path)
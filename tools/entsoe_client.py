@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+# Клієнт API ENTSO-E: пул з'єднань, повтори з експоненційною затримкою
+# та локальний дисковий кеш відповідей
+
+from collections import namedtuple
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import gzip
+import hashlib
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_logger = logging.getLogger(__name__)
+
+# elapsed - тривалість HTTP-обміну (с, 0 для кешу), size - розмір тіла відповіді (байт)
+EntsoeResponse = namedtuple('EntsoeResponse', ['text', 'from_cache', 'elapsed', 'size'])
+
+# Ключові параметри запиту, що однозначно визначають відповідь
+CACHE_KEY_PARAMS = ('in_Domain', 'documentType', 'periodStart', 'periodEnd')
+
+
+class ResponseCache:
+    """
+    Дисковий кеш відповідей API з TTL та витісненням за розміром.
+
+    Кожна відповідь зберігається окремим gzip-файлом, назва якого - хеш ключа.
+    Відповіді застарівають через ``ttl`` секунд після запису; відповідь, яку
+    викликач підтвердив як повну (``mark_final``, суфікс ``.final``), не має
+    терміну дії. Якщо загальний розмір
+    перевищує ``max_bytes``, видаляються файли, до яких найдовше не звертались.
+    """
+
+    def __init__(self, directory, ttl=3600, max_bytes=200 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(params):
+        return hashlib.sha256('|'.join(str(params.get(name, '')) for name in CACHE_KEY_PARAMS).encode()).hexdigest()
+
+    def _path(self, key, final):
+        return os.path.join(self.directory, key + ('.final.gz' if final else '.gz'))
+
+    def get(self, key):
+        """
+        :return: Текст відповіді або None, якщо в кеші немає дійсного запису
+        """
+        now = time.time()
+        for final in (True, False):
+            path = self._path(key, final)
+            try:
+                if not final and os.path.getmtime(path) + self.ttl < now:
+                    os.unlink(path)
+                    continue
+                with gzip.open(path, 'rt', encoding='utf-8') as cache_file:
+                    text = cache_file.read()
+                # Час доступу для витіснення - у atime, mtime лишається часом запису
+                os.utime(path, (now, os.path.getmtime(path)))
+            except (FileNotFoundError, OSError, EOFError):
+                continue
+            with self._lock:
+                self.hits += 1
+            return text
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, text, final=False):
+        path = self._path(key, final)
+        # Атомарний запис: інші процеси не побачать частково записаний файл
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file, gzip.GzipFile(fileobj=tmp_file, mode='wb') as gz_file:
+                gz_file.write(text.encode('utf-8'))
+            os.replace(tmp_path, path)
+            # Нова відповідь замінює і попередню з іншою позначкою остаточності
+            other_path = self._path(key, not final)
+            if os.path.exists(other_path):
+                os.unlink(other_path)
+        except OSError:
+            _logger.warning("Не вдалося записати відповідь у кеш %s", path, exc_info=True)
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+        self._evict()
+
+    def mark_final(self, key):
+        """
+        Позначення збереженої відповіді як остаточної (без терміну дії).
+
+        :return: True, якщо відповідь була в кеші
+        """
+        try:
+            os.replace(self._path(key, False), self._path(key, True))
+        except OSError:
+            return False
+        return True
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith('.gz'):
+                        continue
+                    stat = entry.stat()
+                    entries.append((stat.st_atime, stat.st_size, entry.path))
+                    total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            for _atime, size, path in sorted(entries):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+class EntsoeClient:
+    """
+    Клієнт ENTSO-E Transparency Platform API.
+
+    Використовує один ``requests.Session`` з пулом keep-alive з'єднань,
+    повторює запити при 429/5xx та мережевих помилках з експоненційною
+    затримкою (з урахуванням заголовка Retry-After) і, якщо задано кеш,
+    віддає збережені відповіді без звернення до мережі.
+    Екземпляр безпечно використовувати з кількох потоків.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, base_url, token, cache=None, rate_limiter=None, timeout=30,
+                 max_retries=4, backoff_factor=1.0, max_backoff=60, pool_size=16):
+        self.base_url = base_url
+        self.token = token
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def fetch(self, params, use_cache=True):
+        """
+        Отримання документа API (параметри без securityToken).
+
+        :param params: Параметри запиту
+        :param use_cache: False - збережена в кеші відповідь ігнорується (наприклад,
+                          при повторному запиті днів, відомих як неповні), а нова
+                          відповідь замінює її
+        :return: EntsoeResponse(text, from_cache, elapsed, size)
+        :raise requests.exceptions.RequestException: якщо всі спроби невдалі
+        """
+        key = self.cache and ResponseCache.make_key(params)
+        if self.cache and use_cache:
+            text = self.cache.get(key)
+            if text is not None:
+                return EntsoeResponse(text, True, 0.0, len(text))
+
+        started = time.monotonic()
+        text, size = self._request(params)
+        elapsed = time.monotonic() - started
+
+        # Підтвердження без даних (наприклад, ціни ще не опубліковані) не кешуються.
+        # Відповідь зберігається з терміном дії: документ за минулий період теж
+        # може бути неповним, остаточною її робить лише mark_final
+        if self.cache and text.strip() and 'Acknowledgement_MarketDocument' not in text[:1000]:
+            self.cache.set(key, text)
+        return EntsoeResponse(text, False, elapsed, size)
+
+    def mark_final(self, params):
+        """
+        Позначення кешованої відповіді як остаточної, коли викликач перевірив,
+        що вона покриває весь запитаний період. Діє лише для минулих періодів.
+        """
+        if self.cache and self._is_final_period(params):
+            self.cache.mark_final(ResponseCache.make_key(params))
+
+    @staticmethod
+    def _is_final_period(params):
+        # Ціни на добу наперед за минулий період більше не змінюються
+        period_end = datetime.strptime(params['periodEnd'], '%Y%m%d%H%M').replace(tzinfo=timezone.utc)
+        return period_end <= datetime.now(timezone.utc)
+
+    def _request(self, params):
+        request_params = dict(params, securityToken=self.token)
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                response = self.session.get(self.base_url, params=request_params, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response.text, len(response.content)
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                _logger.warning("API ENTSO-E повернуло %s, повтор через %.1f с", response.status_code, delay)
+            attempt += 1
+            time.sleep(delay)
+
+    def _backoff(self, attempt):
+        delay = self.backoff_factor * (2 ** attempt)
+        return min(self.max_backoff, delay + random.uniform(0, delay / 2))
+
+    def _retry_after(self, response):
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return min(self.max_backoff, max(0.0, delay))
+
+    def stats(self):
+        return self.cache.stats() if self.cache else {'hits': 0, 'misses': 0}
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(base_url, token, cache_dir, cache_ttl, cache_max_bytes):
+    """
+    Спільний для процесу клієнт для пари (base_url, token), щоб з'єднання
+    пулу перевикористовувались між запитами та викликами крону.
+    """
+    with _clients_lock:
+        key = (base_url, token, cache_dir)
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = EntsoeClient(base_url, token, cache=ResponseCache(cache_dir))
+        client.cache.ttl = cache_ttl
+        client.cache.max_bytes = cache_max_bytes
+        return client
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# Потоковий парсер документів ENTSO-E A44 (Publication_MarketDocument).
+# Не залежить від Odoo, тому може використовуватись і тестуватись окремо.
+
+from collections import namedtuple
+from datetime import datetime
+import calendar
+import io
+import logging
+import re
+import xml.etree.ElementTree as ET
+
+_logger = logging.getLogger(__name__)
+
+ParseError = ET.ParseError
+
+# Один Period однієї TimeSeries: start/end - UTC timestamp (секунди),
+# resolution - хвилини, points - кортеж пар (utc_timestamp, price)
+PricePeriod = namedtuple('PricePeriod', ['domain_code', 'start', 'end', 'resolution', 'points'])
+
+_RESOLUTION_RE = re.compile(r'^PT(\d+)([MH])$')
+_TIME_FORMATS = ('%Y-%m-%dT%H:%MZ', '%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S.%fZ')
+
+# Тип кривої A03: пропущені позиції повторюють попередню ціну
+CURVE_TYPE_VARIABLE_BLOCK = 'A03'
+
+
+class EntsoeFormatError(ParseError, ValueError):
+    """
+    Некоректне значення в документі (роздільна здатність, час). Є ParseError,
+    тож обробляється так само, як некоректний XML.
+    """
+
+
+class EntsoeAcknowledgement(Exception):
+    """
+    API повернуло Acknowledgement_MarketDocument замість даних
+    (наприклад, "No matching data found" для ще не опублікованих цін).
+    """
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def parse_resolution(value):
+    """
+    Перетворення ISO 8601 тривалості (PT15M, PT30M, PT60M, PT1H) у хвилини.
+    """
+    match = _RESOLUTION_RE.match((value or '').strip())
+    if not match:
+        raise EntsoeFormatError(f"Непідтримувана роздільна здатність: {value}")
+    amount = int(match.group(1))
+    return amount * 60 if match.group(2) == 'H' else amount
+
+
+def parse_timestamp(value):
+    """
+    Перетворення часу ENTSO-E (2025-07-14T22:00Z з секундами чи без) у UTC timestamp.
+    """
+    value = (value or '').strip()
+    for time_format in _TIME_FORMATS:
+        try:
+            return calendar.timegm(datetime.strptime(value, time_format).timetuple())
+        except ValueError:
+            continue
+    raise EntsoeFormatError(f"Несподіваний формат часу: {value}")
+
+
+def _local_name(tag):
+    return tag.rpartition('}')[2]
+
+
+def iter_periods(source):
+    """
+    Потоковий розбір документа A44 без побудови повного дерева.
+
+    Оброблені елементи TimeSeries одразу видаляються, тому споживання пам'яті
+    не залежить від довжини періоду відповіді.
+
+    :param source: Файлоподібний об'єкт, bytes або str з XML
+    :return: Генератор PricePeriod
+    :raise EntsoeAcknowledgement: якщо документ є підтвердженням без даних
+    :raise ParseError: якщо XML некоректний (EntsoeFormatError - некоректне значення)
+    """
+    if isinstance(source, str):
+        source = source.encode('utf-8')
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    root = None
+    path = []
+    domain_code = curve_type = None
+    period_start = period_end = resolution = None
+    position = price = None
+    points = {}
+    reason = None
+
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        name = _local_name(elem.tag)
+        if event == 'start':
+            if root is None:
+                root = elem
+            path.append(name)
+            if name == 'TimeSeries':
+                domain_code = curve_type = None
+            elif name == 'Period':
+                period_start = period_end = resolution = None
+                points = {}
+            elif name == 'Point':
+                position = price = None
+            continue
+
+        path.pop()
+        text = elem.text
+        parent = path[-1] if path else None
+
+        if name == 'in_Domain.mRID' and parent == 'TimeSeries':
+            domain_code = text and text.strip()
+        elif name == 'curveType':
+            curve_type = text and text.strip()
+        elif parent == 'timeInterval' and 'Period' in path:
+            if name == 'start':
+                period_start = parse_timestamp(text)
+            elif name == 'end':
+                period_end = parse_timestamp(text)
+        elif name == 'resolution' and parent == 'Period':
+            resolution = parse_resolution(text)
+        elif name == 'position' and parent == 'Point':
+            try:
+                position = int(text.strip())
+            except (AttributeError, ValueError):
+                position = None
+        elif name == 'price.amount' and parent == 'Point':
+            try:
+                price = float(text.strip())
+            except (AttributeError, ValueError):
+                price = None
+        elif name == 'Point':
+            if position is None or price is None:
+                _logger.warning("Пропущено точку з некоректними position або price")
+            else:
+                points[position] = price
+        elif name == 'Period':
+            period = _build_period(domain_code, curve_type, period_start, period_end, resolution, points)
+            if period:
+                yield period
+        elif name == 'TimeSeries':
+            # Звільняємо пам'ять від вже оброблених TimeSeries
+            root.clear()
+        elif name == 'text' and parent == 'Reason':
+            reason = text and text.strip()
+
+    if root is not None and _local_name(root.tag) == 'Acknowledgement_MarketDocument':
+        raise EntsoeAcknowledgement(reason or '')
+
+
+def _build_period(domain_code, curve_type, start, end, resolution, points):
+    if start is None or resolution is None:
+        _logger.warning("Period без timeInterval/start або resolution пропущено")
+        return None
+
+    step = resolution * 60
+    slots = (end - start) // step if end is not None else max(points, default=0)
+    result = []
+    if curve_type == CURVE_TYPE_VARIABLE_BLOCK:
+        # A03: позиція діє до наступної наявної позиції
+        current = None
+        for position in range(1, slots + 1):
+            current = points.get(position, current)
+            if current is not None:
+                result.append((start + (position - 1) * step, current))
+    else:
+        for position in sorted(points):
+            if 1 <= position <= slots:
+                result.append((start + (position - 1) * step, points[position]))
+            else:
+                _logger.warning("Позиція %s поза межами періоду (%s позицій), пропускаємо", position, slots)
+    return PricePeriod(domain_code, start, end, resolution, tuple(result))
+
+
+def iter_prices(source):
+    """
+    Потоковий розбір документа A44 у компактні пари (utc_timestamp, price).
+    """
+    for period in iter_periods(source):
+        yield from period.points
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# Перетворення UTC-часу точок ENTSO-E у місцеві дату та інтервал доби за часовим поясом домену
+
+from bisect import bisect_right
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+SECONDS_PER_DAY = 86400
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Година погодинного представлення, під якою зберігається повторна година
+# доби переходу на зимовий час (25-годинна доба)
+REPEATED_HOUR = 24
+
+
+@lru_cache(maxsize=256)
+def _year_offsets(tz_name, year):
+    """
+    Зсуви часового поясу протягом року UTC.
+
+    Зсув перевіряється на початку кожної години UTC: усі зони ENTSO-E
+    змінюють його рівно на межі години.
+
+    :return: Кортеж пар (UTC timestamp, зсув у секундах), що діє з цього моменту;
+             перша пара - на початок року
+    """
+    zone = ZoneInfo(tz_name)
+    start = int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp())
+    end = int(datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp())
+    offsets = []
+    previous = None
+    for timestamp in range(start, end, 3600):
+        offset = int(datetime.fromtimestamp(timestamp, zone).utcoffset().total_seconds())
+        if offset != previous:
+            offsets.append((timestamp, offset))
+            previous = offset
+    return tuple(offsets)
+
+
+@lru_cache(maxsize=256)
+def get_offset_table(tz_name, year_from, year_to):
+    """
+    Таблиця зсувів часового поясу за роки year_from - year_to включно.
+
+    :return: Кортеж (початки, зсуви, кінці повтору): початок дії зсуву
+             (UTC timestamp), зсув у секундах та, для переходу на менший зсув,
+             UTC timestamp кінця повтореного інтервалу місцевого часу
+             (інакше - початок дії зсуву)
+    """
+    starts, offsets, repeat_ends = [], [], []
+    for year in range(year_from, year_to + 1):
+        for timestamp, offset in _year_offsets(tz_name, year):
+            if offsets and offsets[-1] == offset:
+                continue
+            repeat = offsets[-1] - offset if offsets and offsets[-1] > offset else 0
+            starts.append(timestamp)
+            offsets.append(offset)
+            repeat_ends.append(timestamp + repeat)
+    return tuple(starts), tuple(offsets), tuple(repeat_ends)
+
+
+def local_slots(tz_name, timestamps, step):
+    """
+    Пакетне перетворення UTC timestamp у місцеву дату та індекс інтервалу доби.
+
+    Індекс - номер інтервалу від місцевої півночі за годинником, тож у
+    23-годинну добу інтервали пропущеної години відсутні. Інтервали повторної
+    години 25-годинної доби отримують індекси після кінця доби
+    (24 години / step + номер інтервалу в повторі).
+
+    :param tz_name: Часовий пояс IANA (наприклад, Europe/Kyiv)
+    :param timestamps: Послідовність UTC timestamp (секунди)
+    :param step: Тривалість інтервалу (секунди), дільник години
+    :return: Список пар (місцева дата, індекс інтервалу) у порядку timestamps
+    """
+    if not timestamps:
+        return []
+    first_year = datetime.fromtimestamp(min(timestamps), timezone.utc).year
+    last_year = datetime.fromtimestamp(max(timestamps), timezone.utc).year
+    starts, offsets, repeat_ends = get_offset_table(tz_name, first_year, last_year)
+    day_slots = SECONDS_PER_DAY // step
+
+    dates = {}
+    result = []
+    segment_start = segment_end = 0
+    for timestamp in timestamps:
+        # Точки зазвичай впорядковані, тож пошук потрібен лише на межі зсуву
+        if not segment_start <= timestamp < segment_end:
+            index = max(bisect_right(starts, timestamp) - 1, 0)
+            segment_start = starts[index] if index else float('-inf')
+            segment_end = starts[index + 1] if index + 1 < len(starts) else float('inf')
+            offset, repeat_start, repeat_end = offsets[index], starts[index], repeat_ends[index]
+        local_seconds = timestamp + offset
+        day = local_seconds // SECONDS_PER_DAY
+        local_date = dates.get(day)
+        if local_date is None:
+            local_date = dates[day] = date.fromordinal(EPOCH_ORDINAL + day)
+        if timestamp < repeat_end:
+            slot = day_slots + (timestamp - repeat_start) // step
+        else:
+            slot = local_seconds % SECONDS_PER_DAY // step
+        result.append((local_date, slot))
+    return result
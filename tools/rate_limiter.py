@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Потокобезпечний token bucket для обмеження частоти запитів до API ENTSO-E
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Обмежувач частоти запитів за алгоритмом token bucket.
+
+    Відро містить до ``capacity`` токенів і поповнюється зі швидкістю
+    ``rate_per_minute`` токенів на хвилину. Кожен запит забирає один токен;
+    якщо токенів немає, ``acquire`` блокує потік до появи наступного.
+    Один екземпляр спільний для всіх потоків процесу.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = capacity or max(1, rate_per_minute // 10)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_minute / 60.0)
+        self._updated = now
+
+    def acquire(self, timeout=None):
+        """
+        Отримання одного токена з очікуванням.
+
+        :param timeout: Максимальний час очікування в секундах (None - без обмеження)
+        :return: True, якщо токен отримано; False, якщо вийшов час очікування
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) * 60.0 / self.rate_per_minute
+            if deadline is not None:
+                if now + wait > deadline:
+                    return False
+            time.sleep(wait)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(key, rate_per_minute):
+    """
+    Спільний для процесу обмежувач для ключа (наприклад, токена API).
+    При зміні ліміту створюється новий обмежувач.
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None or bucket.rate_per_minute != rate_per_minute:
+            bucket = _buckets[key] = TokenBucket(rate_per_minute)
+        return bucket
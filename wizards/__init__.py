@@ -1 +1,3 @@
 from . import import_price_wizard
+from . import import_archive_wizard
+from . import price_analytics_wizard
\ No newline at end of file
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models, _
+from odoo.exceptions import UserError
+
+
+class ImportElectricityPriceArchiveWizard(models.TransientModel):
+    _name = 'electricity.price.archive.import.wizard'
+    _description = 'Майстер імпорту архіву документів ENTSO-E'
+
+    archive_file = fields.Binary(
+        string='Файл',
+        attachment=True,
+        help="Документ A44 (XML, XML.GZ) або ZIP-архів з такими документами, зокрема вкладеними архівами."
+    )
+    archive_filename = fields.Char(string='Назва файлу')
+    source_path = fields.Char(
+        string='Шлях на сервері',
+        help="Файл або каталог на сервері Odoo. Для великих архівів зручніше, ніж завантаження через браузер."
+    )
+
+    def action_import_archive(self):
+        """
+        Створює запис імпорту та запускає його обробку у фоні.
+        """
+        self.ensure_one()
+        if bool(self.archive_file) == bool(self.source_path):
+            raise UserError(_("Завантажте файл або вкажіть шлях на сервері."))
+
+        archive_import_model = self.env['electricity.price.archive.import']
+        if self.source_path:
+            archive_import = archive_import_model.create({
+                'name': self.source_path,
+                'source_path': self.source_path,
+            })
+        else:
+            name = self.archive_filename or 'archive.zip'
+            attachment = self.env['ir.attachment'].create({
+                'name': name,
+                'datas': self.archive_file,
+                'res_model': archive_import_model._name,
+            })
+            archive_import = archive_import_model.create({
+                'name': name,
+                'attachment_id': attachment.id,
+            })
+            attachment.res_id = archive_import.id
+
+        self.env.ref('hd_electricity_price.ir_cron_import_price_archives')._trigger()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': archive_import_model._name,
+            'res_id': archive_import.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
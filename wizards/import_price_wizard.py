@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from odoo import fields, models, api, _
-from odoo.exceptions import UserError
+from odoo.exceptions import UserError, ValidationError
 
 
 class ImportElectricityPriceWizard(models.TransientModel):
@@ -14,12 +14,25 @@ class ImportElectricityPriceWizard(models.TransientModel):
         domain=[('entsoe_domain_id', '!=', False)],
         help="Оберіть країну, для якої потрібно імпортувати ціни."
     )
-    import_date = fields.Date(
-        string='Дата імпорту',
+    date_from = fields.Date(
+        string='Дата початку',
         required=True,
-        default=fields.Date.today(),
-        help="Оберіть дату, для якої потрібно завантажити ціни."
+        default=fields.Date.context_today,
+        help="Перша дата, для якої потрібно завантажити ціни."
     )
+    date_to = fields.Date(
+        string='Дата завершення',
+        required=True,
+        default=fields.Date.context_today,
+        help="Остання дата (включно), для якої потрібно завантажити ціни. "
+             "Довгі періоди завантажуються частинами, дозволеними API ENTSO-E."
+    )
+
+    @api.constrains('date_from', 'date_to')
+    def _check_dates(self):
+        for wizard in self:
+            if wizard.date_from and wizard.date_to and wizard.date_from > wizard.date_to:
+                raise ValidationError(_("Дата початку не може бути пізніше дати завершення."))
 
     @api.onchange('country_id')
     def _onchange_country_id(self):
@@ -34,27 +47,26 @@ class ImportElectricityPriceWizard(models.TransientModel):
 
     def action_import_prices(self):
         """
-        Запускає імпорт цін для обраної країни та дати.
+        Ставить імпорт цін для обраної країни та періоду в чергу фонових завдань.
+        Результат надходить сповіщенням після завершення завдання.
         """
         self.ensure_one()
-        if not self.country_id or not self.import_date:
-            raise UserError(_("Будь ласка, оберіть країну та дату для імпорту."))
+        if not self.country_id or not self.date_from or not self.date_to:
+            raise UserError(_("Будь ласка, оберіть країну та період для імпорту."))
+        if not self.country_id.entsoe_domain_id:
+            raise UserError(_("Для країни %s не налаштовано домен ENTSO-E") % self.country_id.name)
 
-        try:
-            self.env['electricity.price.rdn']._fetch_and_store_prices(self.country_id.id, self.import_date)
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': _('Успіх!'),
-                    'message': _('Ціни на електроенергію успішно імпортовано.'),
-                    'type': 'success',
-                    'sticky': False,
-                }
+        job = self.env['electricity.price.import.job']._enqueue(self.country_id, self.date_from, self.date_to)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Імпорт поставлено в чергу'),
+                'message': _('Завантаження цін для %s за %s - %s виконується у фоні. '
+                             'Після завершення ви отримаєте сповіщення.') % (
+                    job.country_id.name, job.date_from, job.date_to),
+                'type': 'info',
+                'sticky': False,
+                'next': {'type': 'ir.actions.act_window_close'},
             }
-        except UserError as e:
-            raise e
-        except Exception as e:
-            # Исправлена обработка ошибок - избегаем проблем с форматированием
-            error_msg = str(e) if e else "Невідома помилка"
-            raise UserError(_("Не вдалося імпортувати ціни: %s") % error_msg)
\ No newline at end of file
+        }
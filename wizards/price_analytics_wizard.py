@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models, api, _
+from odoo.exceptions import UserError, ValidationError
+from markupsafe import Markup
+
+# Найбільша кількість рядків таблиці результату, що показується у майстрі
+MAX_RESULT_ROWS = 366
+
+
+def _format_price(value):
+    return '' if value is None else '%.2f' % value
+
+
+def _table(header, rows):
+    head = Markup('').join(Markup('<th>%s</th>') % cell for cell in header)
+    body = Markup('').join(
+        Markup('<tr>%s</tr>') % Markup('').join(Markup('<td>%s</td>') % cell for cell in row)
+        for row in rows
+    )
+    return Markup('<table class="table table-sm table-striped"><thead><tr>%s</tr></thead><tbody>%s</tbody></table>') % (
+        head, body)
+
+
+class ElectricityPriceAnalyticsWizard(models.TransientModel):
+    _name = 'electricity.price.analytics.wizard'
+    _description = 'Майстер аналітики цін на електроенергію'
+
+    metric = fields.Selection([
+        ('rolling', 'Ковзні середні (7/30 днів)'),
+        ('percentiles', 'Перцентилі за годинами'),
+        ('spread', 'Спред між зонами'),
+        ('cheapest', 'Найдешевші години'),
+    ], string='Показник', required=True, default='rolling')
+    country_ids = fields.Many2many(
+        'res.country',
+        string='Країни',
+        required=True,
+        domain=[('entsoe_domain_id', '!=', False)],
+        help="Для спреду - рівно дві країни (перша мінус друга), для найдешевших годин - одна."
+    )
+    date_from = fields.Date(string='Дата початку', required=True,
+                            default=lambda self: fields.Date.context_today(self).replace(day=1))
+    date_to = fields.Date(string='Дата завершення', required=True, default=fields.Date.context_today)
+    hours_count = fields.Integer(string='Кількість годин', default=4,
+                                 help="Скільки найдешевших годин шукати в кожній добі")
+    consecutive = fields.Boolean(string='Безперервне вікно',
+                                 help="Шукати найдешевше вікно поспіль ідучих годин (наприклад, для заряду батареї)")
+    result_html = fields.Html(string='Результат', readonly=True, sanitize=False)
+
+    @api.constrains('date_from', 'date_to')
+    def _check_dates(self):
+        for wizard in self:
+            if wizard.date_from and wizard.date_to and wizard.date_from > wizard.date_to:
+                raise ValidationError(_("Дата початку не може бути пізніше дати завершення."))
+
+    def action_compute(self):
+        """
+        Обчислення обраного показника та показ результату в майстрі.
+        """
+        self.ensure_one()
+        self.result_html = getattr(self, '_render_%s' % self.metric)(self.env['electricity.price.analytics'])
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def _render_rolling(self, analytics):
+        result = analytics.get_rolling_averages(self.country_ids.ids, self.date_from, self.date_to, windows=(7, 30))
+        countries = self.country_ids
+        header = [_('Дата')]
+        for country in countries:
+            header += [f'{country.code} {_("за день")}', f'{country.code} 7', f'{country.code} 30']
+        rows = []
+        first_index = max(0, len(result['dates']) - MAX_RESULT_ROWS)
+        for index, day in enumerate(result['dates'][first_index:], start=first_index):
+            row = [day]
+            for country in countries:
+                values = result['countries'][str(country.id)]
+                row += [_format_price(values['daily'][index]), _format_price(values['7'][index]),
+                        _format_price(values['30'][index])]
+            rows.append(row)
+        return _table(header, reversed(rows))
+
+    def _render_percentiles(self, analytics):
+        percentiles = (10, 50, 90)
+        result = analytics.get_hourly_percentiles(self.country_ids.ids, self.date_from, self.date_to, percentiles)
+        header = [_('Година')] + [f'{country.code} P{percent}' for country in self.country_ids for percent in percentiles]
+        rows = [
+            [hour] + [_format_price(result[str(country.id)][str(percent)][hour])
+                      for country in self.country_ids for percent in percentiles]
+            for hour in range(24)
+        ]
+        return _table(header, rows)
+
+    def _render_spread(self, analytics):
+        if len(self.country_ids) != 2:
+            raise UserError(_("Для спреду оберіть рівно дві країни."))
+        first, second = self.country_ids
+        result = analytics.get_spreads(first.id, second.id, self.date_from, self.date_to)
+        summary = _table(
+            [_('Спред'), _('Середній'), _('Мін.'), _('Макс.'), _('Ст. відхилення'), _('Частка > 0'), _('Годин')],
+            [[f'{first.code} - {second.code}', _format_price(result['mean']), _format_price(result['min']),
+              _format_price(result['max']), _format_price(result['std']),
+              '' if result['positive_share'] is None else '%.0f%%' % (result['positive_share'] * 100),
+              result['hours']]],
+        )
+        hourly = _table([_('Година')] + list(range(24)),
+                        [[_('Середній спред')] + [_format_price(value) for value in result['hourly_mean']]])
+        return summary + hourly
+
+    def _render_cheapest(self, analytics):
+        if len(self.country_ids) != 1:
+            raise UserError(_("Для пошуку найдешевших годин оберіть одну країну."))
+        result = analytics.get_cheapest_hours(self.country_ids.id, self.date_from, self.date_to,
+                                              self.hours_count, self.consecutive)
+        rows = [
+            [item['date'], ', '.join('%02d:00' % hour for hour in item['hours']), _format_price(item['avg_price'])]
+            for item in reversed(result[-MAX_RESULT_ROWS:])
+        ]
+        return _table([_('Дата'), _('Години'), _('Середня ціна')], rows)